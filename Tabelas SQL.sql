@@ -13,11 +13,52 @@ CREATE TABLE usuarios (
   senha VARCHAR(255) NOT NULL
 );
 
--- Carteira (saldo atual)
+-- Carteira (saldo atual), mantida pela API a cada entrada/saída
 CREATE TABLE carteira (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  usuario_id INT NOT NULL UNIQUE,
+  saldo DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+  total_entradas DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+  total_saidas DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+  FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE
+);
+
+-- Totais por instituição/categoria (categoria vazia para entradas)
+CREATE TABLE carteira_totais (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  usuario_id INT NOT NULL,
+  tipo VARCHAR(10) NOT NULL,
+  instituicao VARCHAR(255) NOT NULL,
+  categoria VARCHAR(100) NOT NULL DEFAULT '',
+  total DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+  UNIQUE (usuario_id, tipo, instituicao, categoria),
+  FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE
+);
+
+-- Totais por dia e por mês (mes = primeiro dia do mês), para /api/serie e o relatório
+CREATE TABLE totais_diarios (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  usuario_id INT NOT NULL,
+  dia DATE NOT NULL,
+  tipo VARCHAR(10) NOT NULL,
+  instituicao VARCHAR(255) NOT NULL,
+  categoria VARCHAR(100) NOT NULL DEFAULT '',
+  total DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+  quantidade INT NOT NULL DEFAULT 0,
+  UNIQUE (usuario_id, dia, tipo, instituicao, categoria),
+  FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE
+);
+
+CREATE TABLE totais_mensais (
   id INT AUTO_INCREMENT PRIMARY KEY,
   usuario_id INT NOT NULL,
-  saldo DECIMAL(10,2) DEFAULT 0.00,
+  mes DATE NOT NULL,
+  tipo VARCHAR(10) NOT NULL,
+  instituicao VARCHAR(255) NOT NULL,
+  categoria VARCHAR(100) NOT NULL DEFAULT '',
+  total DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+  quantidade INT NOT NULL DEFAULT 0,
+  UNIQUE (usuario_id, mes, tipo, instituicao, categoria),
   FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE
 );
 
@@ -29,7 +70,11 @@ CREATE TABLE entradas (
   data DATETIME NOT NULL,
   instituicao VARCHAR(100) NOT NULL,
   valor DECIMAL(10,2) NOT NULL,
-  FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE
+  FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+  -- listagens, dashboard e relatório: sempre por usuário e data (migração 1)
+  INDEX ix_entradas_usuario_data (usuario_id, data),
+  INDEX ix_entradas_usuario_instituicao_data (usuario_id, instituicao, data),
+  FULLTEXT INDEX ft_entradas_descricao (descricao)  -- /api/busca e LIKE '%...%' do chat
 );
 
 -- Saídas financeiras
@@ -42,7 +87,37 @@ CREATE TABLE saidas (
   subcategoria VARCHAR(100),   -- usado quando categoria = 'Outros'
   instituicao VARCHAR(255) NOT NULL,
   valor DECIMAL(10,2) NOT NULL,
-  FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE
+  FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+  INDEX ix_saidas_usuario_data (usuario_id, data),
+  INDEX ix_saidas_usuario_categoria_data (usuario_id, categoria, data),
+  INDEX ix_saidas_usuario_instituicao_data (usuario_id, instituicao, data),
+  FULLTEXT INDEX ft_saidas_descricao (descricao)
 );
+-- Para particionar entradas e saidas por ano (sem FK e sem FULLTEXT, ver
+-- particoes.py): python main.py particionar
+
+-- Lançamentos antigos movidos por `python main.py arquivar` (ver arquivo.py),
+-- com o mesmo id e somente leitura pela API
+CREATE TABLE entradas_arquivo (
+  id INT PRIMARY KEY,
+  usuario_id INT NOT NULL,
+  descricao TEXT,
+  data DATETIME NOT NULL,
+  instituicao VARCHAR(100) NOT NULL,
+  valor DECIMAL(10,2) NOT NULL,
+  INDEX ix_entradas_arquivo_usuario_data (usuario_id, data)
+) ROW_FORMAT=COMPRESSED;
+
+CREATE TABLE saidas_arquivo (
+  id INT PRIMARY KEY,
+  usuario_id INT NOT NULL,
+  descricao TEXT,
+  data DATETIME NOT NULL,
+  categoria VARCHAR(100) NOT NULL,
+  subcategoria VARCHAR(100),
+  instituicao VARCHAR(255) NOT NULL,
+  valor DECIMAL(10,2) NOT NULL,
+  INDEX ix_saidas_arquivo_usuario_data (usuario_id, data)
+) ROW_FORMAT=COMPRESSED;
 
 show tables;
\ No newline at end of file
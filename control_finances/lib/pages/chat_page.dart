@@ -3,6 +3,7 @@
 import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
+import '../utils/sessao.dart';
 
 class ChatPage extends StatefulWidget {
   final int usuarioId;
@@ -28,7 +29,7 @@ class _ChatPageState extends State<ChatPage> {
     try {
       final resp = await http.post(
         Uri.parse('http://192.168.3.19:3000/api/chat'),
-        headers: {'Content-Type': 'application/json'},
+        headers: Sessao.cabecalhos({'Content-Type': 'application/json'}),
         body: jsonEncode({
           "usuario_id": widget.usuarioId,
           "pergunta": q, // certifique-se de usar 'pergunta' (alias mapeado na API)
@@ -3,10 +3,10 @@
 import 'dart:convert';
 import 'dart:math'; // for max()
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
 import 'package:intl/date_symbol_data_local.dart';
 import 'package:intl/intl.dart';
 
+import '../utils/etag_cache.dart';
 import '../widgets/pie_chart_painter.dart';
 import '../widgets/bar_chart_painter.dart';
 
@@ -117,9 +117,14 @@ class _DashboardPageState extends State<DashboardPage>
     final relParams = <String, String>{};
     if (_instituicao != 'Todas') relParams['instituicao'] = _instituicao;
     if (_fromDate != null) relParams['date_from'] = _fromDate!.toIso8601String();
-    if (_toDate != null) relParams['date_to'] = _toDate!.toIso8601String();
+    // "até" inclui o dia inteiro: a API responde dos totais diários pré-agregados
+    if (_toDate != null) {
+      relParams['date_to'] = DateTime(
+              _toDate!.year, _toDate!.month, _toDate!.day, 23, 59, 59)
+          .toIso8601String();
+    }
     final relUri = Uri.parse(relBase).replace(queryParameters: relParams);
-    final relResp = await http.get(relUri);
+    final relResp = await EtagCache.get(relUri);
     if (relResp.statusCode == 200) {
       final j = jsonDecode(relResp.body);
       _pieData = (j['por_categoria'] as List).map((obj) {
@@ -153,7 +158,7 @@ class _DashboardPageState extends State<DashboardPage>
     if (_fromDate != null) dashParams['date_from'] = _fromDate!.toIso8601String();
     if (_toDate != null) dashParams['date_to'] = _toDate!.toIso8601String();
     final dashUri = Uri.parse(dashBase).replace(queryParameters: dashParams);
-    final dashResp = await http.get(dashUri);
+    final dashResp = await EtagCache.get(dashUri);
     if (dashResp.statusCode == 200) {
       final dj = jsonDecode(dashResp.body);
       _saldo = (dj['saldo'] as num).toDouble();
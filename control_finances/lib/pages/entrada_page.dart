@@ -1,6 +1,7 @@
 import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
+import '../utils/sessao.dart';
 import 'package:intl/intl.dart';
 import '../widgets/app_button.dart';
 
@@ -57,6 +58,7 @@ class _EntradaPageState extends State<EntradaPage> {
     setState(() => _loading = true);
     final resp = await http.get(
       Uri.parse('http://192.168.3.19:3000/api/entrada/${widget.entradaId}'),
+      headers: Sessao.cabecalhos(),
     );
     if (resp.statusCode == 200) {
       final j = jsonDecode(utf8.decode(resp.bodyBytes));
@@ -91,13 +93,13 @@ class _EntradaPageState extends State<EntradaPage> {
     if (_isEdit) {
       resp = await http.put(
         Uri.parse('http://192.168.3.19:3000/api/entrada/${widget.entradaId}'),
-        headers: {'Content-Type': 'application/json'},
+        headers: Sessao.cabecalhos({'Content-Type': 'application/json'}),
         body: jsonEncode(body),
       );
     } else {
       resp = await http.post(
         Uri.parse('http://192.168.3.19:3000/api/entrada'),
-        headers: {'Content-Type': 'application/json'},
+        headers: Sessao.cabecalhos({'Content-Type': 'application/json'}),
         body: jsonEncode(body),
       );
     }
@@ -1,11 +1,14 @@
+import 'dart:async';
 import 'dart:convert';
 import 'package:control_finances/pages/login_page.dart';
 import 'package:control_finances/pages/dashboard_page.dart';
 import 'package:control_finances/pages/registros_page.dart';
 import 'package:control_finances/pages/chat_page.dart';
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
 import 'package:intl/intl.dart';
+import '../utils/etag_cache.dart';
+import '../utils/eventos.dart';
+import '../utils/sessao.dart';
 
 class HomePage extends StatefulWidget {
   final int usuarioId;
@@ -57,6 +60,7 @@ class _HomePageState extends State<HomePage> {
   double _saldo = 0, _totalEntradas = 0, _totalSaidas = 0;
   List<Map<String, dynamic>> _entradas = [];
   List<Map<String, dynamic>> _saidas = [];
+  StreamSubscription<Map<String, dynamic>>? _eventos;
 
   static const _headingStyle = TextStyle(
     fontSize: 24,
@@ -68,6 +72,44 @@ class _HomePageState extends State<HomePage> {
     super.initState();
     _categoriasSelecionadas = List.from(_categorias);
     _loadDashboard();
+    _eventos = EventosUsuario.de(widget.usuarioId).listen(_aplicarEvento);
+  }
+
+  @override
+  void dispose() {
+    _eventos?.cancel();
+    super.dispose();
+  }
+
+  /// Atualiza saldo, totais e últimos lançamentos com o evento do servidor em
+  /// vez de refazer o GET do dashboard depois de cada escrita.
+  void _aplicarEvento(Map<String, dynamic> ev) {
+    final acao = ev['acao'];
+    if (acao == 'inicio') return;
+    // com filtro de instituição os totais do evento (gerais) não servem;
+    // alteração e remoção podem trazer de volta um lançamento fora da tela
+    if (_instituicaoSelecionada != 'Todas' || acao != 'criada') {
+      _loadDashboard();
+      return;
+    }
+    final carteira = ev['carteira'];
+    final registro = Map<String, dynamic>.from(ev['registro']);
+    final entrada = ev['tabela'] == 'entrada';
+    final lista = List<Map<String, dynamic>>.from(entrada ? _entradas : _saidas);
+    if (entrada || _categoriasSelecionadas.contains(registro['categoria'])) {
+      lista.add(registro);
+    }
+    lista.sort((a, b) => (b['data'] as String).compareTo(a['data'] as String));
+    setState(() {
+      _saldo = (carteira['saldo'] as num).toDouble();
+      _totalEntradas = (carteira['total_entradas'] as num).toDouble();
+      _totalSaidas = (carteira['total_saidas'] as num).toDouble();
+      if (entrada) {
+        _entradas = lista.take(5).toList();
+      } else {
+        _saidas = lista.take(5).toList();
+      }
+    });
   }
 
   Future<void> _loadDashboard() async {
@@ -79,7 +121,7 @@ class _HomePageState extends State<HomePage> {
         'instituicao=${Uri.encodeComponent(_instituicaoSelecionada)}',
     ].join('&'));
 
-    final resp = await http.get(uri);
+    final resp = await EtagCache.get(uri);
     if (resp.statusCode == 200) {
       final jsonBody = jsonDecode(utf8.decode(resp.bodyBytes));
       final allEntradas = List<Map<String, dynamic>>.from(
@@ -140,6 +182,9 @@ class _HomePageState extends State<HomePage> {
             icon: const Icon(Icons.logout),
             tooltip: 'Sair',
             onPressed: () {
+              EtagCache.limpar();
+              EventosUsuario.fecharTodos();
+              Sessao.token = null;
               Navigator.of(context).pushAndRemoveUntil(
                 MaterialPageRoute(builder: (_) => const LoginPage()),
                 (route) => false,
@@ -166,7 +211,7 @@ class _HomePageState extends State<HomePage> {
                             context,
                             '/entrada',
                             arguments: widget.usuarioId,
-                          ).then((_) => _loadDashboard()),
+                          ),
                         ),
                       ),
                       const SizedBox(width: 16),
@@ -200,7 +245,7 @@ class _HomePageState extends State<HomePage> {
                             context,
                             '/saida',
                             arguments: widget.usuarioId,
-                          ).then((_) => _loadDashboard()),
+                          ),
                         ),
                       ),
                       const SizedBox(width: 16),
@@ -1,6 +1,7 @@
 import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
+import '../utils/sessao.dart';
 import 'package:control_finances/pages/home_page.dart';
 import '../widgets/app_button.dart';
 
@@ -41,6 +42,7 @@ class _LoginPageState extends State<LoginPage> {
 
     if (resp.statusCode == 200) {
       final data = jsonDecode(utf8.decode(resp.bodyBytes));
+      Sessao.token = data['token'];
       Navigator.pushReplacementNamed(
         context,
         '/home',
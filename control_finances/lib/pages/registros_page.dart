@@ -1,10 +1,13 @@
+import 'dart:async';
 import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
+import '../utils/sessao.dart';
 import 'package:intl/intl.dart';
 import 'package:control_finances/pages/login_page.dart';
 import 'package:control_finances/pages/entrada_page.dart';
 import 'package:control_finances/pages/saida_page.dart';
+import '../utils/eventos.dart';
 
 class RegistrosPage extends StatefulWidget {
   final int usuarioId;
@@ -39,41 +42,104 @@ class _RegistrosPageState extends State<RegistrosPage> {
     'Banco Original',
   ];
   String _instituicaoSelecionada = 'Todas';
+  StreamSubscription<Map<String, dynamic>>? _eventos;
+  // ids que chegaram por evento desde o último _fetchAll: a versão do evento
+  // é a mais nova, e a mesma linha vinda depois no NDJSON é pulada
+  final Map<String, Set<Object?>> _vistosPorEvento = {
+    'entradas': {},
+    'saidas': {},
+  };
 
   @override
   void initState() {
     super.initState();
     _fetchAll();
+    _eventos = EventosUsuario.de(widget.usuarioId).listen(_aplicarEvento);
+  }
+
+  @override
+  void dispose() {
+    _eventos?.cancel();
+    super.dispose();
+  }
+
+  /// Aplica nas listas a alteração empurrada pelo servidor, sem reler tudo.
+  void _aplicarEvento(Map<String, dynamic> ev) {
+    final acao = ev['acao'];
+    if (acao == 'inicio') return;
+    if (acao == 'lote' || acao == 'recarregar') {
+      _fetchAll();
+      return;
+    }
+    // aplicado também durante a carga: _fetchStream não repete a linha
+    final tipo = ev['tabela'] == 'entrada' ? 'entradas' : 'saidas';
+    final lista = tipo == 'entradas' ? _entradas : _saidas;
+    final registro = Map<String, dynamic>.from(ev['registro']);
+    _vistosPorEvento[tipo]!.add(registro['id']);
+    setState(() {
+      lista.removeWhere((r) => r['id'] == registro['id']);
+      if (acao != 'removida') {
+        lista.add(registro);
+        lista.sort((a, b) {
+          final c = (b['data'] as String).compareTo(a['data'] as String);
+          return c != 0 ? c : (b['id'] as int).compareTo(a['id'] as int);
+        });
+      }
+    });
   }
 
   Future<void> _fetchAll() async {
     setState(() => _loading = true);
-    final eResp = await http.get(
-      Uri.parse('http://192.168.3.19:3000/api/entradas/${widget.usuarioId}'),
-    );
-    final sResp = await http.get(
-      Uri.parse('http://192.168.3.19:3000/api/saidas/${widget.usuarioId}'),
-    );
-    if (eResp.statusCode == 200 && sResp.statusCode == 200) {
-      _entradas = List<Map<String, dynamic>>.from(
-        jsonDecode(utf8.decode(eResp.bodyBytes)),
-      );
-      _saidas = List<Map<String, dynamic>>.from(
-        jsonDecode(utf8.decode(sResp.bodyBytes)),
+    _entradas = [];
+    _saidas = [];
+    _vistosPorEvento.forEach((_, ids) => ids.clear());
+    // Lê as duas listas em NDJSON: a tela é liberada assim que chega o
+    // primeiro lote, e o resto vai sendo anexado conforme o servidor envia.
+    await Future.wait([
+      _fetchStream('entradas', _entradas),
+      _fetchStream('saidas', _saidas),
+    ]);
+    if (mounted) setState(() => _loading = false);
+  }
+
+  Future<void> _fetchStream(
+      String tipo, List<Map<String, dynamic>> destino) async {
+    final vistos = _vistosPorEvento[tipo]!;
+    final client = http.Client();
+    try {
+      final req = http.Request(
+        'GET',
+        Uri.parse(
+            'http://192.168.3.19:3000/api/$tipo/${widget.usuarioId}?formato=ndjson'),
       );
+      req.headers.addAll(Sessao.cabecalhos());
+      final resp = await client.send(req);
+      if (resp.statusCode != 200) return;
+      await for (final linha in resp.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter())) {
+        if (linha.isEmpty) continue;
+        final registro = Map<String, dynamic>.from(jsonDecode(linha));
+        if (vistos.contains(registro['id'])) continue;
+        destino.add(registro);
+        if (mounted && (_loading || destino.length % 50 == 0)) {
+          setState(() => _loading = false);
+        }
+      }
+    } finally {
+      client.close();
     }
-    setState(() => _loading = false);
   }
 
   Future<void> _deleteRecord(String tipo, int id) async {
     final resp = await http.delete(
       Uri.parse('http://192.168.3.19:3000/api/$tipo/$id'),
+      headers: Sessao.cabecalhos(),
     );
     if (resp.statusCode == 200) {
       ScaffoldMessenger.of(context).showSnackBar(
         SnackBar(content: Text('$tipo $id excluído com sucesso')),
       );
-      _fetchAll();
     }
   }
 
@@ -138,7 +204,6 @@ class _RegistrosPageState extends State<RegistrosPage> {
                         ),
                       ),
                     );
-                    _fetchAll();
                   },
                 ),
                 IconButton(
@@ -212,7 +277,6 @@ class _RegistrosPageState extends State<RegistrosPage> {
                         ),
                       ),
                     );
-                    _fetchAll();
                   },
                 ),
                 IconButton(
@@ -1,6 +1,7 @@
 import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
+import '../utils/sessao.dart';
 import 'package:intl/intl.dart';
 
 class SaidaPage extends StatefulWidget {
@@ -71,6 +72,7 @@ class _SaidaPageState extends State<SaidaPage> {
     setState(() => _loading = true);
     final resp = await http.get(
       Uri.parse('http://192.168.3.19:3000/api/saida/${widget.saidaId}'),
+      headers: Sessao.cabecalhos(),
     );
     if (resp.statusCode == 200) {
       final j = jsonDecode(utf8.decode(resp.bodyBytes));
@@ -109,13 +111,13 @@ class _SaidaPageState extends State<SaidaPage> {
     if (_isEdit) {
       resp = await http.put(
         Uri.parse('http://192.168.3.19:3000/api/saida/${widget.saidaId}'),
-        headers: {'Content-Type': 'application/json'},
+        headers: Sessao.cabecalhos({'Content-Type': 'application/json'}),
         body: jsonEncode(body),
       );
     } else {
       resp = await http.post(
         Uri.parse('http://192.168.3.19:3000/api/saida'),
-        headers: {'Content-Type': 'application/json'},
+        headers: Sessao.cabecalhos({'Content-Type': 'application/json'}),
         body: jsonEncode(body),
       );
     }
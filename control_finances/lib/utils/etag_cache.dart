@@ -0,0 +1,38 @@
+// lib/utils/etag_cache.dart
+import 'package:http/http.dart' as http;
+import 'sessao.dart';
+
+/// GET com revalidação por ETag: guarda a última resposta 200 de cada URL e
+/// manda If-None-Match na próxima vez. Quando o servidor responde 304 (dados do
+/// usuário não mudaram), devolve o corpo guardado como se fosse um 200.
+class EtagCache {
+  static final Map<String, _Guardada> _respostas = {};
+
+  static Future<http.Response> get(Uri uri) async {
+    final chave = uri.toString();
+    final anterior = _respostas[chave];
+    final resp = await http.get(uri, headers: Sessao.cabecalhos({
+      if (anterior != null) 'If-None-Match': anterior.etag,
+    }));
+    if (resp.statusCode == 304 && anterior != null) {
+      return http.Response.bytes(anterior.corpo, 200,
+          headers: anterior.cabecalhos, request: resp.request);
+    }
+    final etag = resp.headers['etag'];
+    if (resp.statusCode == 200 && etag != null) {
+      _respostas[chave] = _Guardada(etag, resp.bodyBytes, resp.headers);
+    } else {
+      _respostas.remove(chave);
+    }
+    return resp;
+  }
+
+  static void limpar() => _respostas.clear();
+}
+
+class _Guardada {
+  final String etag;
+  final List<int> corpo;
+  final Map<String, String> cabecalhos;
+  _Guardada(this.etag, this.corpo, this.cabecalhos);
+}
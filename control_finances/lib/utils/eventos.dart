@@ -0,0 +1,83 @@
+// lib/utils/eventos.dart
+import 'dart:async';
+import 'dart:convert';
+import 'package:http/http.dart' as http;
+import 'sessao.dart';
+
+/// Alterações dos dados do usuário empurradas pelo servidor (GET /api/eventos,
+/// Server-Sent Events). Cada evento é um Map com `acao` ("inicio", "criada",
+/// "atualizada", "removida", "lote" ou "recarregar"), `tabela`, `registro`,
+/// `carteira` e `totais`. Uma conexão por usuário, compartilhada pelas telas;
+/// reconecta sozinha mandando Last-Event-ID para saber se perdeu algo.
+class EventosUsuario {
+  static final Map<int, EventosUsuario> _abertos = {};
+
+  final int usuarioId;
+  final _controller = StreamController<Map<String, dynamic>>.broadcast();
+  http.Client? _client;
+  String? _ultimoId;
+  Duration _espera = const Duration(seconds: 3);
+  bool _fechado = false;
+
+  EventosUsuario._(this.usuarioId) {
+    _controller.onCancel = () {
+      if (!_controller.hasListener) fechar();
+    };
+    _conectar();
+  }
+
+  static Stream<Map<String, dynamic>> de(int usuarioId) =>
+      _abertos.putIfAbsent(usuarioId, () => EventosUsuario._(usuarioId))
+          ._controller
+          .stream;
+
+  Future<void> _conectar() async {
+    while (!_fechado) {
+      _client = http.Client();
+      try {
+        final req = http.Request(
+          'GET',
+          Uri.parse('http://192.168.3.19:3000/api/eventos/$usuarioId'),
+        );
+        req.headers.addAll(Sessao.cabecalhos({'Accept': 'text/event-stream'}));
+        if (_ultimoId != null) req.headers['Last-Event-ID'] = _ultimoId!;
+        final resp = await _client!.send(req);
+        if (resp.statusCode == 200) {
+          String dados = '';
+          await for (final linha in resp.stream
+              .transform(utf8.decoder)
+              .transform(const LineSplitter())) {
+            if (linha.startsWith('data:')) {
+              dados += linha.substring(5).trimLeft();
+            } else if (linha.startsWith('id:')) {
+              _ultimoId = linha.substring(3).trim();
+            } else if (linha.startsWith('retry:')) {
+              final ms = int.tryParse(linha.substring(6).trim());
+              if (ms != null) _espera = Duration(milliseconds: ms);
+            } else if (linha.isEmpty && dados.isNotEmpty) {
+              _controller.add(Map<String, dynamic>.from(jsonDecode(dados)));
+              dados = '';
+            }
+          }
+        }
+      } catch (_) {
+        // sem rede ou servidor reiniciando: tenta de novo depois da espera
+      } finally {
+        _client?.close();
+      }
+      if (!_fechado) await Future.delayed(_espera);
+    }
+  }
+
+  void fechar() {
+    _fechado = true;
+    _client?.close();
+    _abertos.remove(usuarioId);
+  }
+
+  static void fecharTodos() {
+    for (final e in _abertos.values.toList()) {
+      e.fechar();
+    }
+  }
+}
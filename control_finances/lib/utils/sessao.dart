@@ -0,0 +1,12 @@
+// lib/utils/sessao.dart
+
+/// Token devolvido pelo POST /api/login. Toda chamada à API, exceto cadastro e
+/// login, manda `Authorization: Bearer <token>`; sem ele o servidor responde 401.
+class Sessao {
+  static String? token;
+
+  static Map<String, String> cabecalhos([Map<String, String> extra = const {}]) => {
+        ...extra,
+        if (token != null) 'Authorization': 'Bearer $token',
+      };
+}
@@ -0,0 +1,150 @@
+# Controle de concorrência na frente do Ollama.
+# - No máximo `max_concorrentes` gerações rodando ao mesmo tempo.
+# - Quem passa disso espera numa fila limitada, atendida em rodízio entre os
+#   usuários (um usuário com várias perguntas não bloqueia os outros).
+# - Fila cheia, ou usuário com muitas perguntas na fila, falha na hora com
+#   FilaCheia (o endpoint responde 429) em vez de esperar o timeout do modelo.
+# - Chamadas idênticas em andamento ao mesmo tempo compartilham uma geração só.
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class FilaCheia(Exception):
+    """Não há vaga nem lugar na fila para a chamada."""
+
+
+class AgendadorLLM:
+    def __init__(self, max_concorrentes: int = 2, max_fila: int = 32,
+                 max_fila_por_usuario: int = 4, espera_maxima: float = 30.0):
+        self.max_concorrentes = max_concorrentes
+        self.max_fila = max_fila
+        self.max_fila_por_usuario = max_fila_por_usuario
+        self.espera_maxima = espera_maxima
+        self._ativos = 0
+        self._filas: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self._na_fila = 0
+        self._em_voo: Dict[Hashable, list] = {}  # chave → [tarefa, nº de interessados]
+        # métricas
+        self.executadas = self.rejeitadas = self.coalescidas = 0
+        self.maior_fila = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._esperas = 0
+
+    # ─── Vagas ───────────────────────────────────────────────────────────────
+    @asynccontextmanager
+    async def vaga(self, usuario_id: Hashable):
+        """Segura uma das `max_concorrentes` vagas enquanto o bloco executa."""
+        inicio = time.monotonic()
+        if self._ativos < self.max_concorrentes and not self._na_fila:
+            self._ativos += 1
+        else:
+            await self._esperar(usuario_id)
+        self._registrar_espera(time.monotonic() - inicio)
+        try:
+            yield
+        finally:
+            self._liberar()
+
+    async def _esperar(self, usuario_id: Hashable):
+        fila = self._filas.get(usuario_id)
+        if self._na_fila >= self.max_fila or (fila and len(fila) >= self.max_fila_por_usuario):
+            self.rejeitadas += 1
+            raise FilaCheia()
+        if fila is None:
+            fila = self._filas[usuario_id] = deque()
+        vez = asyncio.get_running_loop().create_future()
+        fila.append(vez)
+        self._na_fila += 1
+        self.maior_fila = max(self.maior_fila, self._na_fila)
+        try:
+            await asyncio.wait_for(asyncio.shield(vez), self.espera_maxima)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if vez.done() and not vez.cancelled():
+                # a vaga chegou junto com o cancelamento: devolve
+                self._liberar()
+            else:
+                vez.cancel()
+                self._retirar(usuario_id, vez)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejeitadas += 1
+                raise FilaCheia() from e
+            raise
+
+    def _retirar(self, usuario_id: Hashable, vez):
+        fila = self._filas.get(usuario_id)
+        if fila and vez in fila:
+            fila.remove(vez)
+            self._na_fila -= 1
+            if not fila:
+                del self._filas[usuario_id]
+
+    def _liberar(self):
+        self._ativos -= 1
+        # rodízio: o primeiro usuário da fila é atendido e vai para o fim
+        while self._filas and self._ativos < self.max_concorrentes:
+            usuario_id, fila = next(iter(self._filas.items()))
+            vez = fila.popleft()
+            self._na_fila -= 1
+            if fila:
+                self._filas.move_to_end(usuario_id)
+            else:
+                del self._filas[usuario_id]
+            if not vez.done():
+                self._ativos += 1
+                vez.set_result(None)
+
+    def _registrar_espera(self, segundos: float):
+        self._esperas += 1
+        self._espera_total += segundos
+        self._espera_max = max(self._espera_max, segundos)
+
+    # ─── Execução com coalescência ───────────────────────────────────────────
+    async def executar(self, usuario_id: Hashable, chave: Hashable, fabrica: Callable[[], Awaitable]):
+        """Executa `fabrica()` dentro de uma vaga. Se já houver uma chamada com a
+        mesma `chave` em andamento, aguarda o resultado dela em vez de gerar de novo."""
+        voo = self._em_voo.get(chave)
+        if voo is not None:
+            self.coalescidas += 1
+        else:
+            tarefa = asyncio.ensure_future(self._rodar(usuario_id, fabrica))
+            voo = self._em_voo[chave] = [tarefa, 0]
+            tarefa.add_done_callback(lambda _t, c=chave: self._em_voo.pop(c, None))
+        voo[1] += 1
+        try:
+            return await asyncio.shield(voo[0])
+        finally:
+            voo[1] -= 1
+            # último interessado desistiu: não vale a pena continuar gerando
+            if voo[1] == 0 and not voo[0].done():
+                voo[0].cancel()
+
+    async def _rodar(self, usuario_id: Hashable, fabrica: Callable[[], Awaitable]):
+        async with self.vaga(usuario_id):
+            self.executadas += 1
+            return await fabrica()
+
+    def tem_espaco(self, usuario_id: Hashable) -> bool:
+        """Checagem antecipada (sem reservar) usada antes de abrir um stream."""
+        if self._ativos < self.max_concorrentes and not self._na_fila:
+            return True
+        fila = self._filas.get(usuario_id)
+        return self._na_fila < self.max_fila and not (fila and len(fila) >= self.max_fila_por_usuario)
+
+    def estatisticas(self) -> dict:
+        return {
+            "ativos": self._ativos,
+            "max_concorrentes": self.max_concorrentes,
+            "na_fila": self._na_fila,
+            "max_fila": self.max_fila,
+            "maior_fila": self.maior_fila,
+            "executadas": self.executadas,
+            "coalescidas": self.coalescidas,
+            "rejeitadas": self.rejeitadas,
+            "espera_media_s": round(self._espera_total / self._esperas, 4) if self._esperas else 0.0,
+            "espera_max_s": round(self._espera_max, 4),
+        }
@@ -0,0 +1,63 @@
+# Arquivamento de lançamentos antigos (ver ARQUIVO_MESES em main.py).
+#
+#   python main.py arquivar                          → move as linhas anteriores ao corte
+#   python main.py desarquivar [--desde AAAA-MM-DD]  → traz de volta (tudo, ou a partir da data)
+#
+# As linhas vão com o mesmo id para entradas_arquivo/saidas_arquivo (no MySQL
+# com ROW_FORMAT=COMPRESSED: ocupam menos disco e as páginas frias deixam de
+# disputar o buffer pool com as quentes). O movimento anda pela chave primária
+# em lotes de LOTE linhas, cada lote numa transação curta (SELECT ... FOR UPDATE,
+# INSERT ... SELECT, DELETE): a API continua lendo e escrevendo durante o
+# processo, e uma interrupção no meio deixa só parte do trabalho feito, sem
+# linha duplicada ou perdida. Os totais (carteira, totais por dia/mês) cobrem
+# as duas tabelas e não mudam, então caches e o feed de eventos não são avisados.
+
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import Table, delete, func, insert, select, true
+
+logger = logging.getLogger(__name__)
+
+LOTE = 5000
+
+
+def mover(engine, origem: Table, destino: Table, condicao: Callable, lote: int = LOTE,
+          manter_maior_id: bool = False) -> int:
+    """Move de `origem` para `destino` as linhas em que `condicao(origem)` vale.
+    Retorna quantas moveu. `manter_maior_id`: no SQLite (sem AUTOINCREMENT) o
+    próximo id é max(id) + 1, e mover a linha de id máximo faria o id ser reusado."""
+    colunas = [c.name for c in origem.c]
+    teto = None
+    if manter_maior_id:
+        with engine.connect() as conn:
+            teto = conn.execute(select(func.max(origem.c.id))).scalar()
+        if teto is None:
+            return 0
+    movidas, ultimo = 0, None
+    while True:
+        with engine.begin() as conn:
+            q = select(origem.c.id).where(condicao(origem))
+            if ultimo is not None:
+                q = q.where(origem.c.id > ultimo)
+            if teto is not None:
+                q = q.where(origem.c.id < teto)
+            ids = conn.execute(q.order_by(origem.c.id).limit(lote).with_for_update()).scalars().all()
+            if not ids:
+                break
+            conn.execute(insert(destino).from_select(colunas, select(*origem.c).where(origem.c.id.in_(ids))))
+            conn.execute(delete(origem).where(origem.c.id.in_(ids)))
+        ultimo = ids[-1]
+        movidas += len(ids)
+        logger.info(f"{origem.name} → {destino.name}: {movidas} linha(s)")
+    return movidas
+
+def arquivar(engine, pares: List[Tuple[Table, Table]], corte, lote: int = LOTE) -> Dict[str, int]:
+    """Move para o arquivo as linhas com data anterior a `corte`. `pares`: [(quente, arquivo)]."""
+    return {quente.name: mover(engine, quente, arq, lambda t: t.c.data < corte, lote, manter_maior_id=True)
+            for quente, arq in pares}
+
+def desarquivar(engine, pares: List[Tuple[Table, Table]], desde=None, lote: int = LOTE) -> Dict[str, int]:
+    """Devolve às tabelas quentes as linhas arquivadas com data a partir de `desde` (todas se None)."""
+    condicao = (lambda t: t.c.data >= desde) if desde is not None else (lambda t: true())
+    return {quente.name: mover(engine, arq, quente, condicao, lote) for quente, arq in pares}
@@ -0,0 +1,120 @@
+# Busca textual em entradas.descricao e saidas.descricao.
+#   MySQL:  índice FULLTEXT (InnoDB). Com a collation do banco (utf8mb4_unicode_ci)
+#           a comparação já ignora acentos e caixa.
+#   SQLite: tabelas FTS5 de conteúdo externo (entradas_fts/saidas_fts) com o
+#           tokenizer unicode61 remove_diacritics, mantidas por triggers, então
+#           inserts em lote e importações também entram no índice.
+#   Outros: LIKE por termo, sem índice. Também no MySQL com as tabelas
+#           particionadas por ano (particoes.py), que não aceitam FULLTEXT.
+# Os termos são normalizados como no chat (minúsculas, sem acentos) e cada um
+# vale como prefixo ("sal" encontra "Salário"); todos precisam aparecer.
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+
+from chat_rapido import normalizar
+from particoes import particoes
+
+TABELAS = ("entradas", "saidas")
+MIN_TERMO = 3    # innodb_ft_min_token_size padrão; termos menores seriam ignorados no MySQL
+MAX_TERMOS = 8
+STOPWORDS = {"de", "da", "do", "das", "dos", "e", "em", "com", "para", "por", "a", "o", "as", "os",
+             "no", "na", "nos", "nas", "um", "uma", "que", "ao", "aos"}
+
+
+def termos(consulta: str) -> List[str]:
+    vistos = []
+    for t in re.findall(r"[a-z0-9]+", normalizar(consulta)):
+        if len(t) >= MIN_TERMO and t not in STOPWORDS and t not in vistos:
+            vistos.append(t)
+    return vistos[:MAX_TERMOS]
+
+
+# ─── Índices ─────────────────────────────────────────────────────────────────
+def _fts5_sqlite(tabela: str) -> List[str]:
+    fts = f"{tabela}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(descricao, content='{tabela}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabela} BEGIN "
+        f"INSERT INTO {fts}(rowid, descricao) VALUES (new.id, new.descricao); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabela} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, descricao) VALUES ('delete', old.id, old.descricao); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF descricao ON {tabela} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, descricao) VALUES ('delete', old.id, old.descricao); "
+        f"INSERT INTO {fts}(rowid, descricao) VALUES (new.id, new.descricao); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",  # indexa as linhas que já existem
+    ]
+
+def preparar(engine) -> bool:
+    """Cria os índices que faltarem. Retorna True se a busca usa índice."""
+    dialeto = engine.dialect.name
+    if dialeto not in ("mysql", "sqlite"):
+        return False
+    with engine.begin() as conn:
+        existentes = set(inspect(conn).get_table_names())
+        if any(particoes(conn, t) for t in TABELAS):
+            return False
+        for tabela in TABELAS:
+            if dialeto == "mysql":
+                nomes = {ix["name"] for ix in inspect(conn).get_indexes(tabela)}
+                if f"ft_{tabela}_descricao" not in nomes:
+                    conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD FULLTEXT INDEX ft_{tabela}_descricao (descricao)")
+            elif f"{tabela}_fts" not in existentes:
+                for comando in _fts5_sqlite(tabela):
+                    conn.exec_driver_sql(comando)
+    return True
+
+
+# ─── Consultas ───────────────────────────────────────────────────────────────
+def _bloco(dialeto: str, tabela: str, tipo: str, indexado: bool) -> str:
+    categoria = "t.categoria" if tabela == "saidas" else "NULL"
+    colunas = (f"'{tipo}' AS tipo, t.id, t.descricao, t.data, t.instituicao, {categoria} AS categoria, "
+               f"t.valor")
+    if indexado and dialeto == "mysql":
+        return (f"SELECT {colunas}, MATCH(t.descricao) AGAINST(:natural IN NATURAL LANGUAGE MODE) AS relevancia "
+                f"FROM {tabela} t WHERE t.usuario_id = :usuario_id "
+                f"AND MATCH(t.descricao) AGAINST(:booleana IN BOOLEAN MODE)")
+    if indexado and dialeto == "sqlite":
+        # bm25: menor é melhor
+        return (f"SELECT {colunas}, -bm25({tabela}_fts) AS relevancia "
+                f"FROM {tabela}_fts JOIN {tabela} t ON t.id = {tabela}_fts.rowid "
+                f"WHERE {tabela}_fts MATCH :fts AND t.usuario_id = :usuario_id")
+    return (f"SELECT {colunas}, 0 AS relevancia FROM {tabela} t WHERE t.usuario_id = :usuario_id AND "
+            + " AND ".join(f"LOWER(t.descricao) LIKE :like{i}" for i in range(MAX_TERMOS)))
+
+def _parametros(lista: List[str]) -> dict:
+    parametros = {
+        "natural": " ".join(lista),
+        "booleana": " ".join(f"+{t}*" for t in lista),
+        "fts": " AND ".join(f'"{t}"*' for t in lista),
+    }
+    # sem índice: os termos que faltam repetem o primeiro para fechar os MAX_TERMOS LIKEs
+    for i in range(MAX_TERMOS):
+        parametros[f"like{i}"] = f"%{lista[min(i, len(lista) - 1)]}%"
+    return parametros
+
+def buscar(db, usuario_id: int, lista: List[str], limite: int, offset: int, indexado: bool) -> list:
+    """Linhas de entradas e saidas que contêm todos os termos, da mais relevante
+    para a menos (empate: mais recente primeiro). Retorna até `limite` linhas."""
+    dialeto = db.get_bind().dialect.name
+    sql = (f"SELECT * FROM ({_bloco(dialeto, 'entradas', 'entrada', indexado)} "
+           f"UNION ALL {_bloco(dialeto, 'saidas', 'saida', indexado)}) r "
+           f"ORDER BY relevancia DESC, data DESC, id DESC LIMIT :limite OFFSET :offset")
+    return db.execute(text(sql), {**_parametros(lista), "usuario_id": usuario_id,
+                                  "limite": limite, "offset": offset}).mappings().all()
+
+def predicado(dialeto: str, tabela: str, ref: str, texto: str) -> Optional[str]:
+    """Troca de `ref.descricao LIKE '%texto%'` usada pelo governador do SQL do
+    chat. None quando não há termos indexáveis (o LIKE fica como está)."""
+    lista = termos(texto)
+    if not lista or tabela not in TABELAS:
+        return None
+    p = _parametros(lista)
+    if dialeto == "mysql":
+        return f"MATCH({ref}.descricao) AGAINST('{p['booleana']}' IN BOOLEAN MODE)"
+    if dialeto == "sqlite":
+        return f"{ref}.id IN (SELECT rowid FROM {tabela}_fts WHERE {tabela}_fts MATCH '{p['fts']}')"
+    return None
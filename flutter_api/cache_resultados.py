@@ -0,0 +1,135 @@
+# Cache dos resultados de dashboard() e relatorio() por usuário.
+# Cada usuário tem uma versão de dados que os endpoints de escrita incrementam;
+# a chave do cache e o ETag incluem essa versão, então nada precisa ser apagado
+# quando os dados mudam: as entradas antigas só deixam de ser lidas e saem pelo LRU.
+#
+# O backend padrão vive na memória do processo (um worker). Para vários workers
+# use BackendRedis (CACHE_REDIS_URL), que compartilha versões, resultados e o
+# instante da última escrita de cada usuário: a leitura logo depois de uma
+# escrita vai ao primário em qualquer worker, não só no que recebeu a escrita.
+# O instante é do relógio de parede (time.time()), comparado entre servidores.
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+MAX_ESCRITAS = 10000  # usuários lembrados para a leitura pós-escrita
+TTL_ESCRITA = 300     # s que o Redis guarda o instante da última escrita
+
+
+class BackendMemoria:
+    def __init__(self, max_itens: int = 5000):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[str, Any]" = OrderedDict()
+        self._versoes = {}  # nunca expiram: versão "voltar" faria um ETag antigo valer de novo
+        self._escritas = {}  # usuario_id → instante da última escrita
+        self._lock = threading.Lock()
+        self.epoca = uuid.uuid4().hex[:8]
+
+    def versao(self, usuario_id: int) -> int:
+        return self._versoes.get(usuario_id, 0)
+
+    def incrementar(self, usuario_id: int) -> int:
+        with self._lock:
+            v = self._versoes.get(usuario_id, 0) + 1
+            self._versoes[usuario_id] = v
+            agora = self._escritas[usuario_id] = time.time()
+            if len(self._escritas) > MAX_ESCRITAS:
+                self._escritas = {u: t for u, t in self._escritas.items() if agora - t < TTL_ESCRITA}
+            return v
+
+    def ultima_escrita(self, usuario_id: int) -> Optional[float]:
+        return self._escritas.get(usuario_id)
+
+    def obter(self, chave: str):
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is not None:
+                self._itens.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave: str, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+
+class BackendRedis:
+    """Versões e resultados num Redis compartilhado entre os workers.
+    Os resultados expiram por TTL (o Redis cuida da evicção com maxmemory-policy=allkeys-lru)."""
+
+    def __init__(self, url: str, ttl: int = 3600, prefixo: str = "cf"):
+        try:
+            import redis
+        except ImportError as e:  # dependência opcional
+            raise RuntimeError("CACHE_REDIS_URL definido mas o pacote 'redis' não está instalado") from e
+        self._r = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefixo = prefixo
+        self._r.set(f"{prefixo}:epoca", uuid.uuid4().hex[:8], nx=True)
+        self.epoca = self._r.get(f"{prefixo}:epoca").decode()
+
+    def versao(self, usuario_id: int) -> int:
+        return int(self._r.get(f"{self.prefixo}:v:{usuario_id}") or 0)
+
+    def incrementar(self, usuario_id: int) -> int:
+        pipe = self._r.pipeline()
+        pipe.incr(f"{self.prefixo}:v:{usuario_id}")
+        pipe.set(f"{self.prefixo}:w:{usuario_id}", repr(time.time()), ex=TTL_ESCRITA)
+        return int(pipe.execute()[0])
+
+    def ultima_escrita(self, usuario_id: int) -> Optional[float]:
+        bruto = self._r.get(f"{self.prefixo}:w:{usuario_id}")
+        return float(bruto) if bruto is not None else None
+
+    def obter(self, chave: str):
+        bruto = self._r.get(f"{self.prefixo}:r:{chave}")
+        return json.loads(bruto) if bruto is not None else None
+
+    def guardar(self, chave: str, valor):
+        self._r.set(f"{self.prefixo}:r:{chave}", json.dumps(valor, default=str), ex=self.ttl)
+
+
+class CacheResultados:
+    def __init__(self, backend=None):
+        self.backend = backend or BackendMemoria()
+        self.hits = self.misses = self.nao_modificados = 0
+
+    def preparar(self, usuario_id: int, rota: str, filtros: dict) -> Tuple[str, str]:
+        """Retorna (chave, etag) para a versão atual dos dados do usuário."""
+        versao = self.backend.versao(usuario_id)
+        digest = hashlib.sha1(json.dumps(filtros, sort_keys=True, default=str).encode()).hexdigest()[:12]
+        chave = f"{rota}:{usuario_id}:{versao}:{digest}"
+        etag = f'W/"{self.backend.epoca}-{usuario_id}-{versao}-{rota}-{digest}"'
+        return chave, etag
+
+    def obter(self, chave: str) -> Optional[Any]:
+        valor = self.backend.obter(chave)
+        if valor is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return valor
+
+    def guardar(self, chave: str, valor):
+        self.backend.guardar(chave, valor)
+
+    def invalidar(self, *usuario_ids: int):
+        for uid in set(usuario_ids):
+            self.backend.incrementar(uid)
+
+    def escreveu_recentemente(self, usuario_id: int, janela: float) -> bool:
+        """Se houve escrita do usuário (em qualquer worker que use o mesmo backend)
+        há menos de `janela` segundos: usado para ler do primário enquanto a
+        réplica pode não ter recebido a alteração."""
+        t = self.backend.ultima_escrita(usuario_id)
+        return t is not None and time.time() - t < janela
+
+    def estatisticas(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "nao_modificados": self.nao_modificados}
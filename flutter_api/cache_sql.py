@@ -0,0 +1,186 @@
+# Cache dos SQLs gerados pelo Gemma no passo 1 do /api/chat.
+# A chave é a pergunta normalizada (sem acentos, caixa, espaços e com os números
+# trocados por '#'); o valor é o SQL já validado e executado uma vez, com
+# usuario_id, limites de semana/mês/ano e os números da pergunta convertidos em
+# parâmetros. Assim o mesmo template serve para outros usuários e outros dias.
+# SQL com qualquer outra data concreta ('ontem', 'mês passado', YEAR(data) = 2026
+# sem o ano na pergunta) ou com data relativa ao relógio do banco (CURDATE(),
+# NOW()) não vai para o cache: a resposta mudaria com o dia.
+
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict
+
+from chat_rapido import normalizar
+
+logger = logging.getLogger(__name__)
+
+# ─── Templates ───────────────────────────────────────────────────────────────
+_DATA_FIXA = re.compile(
+    r"'\d{4}-\d{2}(-\d{2})?([ T][\d:.]+)?'"                               # '2026-10-17', '2026-09-01 00:00:00'
+    r"|'\d{2}/\d{2}(/\d{2,4})?'"                                          # '17/10/2026'
+    r"|(?<![\w.:'])(19|20)\d{2}(?![\w.'])|'(19|20)\d{2}'"                  # ano solto: YEAR(data) = 2026
+    r"|\b(MONTH|DAY|DAYOFMONTH|WEEK|YEARWEEK|QUARTER)\s*\([^()]*\)\s*(=|<>|!=|<=|>=|<|>|IN\b|BETWEEN\b)\s*\(?\s*'?\d"
+    r"|\b(CURDATE|CURRENT_DATE|CURRENT_TIME|CURRENT_TIMESTAMP|CURTIME|NOW|SYSDATE|UTC_DATE|UTC_TIME"
+    r"|UTC_TIMESTAMP|LOCALTIME|LOCALTIMESTAMP)\b|'now'",
+    re.IGNORECASE,
+)
+
+def chave_pergunta(pergunta: str) -> str:
+    return re.sub(r"\d+", "#", normalizar(pergunta))
+
+def numeros(pergunta: str) -> List[str]:
+    # mesma segmentação de chave_pergunta: '1.500' vira ['1', '500']
+    return re.findall(r"\d+", normalizar(pergunta))
+
+def extrair_template(sql: str, usuario_id: int, limites: Dict[str, str], nums: List[str]) -> Optional[str]:
+    """Troca os valores concretos do SQL por parâmetros nomeados.
+    Retorna None quando a troca seria ambígua e o SQL não deve ir para o cache."""
+    tpl, n = re.subn(rf"\busuario_id\s*=\s*{usuario_id}\b", "usuario_id = :usuario_id", sql)
+    if not n:
+        return None
+    valores = list(limites.values())
+    for nome, valor in limites.items():
+        literal = f"'{valor}'"
+        if literal in tpl:
+            if valores.count(valor) > 1:  # ex.: 1º de janeiro = início do mês e do ano
+                return None
+            tpl = tpl.replace(literal, f":{nome}")
+    for i, num in enumerate(nums):
+        padrao = rf"(?<![\w.:'\-]){re.escape(num)}(?![\w.'\-])"
+        # Cada número da pergunta precisa aparecer exatamente uma vez; se some ou
+        # repete (ex.: 'últimas 2' com ROUND(valor, 2)) não dá para saber qual trocar
+        if len(re.findall(padrao, tpl)) != 1:
+            return None
+        tpl = re.sub(padrao, f":n{i}", tpl)
+    if _DATA_FIXA.search(tpl):
+        return None
+    return tpl
+
+def parametros(template: str, usuario_id: int, limites: Dict[str, str], nums: List[str]) -> dict:
+    todos = {"usuario_id": usuario_id, **limites}
+    todos.update({f"n{i}": int(num) for i, num in enumerate(nums)})
+    return {k: v for k, v in todos.items() if f":{k}" in template}
+
+# ─── Cache LRU com TTL ───────────────────────────────────────────────────────
+class CacheSQL:
+    """LRU limitado a `max_itens`, com expiração por `ttl` segundos.
+    Se `arquivo` for informado, os templates também são gravados num SQLite local
+    e recarregados na inicialização, para o worker reiniciar com o cache quente.
+    A gravação no arquivo fica numa thread própria: obter/guardar são chamados
+    do event loop e não esperam o disco (nem o lock de outro worker no arquivo)."""
+
+    def __init__(self, max_itens: int = 1000, ttl: float = 24 * 3600, arquivo: Optional[str] = None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        self.arquivo = arquivo
+        self._conn = None
+        self._gravacoes: "queue.Queue[tuple]" = queue.Queue()
+        self._gravador: Optional[threading.Thread] = None
+        if arquivo:
+            self._conn = sqlite3.connect(arquivo, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_sql (chave TEXT PRIMARY KEY, template TEXT NOT NULL, criado REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM cache_sql WHERE criado < ?", (time.time() - ttl,))
+            self._conn.commit()
+            linhas = self._conn.execute(
+                "SELECT chave, template, criado FROM cache_sql ORDER BY criado DESC LIMIT ?", (max_itens,)
+            ).fetchall()
+            for chave, template, criado in reversed(linhas):
+                self._itens[chave] = (template, criado)
+
+    def reabrir(self):
+        """Nova conexão com o arquivo, para o processo filho depois de um fork
+        (uma conexão SQLite não pode ser usada por dois processos)."""
+        if self._conn is not None:
+            self._conn = sqlite3.connect(self.arquivo, check_same_thread=False)
+            # a thread de gravação não atravessa o fork
+            self._gravacoes, self._gravador = queue.Queue(), None
+
+    def _gravar(self, sql: str, params: tuple):
+        """Enfileira a escrita no arquivo (chamada com self._lock)."""
+        if self._conn is None:
+            return
+        self._gravacoes.put((sql, params))
+        if self._gravador is None:
+            self._gravador = threading.Thread(target=self._gravar_pendentes, name="cache-sql", daemon=True)
+            self._gravador.start()
+
+    def _gravar_pendentes(self):
+        fila = self._gravacoes
+        while True:
+            lote = [fila.get()]
+            while not fila.empty():
+                lote.append(fila.get_nowait())
+            try:
+                for sql, params in lote:
+                    self._conn.execute(sql, params)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                # o arquivo é só para reiniciar com o cache quente: o chat segue sem ele
+                logger.warning(f"Cache de SQL: falha ao gravar {len(lote)} alteração(ões) no arquivo: {e}")
+                try:
+                    self._conn.rollback()
+                except sqlite3.Error:
+                    pass
+            finally:
+                for _ in lote:
+                    fila.task_done()
+
+    def esperar_gravacoes(self):
+        """Bloqueia até o arquivo refletir tudo o que já foi guardado/removido."""
+        self._gravacoes.join()
+
+    def obter(self, chave: str) -> Optional[str]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and time.time() - item[1] > self.ttl:
+                self._remover(chave)
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[0]
+
+    def guardar(self, chave: str, template: str):
+        agora = time.time()
+        with self._lock:
+            self._itens[chave] = (template, agora)
+            self._itens.move_to_end(chave)
+            self._gravar("INSERT OR REPLACE INTO cache_sql (chave, template, criado) VALUES (?, ?, ?)",
+                         (chave, template, agora))
+            while len(self._itens) > self.max_itens:
+                antiga, _ = self._itens.popitem(last=False)
+                self.evictions += 1
+                self._gravar("DELETE FROM cache_sql WHERE chave = ?", (antiga,))
+
+    def invalidar(self, chave: str):
+        with self._lock:
+            self._remover(chave)
+
+    def _remover(self, chave: str):
+        self._itens.pop(chave, None)
+        self._gravar("DELETE FROM cache_sql WHERE chave = ?", (chave,))
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,494 @@
+# Rota rápida do /api/chat: reconhece as perguntas mais comuns (saldo, totais de
+# gastos/entradas por período, categoria ou instituição, últimos lançamentos)
+# e responde com consultas parametrizadas prontas, sem passar pelo LLM.
+# Perguntas que não se encaixam retornam None e seguem para o Gemma. Na dúvida,
+# segue: depois de tirar da pergunta tudo o que foi reconhecido (intenção,
+# período, categoria/instituição e palavras vazias), sobrando qualquer palavra
+# ('uber', 'cinema', 'lazer' em 'Alimentação e Lazer') a pergunta vai ao LLM.
+# Com o arquivamento ligado (ARQUIVO_MESES em main.py), períodos que alcançam o
+# corte também leem entradas_arquivo/saidas_arquivo, como o SQL do LLM.
+
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Optional, List, Tuple
+
+import sqlglot
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+# ─── Normalização e formatação ──────────────────────────────────────────────
+def normalizar(texto: str) -> str:
+    """Minúsculas, sem acentos, pontuação trocada por espaço e espaços colapsados."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = re.sub(r"[^\w\s]", " ", texto)
+    return re.sub(r"\s+", " ", texto).strip()
+
+def formatar_reais(valor) -> str:
+    """Decimal/float → 'R$ 1.234,56'."""
+    v = Decimal(str(valor or 0)).quantize(Decimal("0.01"))
+    sinal = "-" if v < 0 else ""
+    inteiro, centavos = f"{abs(v):,.2f}".split(".")
+    return f"{sinal}R$ {inteiro.replace(',', '.')},{centavos}"
+
+def formatar_data(valor) -> str:
+    if isinstance(valor, str):
+        try:
+            valor = datetime.fromisoformat(valor)
+        except ValueError:
+            return valor
+    return valor.strftime("%d/%m/%Y") if isinstance(valor, datetime) else str(valor)
+
+# ─── Períodos ────────────────────────────────────────────────────────────────
+MESES = ["janeiro", "fevereiro", "marco", "abril", "maio", "junho", "julho",
+         "agosto", "setembro", "outubro", "novembro", "dezembro"]
+
+def _inicio_do_dia(d: datetime) -> datetime:
+    return d.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _limites_mes(ano: int, mes: int) -> Tuple[datetime, datetime]:
+    inicio = datetime(ano, mes, 1)
+    prox = datetime(ano + 1, 1, 1) if mes == 12 else datetime(ano, mes + 1, 1)
+    return inicio, prox - timedelta(microseconds=1)
+
+def _limites_ano(ano: int) -> Tuple[datetime, datetime]:
+    return datetime(ano, 1, 1), datetime(ano + 1, 1, 1) - timedelta(microseconds=1)
+
+def limites_periodo(nome: str, agora: datetime) -> Tuple[datetime, datetime]:
+    """Início e fim (inclusivos) de hoje/semana/mes/ano e dos períodos anteriores."""
+    hoje = _inicio_do_dia(agora)
+    seg = hoje - timedelta(days=hoje.weekday())
+    if nome == "hoje":
+        return hoje, hoje + timedelta(days=1) - timedelta(microseconds=1)
+    if nome == "semana":
+        return seg, seg + timedelta(days=7) - timedelta(microseconds=1)
+    if nome == "semana_passada":
+        return seg - timedelta(days=7), seg - timedelta(microseconds=1)
+    if nome == "mes":
+        return _limites_mes(agora.year, agora.month)
+    if nome == "mes_passado":
+        ano, mes = (agora.year - 1, 12) if agora.month == 1 else (agora.year, agora.month - 1)
+        return _limites_mes(ano, mes)
+    if nome == "ano":
+        return _limites_ano(agora.year)
+    if nome == "ano_passado":
+        return _limites_ano(agora.year - 1)
+    raise ValueError(nome)
+
+_DESCRICAO_PERIODO = {
+    "hoje": "hoje", "semana": "nesta semana", "semana_passada": "na semana passada",
+    "mes": "neste mês", "mes_passado": "no mês passado",
+    "ano": "neste ano", "ano_passado": "no ano passado",
+}
+
+_PADROES_PERIODO = [
+    ("semana_passada", r"\b(semana passada|ultima semana)\b"),
+    ("mes_passado",    r"\b(mes passado|ultimo mes)\b"),
+    ("ano_passado",    r"\b(ano passado|ultimo ano)\b"),
+    ("hoje",           r"\bhoje\b"),
+    ("semana",         r"\bsemana\b"),
+    ("mes",            r"\bmes\b"),
+    ("ano",            r"\bano\b"),
+]
+
+_RELATIVOS = r"\b(semana passada|ultima semana|mes passado|ultimo mes|ano passado|ultimo ano|semana|mes|ano)\b"
+
+def varios_periodos(q: str) -> bool:
+    """A pergunta cita mais de um período ('de 2025 e 2020', 'este mês e o
+    passado'); detectar_periodo só enxergaria o primeiro."""
+    anos = set(re.findall(r"\b(?:20|19)\d{2}\b", q))
+    meses = [m for m in MESES if re.search(rf"\b{m}\b", q)]
+    if len(anos) > 1 or len(meses) > 1:
+        return True
+    return not anos and not meses and len(re.findall(_RELATIVOS, q)) > 1
+
+def detectar_periodo(q: str, agora: datetime):
+    """Retorna (inicio, fim, descricao) ou None se a pergunta não cita período."""
+    ano_expl = re.search(r"\b(20\d{2}|19\d{2})\b", q)
+    for i, nome_mes in enumerate(MESES, start=1):
+        if re.search(rf"\b{nome_mes}\b", q):
+            ano = int(ano_expl.group(1)) if ano_expl else agora.year
+            ini, fim = _limites_mes(ano, i)
+            return ini, fim, f"em {nome_mes.replace('marco', 'março')} de {ano}"
+    if ano_expl:
+        ano = int(ano_expl.group(1))
+        ini, fim = _limites_ano(ano)
+        return ini, fim, f"em {ano}"
+    for nome, padrao in _PADROES_PERIODO:
+        if re.search(padrao, q):
+            ini, fim = limites_periodo(nome, agora)
+            return ini, fim, _DESCRICAO_PERIODO[nome]
+    return None
+
+# ─── Intenções ───────────────────────────────────────────────────────────────
+_SAIDAS   = r"\b(gastos?|gastei|despesas?|saidas?|paguei|pagamentos?|compras?)\b"
+_ENTRADAS = r"\b(entradas?|receitas?|recebi|ganhei|ganhos?|rendas?|rendimentos?)\b"
+_ULTIMAS  = r"\b(ultim[oa]s?|mais recentes?|recentes)\b"
+_LISTAR   = r"\b(liste|listar|lista|mostre|mostrar|mostra|exiba|exibir|quais)\b"
+_SOMAR    = r"\b(quanto|total|totais|soma|somam|valor)\b"
+_SALDO    = r"\bsaldo\b"
+# Perguntas que pedem cálculo/comparação fora do que a rota rápida sabe fazer:
+# contagem, negação, comparação de valor, outros dias relativos ('ontem', 'até hoje'),
+# janelas móveis ('últimos 3 meses') e dias do mês ('2 de outubro')
+_RECUSAR  = (r"\b(media|medias|compar\w*|maior|menor|maiores|menores|porcent\w*|percent\w*"
+             r"|cada|por categoria|por instituicao|por mes|evolucao|tendencia|previs\w*|salario"
+             r"|quant[oa]s|quantidade|numero de|fora|exceto|excluindo|tirando|menos|sem|nao"
+             r"|acima|abaixo|mais de|entre|desde|ate|antes|depois"
+             r"|ontem|anteontem|amanha|dias?"
+             r"|ultim[oa]s \w+ (semanas|meses|anos)"
+             rf"|\d{{1,2}} (de )?({'|'.join(MESES)}))\b")
+
+# Palavras que a rota rápida reconhece (intenções, períodos) ou que não mudam o
+# sentido da pergunta; qualquer outra que sobrar manda a pergunta para o LLM
+_CONHECIDAS = set("""
+    gasto gastos gastei despesa despesas saida saidas paguei pagamento pagamentos compra compras
+    entrada entradas receita receitas recebi ganhei ganho ganhos renda rendas rendimento rendimentos
+    ultimo ultima ultimos ultimas mais recente recentes liste listar lista mostre mostrar mostra exiba exibir
+    quais qual quanto total totais soma somam valor saldo atual
+    hoje semana mes ano passado passada este esta neste nesta deste desta nesse nessa desse dessa
+    o a os as um uma de do da dos das em no na nos nas com para pra meu minha meus minhas me
+    eu que e foi foram tive tenho fiz ja por favor categoria instituicao
+""".split()) | set(MESES)
+
+_NUMEROS = {"dois": 2, "duas": 2, "tres": 3, "quatro": 4, "cinco": 5,
+            "seis": 6, "sete": 7, "oito": 8, "nove": 9, "dez": 10, "vinte": 20}
+LIMITE_LISTA = 50
+
+def _quantidade(q: str, padrao: int = 5) -> int:
+    m = re.search(r"\b(\d{1,3})\b(?! ?(?:de|/) ?\d)", q)
+    n = int(m.group(1)) if m else None
+    if n is None:
+        for palavra, valor in _NUMEROS.items():
+            if re.search(rf"\b{palavra}\b", q):
+                n = valor
+                break
+    return max(1, min(n or padrao, LIMITE_LISTA))
+
+def _nomes_do_usuario(db: Session, usuario_id: int, arquivo: Optional[Dict[str, str]] = None):
+    """Categorias e instituições já usadas pelo usuário, para casar com a pergunta."""
+    saidas = ["saidas"] + ([arquivo["saidas"]] if arquivo else [])
+    todas = saidas + ["entradas"] + ([arquivo["entradas"]] if arquivo else [])
+    cats = [r[0] for r in db.execute(text(" UNION ".join(
+        f"SELECT DISTINCT categoria FROM {t} WHERE usuario_id = :u" for t in saidas)), {"u": usuario_id})]
+    insts = [r[0] for r in db.execute(text(" UNION ".join(
+        f"SELECT DISTINCT instituicao FROM {t} WHERE usuario_id = :u" for t in todas)), {"u": usuario_id})]
+    return cats, insts
+
+def _casar_nome(q: str, nomes: List[str]) -> Optional[str]:
+    # nomes mais longos primeiro, para 'Banco do Brasil' ganhar de 'Brasil'
+    for nome in sorted((n for n in nomes if n), key=len, reverse=True):
+        alvo = normalizar(nome)
+        if alvo and re.search(rf"\b{re.escape(alvo)}\b", q):
+            return nome
+    return None
+
+def _descrever(base: str, categoria, instituicao, periodo) -> str:
+    partes = [base]
+    if categoria:
+        partes.append(f"em {categoria}")
+    if instituicao:
+        partes.append(f"na instituição {instituicao}")
+    if periodo:
+        partes.append(periodo[2])
+    return " ".join(partes)
+
+def _filtros_sql(usuario_id, categoria, instituicao, periodo):
+    cond = ["usuario_id = :u"]; params = {"u": usuario_id}
+    if categoria:
+        cond.append("categoria = :cat"); params["cat"] = categoria
+    if instituicao:
+        cond.append("instituicao = :inst"); params["inst"] = instituicao
+    if periodo:
+        cond.append("data BETWEEN :ini AND :fim"); params["ini"], params["fim"] = periodo[0], periodo[1]
+    return " AND ".join(cond), params
+
+def _saldo(db: Session, usuario_id: int) -> str:
+    row = db.execute(
+        text("SELECT saldo, total_entradas, total_saidas FROM carteira WHERE usuario_id = :u"),
+        {"u": usuario_id},
+    ).first()
+    if row is None:
+        row = db.execute(text(
+            "SELECT e.t - s.t, e.t, s.t FROM "
+            "(SELECT COALESCE(SUM(valor), 0) AS t FROM entradas WHERE usuario_id = :u) e, "
+            "(SELECT COALESCE(SUM(valor), 0) AS t FROM saidas WHERE usuario_id = :u) s"),
+            {"u": usuario_id},
+        ).first()
+    saldo, ent, sai = row
+    return (f"Seu saldo atual é {formatar_reais(saldo)} "
+            f"(entradas: {formatar_reais(ent)}; saídas: {formatar_reais(sai)}).")
+
+def _soma(db: Session, tabela: str, usuario_id, categoria, instituicao, periodo, arquivada=None) -> str:
+    where, params = _filtros_sql(usuario_id, categoria, instituicao, periodo)
+    total = sum(db.execute(text(f"SELECT COALESCE(SUM(valor), 0) FROM {t} WHERE {where}"), params).scalar()
+                for t in [tabela] + ([arquivada] if arquivada else []))
+    base = "Seus gastos" if tabela == "saidas" else "Suas entradas"
+    desc = _descrever(base, categoria, instituicao, periodo)
+    if not total:
+        nada = "gastos" if tabela == "saidas" else "entradas"
+        return f"Não encontrei {_descrever(nada, categoria, instituicao, periodo)}."
+    return f"{desc} somam {formatar_reais(total)}."
+
+def _ultimas(db: Session, tabela: str, usuario_id, n, categoria, instituicao, periodo, arquivada=None) -> str:
+    where, params = _filtros_sql(usuario_id, categoria, instituicao, periodo)
+    extra = ", categoria" if tabela == "saidas" else ""
+    partes = [f"SELECT descricao, instituicao, valor, data{extra}, id FROM {t} WHERE {where}"
+              for t in [tabela] + ([arquivada] if arquivada else [])]
+    linhas = db.execute(text(
+        f"SELECT * FROM ({' UNION ALL '.join(partes)}) AS u ORDER BY data DESC, id DESC LIMIT {int(n)}"),
+        params).all()
+    nome = "saídas" if tabela == "saidas" else "entradas"
+    if not linhas:
+        return f"Não encontrei {_descrever(nome, categoria, instituicao, periodo)}."
+    cab = _descrever(f"Suas {len(linhas)} {nome} mais recentes", categoria, instituicao, periodo)
+    itens = []
+    for l in linhas:
+        desc = l[0] or "Sem descrição"
+        if tabela == "saidas":
+            desc += f" ({l[4]})"
+        itens.append(f"- {formatar_data(l[3])}: {desc}, {l[1]}, {formatar_reais(l[2])}")
+    return cab + ":\n" + "\n".join(itens)
+
+def _sobra_algo(q: str, nomes: List[Optional[str]], lista: bool) -> bool:
+    """Sobra alguma palavra não reconhecida depois de tirar da pergunta os
+    `nomes` casados (categoria/instituição) e o vocabulário conhecido? Numa
+    lista, um número (a quantidade) também é reconhecido."""
+    for nome in nomes:
+        if nome:
+            q = re.sub(rf"\b{re.escape(normalizar(nome))}\b", " ", q, count=1)
+    palavras = [p for p in q.split() if p not in _CONHECIDAS and not re.fullmatch(r"(19|20)\d{2}", p)]
+    if lista:
+        quantidade = next((p for p in palavras if p.isdigit() or p in _NUMEROS), None)
+        if quantidade is not None:
+            palavras.remove(quantidade)
+    return bool(palavras)
+
+def responder(db: Session, usuario_id: int, pergunta: str, agora: Optional[datetime] = None,
+              arquivo: Optional[Dict[str, str]] = None, corte: Optional[datetime] = None) -> Optional[str]:
+    """Responde perguntas comuns sem o LLM; None quando a pergunta não é reconhecida.
+    `arquivo` ({tabela: tabela de arquivo}) e `corte`: linhas anteriores ao corte
+    podem estar no arquivo."""
+    q = normalizar(pergunta)
+    if not q or re.search(_RECUSAR, q) or varios_periodos(q):
+        return None
+    agora = agora or datetime.now()
+
+    quer_saidas = bool(re.search(_SAIDAS, q)) or q.startswith("quanto gastei")
+    quer_entradas = bool(re.search(_ENTRADAS, q))
+    periodo = detectar_periodo(q, agora)
+
+    if re.search(_SALDO, q):
+        if quer_saidas or quer_entradas or periodo or _sobra_algo(q, [], lista=False):
+            return None
+        return _saldo(db, usuario_id)
+
+    if quer_saidas == quer_entradas:  # nenhum ou os dois: ambíguo
+        return None
+    tabela = "saidas" if quer_saidas else "entradas"
+
+    if corte is None or (periodo is not None and periodo[0] >= corte):
+        arquivo = None
+    cats, insts = _nomes_do_usuario(db, usuario_id, arquivo)
+    categoria = _casar_nome(q, cats)
+    instituicao = _casar_nome(q, insts)
+    if categoria and tabela == "entradas":
+        return None
+
+    # 'último mês'/'última semana' são período, não pedido de lista
+    pede_lista = (re.search(_ULTIMAS, re.sub(r"\bultim[oa] (semana|mes|ano)\b", "", q))
+                  or (re.search(_LISTAR, q) and not re.search(_SOMAR, q)))
+    if _sobra_algo(q, [categoria, instituicao], lista=bool(pede_lista)):
+        return None
+    if pede_lista:
+        return _ultimas(db, tabela, usuario_id, _quantidade(q), categoria, instituicao, periodo,
+                        arquivo and arquivo[tabela])
+    if re.search(_SOMAR, q) or categoria or periodo:
+        return _soma(db, tabela, usuario_id, categoria, instituicao, periodo, arquivo and arquivo[tabela])
+    return None
+
+# ─── Respostas a partir do resultado do SQL ──────────────────────────────────
+# Quando o SQL do passo 1 devolve um formato simples (um número, o trio de
+# saldo ou uma lista curta), a frase é montada aqui e o passo 3 (segunda
+# chamada ao Gemma) é pulado. O tipo de cada coluna sai da expressão do SELECT
+# quando há uma (um alias `total` pode ser SUM(valor) ou COUNT(*)) e do nome
+# da coluna quando não há.
+MAX_LINHAS_RENDER = 20
+MAX_COLUNAS_RENDER = 6
+
+_ROTULOS_SALDO = {"saldo": "Saldo", "total_entradas": "Entradas", "total_saidas": "Saídas"}
+# colunas de texto que sabemos apresentar; qualquer outra vai para o Gemma
+_COLUNAS_TEXTO = {"descricao", "categoria", "subcategoria", "instituicao", "tipo", "mes", "ano"}
+# COUNT(DISTINCT <coluna>) que sabemos nomear; COUNT(*)/COUNT(coluna) contam lançamentos
+_CONTAGENS = {"categoria": ("categoria", "categorias"), "subcategoria": ("subcategoria", "subcategorias"),
+              "instituicao": ("instituição", "instituições")}
+_LANCAMENTOS = ("lançamento", "lançamentos")
+
+def _tipo_coluna(nome: str) -> str:
+    n = normalizar(nome).replace(" ", "_")
+    if "count" in n or "quantidade" in n or n.startswith("qtd") or n in ("n", "num", "numero", "total_registros"):
+        return "contagem"
+    if "avg" in n or "media" in n:
+        return "media"
+    if any(p in n for p in ("sum", "total", "valor", "saldo", "soma", "gasto", "receita")):
+        return "dinheiro"
+    if n == "data" or n.startswith("data_") or n.endswith("_data") or n in ("dia", "ultima_data"):
+        return "data"
+    return "texto"
+
+def _expressoes(sql: Optional[str]) -> Dict[str, exp.Expression]:
+    """{alias em minúsculas: expressão} das colunas com alias no SELECT."""
+    if not sql:
+        return {}
+    try:
+        arvore = sqlglot.parse_one(sql, read="mysql")
+    except SqlglotError:
+        return {}
+    if not isinstance(arvore, exp.Query):
+        return {}
+    return {e.alias.lower(): e.this for e in arvore.selects if isinstance(e, exp.Alias)}
+
+def _expressao(nome: str, expressoes: Dict[str, exp.Expression]) -> Optional[exp.Expression]:
+    """A expressão por trás de uma coluna do resultado: a do alias ou, sem
+    alias, o próprio nome (o banco devolve o texto, ex. 'COUNT(DISTINCT categoria)')."""
+    if nome.lower() in expressoes:
+        return expressoes[nome.lower()]
+    if "(" not in nome:
+        return None
+    try:
+        return sqlglot.parse_one(nome, read="mysql")
+    except SqlglotError:
+        return None
+
+def _tipo_expressao(expr: exp.Expression) -> Optional[str]:
+    """contagem só com COUNT, dinheiro só com SUM sobre valor e media só com
+    AVG sobre valor; "outro" (vai ao Gemma) para as demais agregações; None
+    quando não há agregação e vale o nome da coluna."""
+    if isinstance(expr, exp.Column):
+        return _tipo_coluna(expr.name)
+    agregacoes = list(expr.find_all(exp.AggFunc))
+    if not agregacoes:
+        return None
+    if all(isinstance(a, exp.Count) for a in agregacoes):
+        return "contagem"
+    colunas = {c.name.lower() for a in agregacoes for c in a.find_all(exp.Column)}
+    if colunas != {"valor"}:
+        return "outro"
+    if all(isinstance(a, exp.Sum) for a in agregacoes):
+        return "dinheiro"
+    if all(isinstance(a, exp.Avg) for a in agregacoes):
+        return "media"
+    return "outro"
+
+def _tipos_colunas(linha: dict, sql: Optional[str]) -> Dict[str, str]:
+    expressoes = _expressoes(sql)
+    tipos = {}
+    for nome in linha:
+        expr = _expressao(nome, expressoes)
+        tipos[nome] = (_tipo_expressao(expr) if expr is not None else None) or _tipo_coluna(nome)
+    return tipos
+
+def _contado(nome: str, sql: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(singular, plural) do que uma coluna de contagem conta, ou None se não
+    sabemos dizer (COUNT(DISTINCT descricao), contas com mais de um COUNT...)."""
+    expr = _expressao(nome, _expressoes(sql))
+    if expr is None:
+        return _LANCAMENTOS
+    contagens = list(expr.find_all(exp.Count))
+    if len(contagens) != 1 or contagens[0] is not expr:
+        return None
+    alvo = contagens[0].this
+    if isinstance(alvo, exp.Distinct):
+        colunas = alvo.expressions
+        if len(colunas) == 1 and isinstance(colunas[0], exp.Column):
+            return _CONTAGENS.get(colunas[0].name.lower())
+        return None
+    return _LANCAMENTOS
+
+def _formatar_valor(tipo: str, valor) -> str:
+    if valor is None:
+        return "—"
+    if tipo in ("dinheiro", "media") and isinstance(valor, (int, float, Decimal)):
+        return formatar_reais(valor)
+    if tipo == "data":
+        return formatar_data(valor)
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+def _linha_como_texto(linha: dict, tipos: Dict[str, str]) -> str:
+    cols = list(linha)
+    # 'data: descricao (categoria), instituicao, valor' quando as colunas usuais estão presentes
+    partes = []
+    datas = [c for c in cols if tipos[c] == "data"]
+    resto = [c for c in cols if c not in datas]
+    rotulo = [
+        "Sem descrição" if c == "descricao" and not linha[c] else _formatar_valor(tipos[c], linha[c])
+        for c in resto if tipos[c] == "texto" and c != "categoria"
+    ]
+    if "categoria" in linha and linha["categoria"]:
+        if rotulo:
+            rotulo[0] = f"{rotulo[0]} ({linha['categoria']})"
+        else:
+            rotulo.append(str(linha["categoria"]))
+    valores = [_formatar_valor(tipos[c], linha[c]) for c in resto if tipos[c] != "texto"]
+    cabeca = ", ".join(rotulo)
+    if datas:
+        partes.append(_formatar_valor("data", linha[datas[0]]))
+    corpo = ", ".join(p for p in [cabeca] + valores if p)
+    if partes and corpo:
+        return f"{partes[0]}: {corpo}"
+    if len(rotulo) == 1 and valores and not partes:
+        return f"{cabeca}: {', '.join(valores)}"
+    return partes[0] if partes else corpo
+
+def renderizar_resultado(resultados: list, sql: Optional[str] = None) -> Optional[str]:
+    """Frase em pt-BR para resultados de formato conhecido; None para deixar o
+    Gemma formatar. `sql` é a consulta que gerou os resultados."""
+    if not resultados or all(r is None or (isinstance(r, dict) and all(v is None for v in r.values()))
+                             for r in resultados):
+        return "Não encontrei dados para a sua solicitação."
+    if len(resultados) > MAX_LINHAS_RENDER or not all(isinstance(r, dict) for r in resultados):
+        return None
+    if any(len(r) > MAX_COLUNAS_RENDER or not r for r in resultados):
+        return None
+    tipos = _tipos_colunas(resultados[0], sql)
+    if any(t == "outro" or (t == "texto" and normalizar(c) not in _COLUNAS_TEXTO) for c, t in tipos.items()):
+        return None
+
+    if len(resultados) == 1:
+        linha = resultados[0]
+        nomes = {normalizar(c).replace(" ", "_"): c for c in linha}
+        if "saldo" in nomes and set(nomes) <= set(_ROTULOS_SALDO):
+            if any(tipos[c] != "dinheiro" for c in linha):
+                return None
+            saldo = linha[nomes["saldo"]]
+            if saldo is None and {"total_entradas", "total_saidas"} <= set(nomes):
+                # SUM sem linhas vira NULL e contamina a subtração no SQL
+                saldo = (linha[nomes["total_entradas"]] or 0) - (linha[nomes["total_saidas"]] or 0)
+            extras = [f"{_ROTULOS_SALDO[n].lower()}: {formatar_reais(linha[c])}"
+                      for n, c in nomes.items() if n != "saldo"]
+            return f"Seu saldo é {formatar_reais(saldo)}" + (f" ({'; '.join(extras)})." if extras else ".")
+        if len(linha) == 1:
+            nome, valor = next(iter(linha.items()))
+            tipo = tipos[nome]
+            if tipo == "contagem" and isinstance(valor, (int, float, Decimal)):
+                contado = _contado(nome, sql)
+                if contado is None:
+                    return None
+                n = int(valor)
+                return f"Encontrei {n} {contado[0] if n == 1 else contado[1]}."
+            if tipo == "media" and isinstance(valor, (int, float, Decimal)):
+                return f"A média é {formatar_reais(valor)}."
+            if tipo == "dinheiro" and isinstance(valor, (int, float, Decimal)):
+                return f"O total é {formatar_reais(valor)}."
+            if tipo == "data":
+                return f"A data é {formatar_data(valor)}."
+            return None
+
+    itens = [f"- {_linha_como_texto(r, tipos)}" for r in resultados]
+    n = len(resultados)
+    return f"Encontrei {n} resultado{'s' if n != 1 else ''}:\n" + "\n".join(itens)
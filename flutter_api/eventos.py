@@ -0,0 +1,176 @@
+# Feed de alterações por usuário (GET /api/eventos/{usuario_id}, Server-Sent Events).
+# Os endpoints de escrita publicam, depois do commit, um evento pequeno com a
+# linha criada/alterada/removida, a carteira e os totais por categoria; o app
+# aplica o delta na tela em vez de refazer /api/dashboard a cada escrita.
+#
+# O broker faz o fan-out para as conexões abertas:
+#   - BrokerMemoria: só as conexões deste processo (um worker, testes).
+#   - BrokerRedis (EVENTOS_REDIS_URL): publica num canal do Redis e cada worker
+#     repassa aos seus assinantes locais, então uma escrita no worker A chega a
+#     quem está conectado no worker B.
+# Qualquer objeto com publicar(usuario_id, evento), assinar(usuario_id),
+# tem_assinantes(usuario_id) e encerrar() serve como broker.
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+FILA_MAXIMA = 100   # eventos pendentes por conexão; acima disso o cliente recebe "recarregar"
+ENCERRAR = {"acao": "encerrar"}   # não vai ao cliente: o stream termina (worker saindo)
+
+
+class Assinatura:
+    """Fila de eventos de uma conexão. publicar() pode vir de qualquer thread
+    (os handlers síncronos rodam no threadpool): a entrega passa pelo loop da conexão."""
+
+    def __init__(self, usuario_id: int, max_fila: int = FILA_MAXIMA):
+        self.usuario_id = usuario_id
+        self._loop = asyncio.get_running_loop()
+        self._fila: asyncio.Queue = asyncio.Queue(max_fila)
+        self.perdeu = False   # fila estourou: eventos foram descartados
+        self.encerrada = False
+
+    def _colocar(self, evento: dict):
+        try:
+            self._fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.perdeu = True
+
+    def entregar(self, evento: dict):
+        try:
+            self._loop.call_soon_threadsafe(self._colocar, evento)
+        except RuntimeError:  # loop já fechado
+            pass
+
+    def encerrar(self):
+        self.encerrada = True
+        self.entregar(ENCERRAR)   # acorda quem espera em proximo()
+
+    async def proximo(self, timeout: float) -> Optional[dict]:
+        """Próximo evento, ou None se nada chegar em `timeout` segundos; ENCERRAR
+        depois de encerrar()."""
+        if self.encerrada:
+            return ENCERRAR
+        if self.perdeu and self._fila.empty():
+            self.perdeu = False
+            return {"acao": "recarregar"}
+        try:
+            return await asyncio.wait_for(self._fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BrokerMemoria:
+    def __init__(self):
+        self._assinantes: Dict[int, Set[Assinatura]] = {}
+        self._lock = threading.Lock()
+        self.publicados = 0
+
+    def tem_assinantes(self, usuario_id: int) -> bool:
+        return bool(self._assinantes.get(usuario_id))
+
+    def conexoes(self) -> int:
+        with self._lock:
+            return sum(map(len, self._assinantes.values()))
+
+    def assinar(self, usuario_id: int) -> "_Contexto":
+        return _Contexto(self, usuario_id)
+
+    def _registrar(self, assinatura: Assinatura):
+        with self._lock:
+            self._assinantes.setdefault(assinatura.usuario_id, set()).add(assinatura)
+
+    def _remover(self, assinatura: Assinatura):
+        with self._lock:
+            conjunto = self._assinantes.get(assinatura.usuario_id)
+            if conjunto is not None:
+                conjunto.discard(assinatura)
+                if not conjunto:
+                    del self._assinantes[assinatura.usuario_id]
+
+    def _entregar(self, usuario_id: int, evento: dict):
+        with self._lock:
+            destinos = list(self._assinantes.get(usuario_id, ()))
+        for assinatura in destinos:
+            assinatura.entregar(evento)
+
+    def publicar(self, usuario_id: int, evento: dict):
+        self.publicados += 1
+        self._entregar(usuario_id, evento)
+
+    def encerrar(self):
+        """Termina as conexões deste processo (o worker está saindo): cada
+        EventSource reconecta depois do `retry`, em outro worker."""
+        with self._lock:
+            destinos = [a for conjunto in self._assinantes.values() for a in conjunto]
+        for assinatura in destinos:
+            assinatura.encerrar()
+
+
+class _Contexto:
+    """async with broker.assinar(uid) as assinatura: ... (remove a fila ao sair)."""
+
+    def __init__(self, broker: BrokerMemoria, usuario_id: int):
+        self._broker = broker
+        self._usuario_id = usuario_id
+        self._assinatura: Optional[Assinatura] = None
+
+    async def __aenter__(self) -> Assinatura:
+        self._assinatura = Assinatura(self._usuario_id)
+        self._broker._registrar(self._assinatura)
+        return self._assinatura
+
+    async def __aexit__(self, *exc):
+        self._broker._remover(self._assinatura)
+
+
+class BrokerRedis(BrokerMemoria):
+    """Publica em `{prefixo}:eventos:{usuario_id}`; uma thread por processo escuta
+    o padrão `{prefixo}:eventos:*` e entrega aos assinantes locais. Como não dá
+    para saber se outro worker tem conexões do usuário, tem_assinantes() é sempre True."""
+
+    def __init__(self, url: str, prefixo: str = "cf"):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:  # dependência opcional
+            raise RuntimeError("EVENTOS_REDIS_URL definido mas o pacote 'redis' não está instalado") from e
+        self._r = redis.Redis.from_url(url)
+        self.prefixo = prefixo
+        self._ouvinte: Optional[threading.Thread] = None
+
+    def tem_assinantes(self, usuario_id: int) -> bool:
+        return True
+
+    def _registrar(self, assinatura: Assinatura):
+        super()._registrar(assinatura)
+        with self._lock:
+            if self._ouvinte is None:
+                self._ouvinte = threading.Thread(target=self._ouvir, name="eventos-redis", daemon=True)
+                self._ouvinte.start()
+
+    def _ouvir(self):
+        inicio = len(f"{self.prefixo}:eventos:")
+        while True:
+            try:
+                pubsub = self._r.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{self.prefixo}:eventos:*")
+                for msg in pubsub.listen():
+                    canal = msg["channel"].decode()
+                    self._entregar(int(canal[inicio:]), json.loads(msg["data"]))
+            except Exception:
+                logger.exception("Conexão de eventos com o Redis caiu; reconectando")
+                # o que foi publicado enquanto isso se perdeu: todos recarregam
+                with self._lock:
+                    usuarios = list(self._assinantes)
+                for uid in usuarios:
+                    self._entregar(uid, {"acao": "recarregar"})
+                threading.Event().wait(1)
+
+    def publicar(self, usuario_id: int, evento: dict):
+        self.publicados += 1
+        self._r.publish(f"{self.prefixo}:eventos:{usuario_id}", json.dumps(evento, default=str))
@@ -0,0 +1,255 @@
+# Escrita do histórico exportado (CSV, Parquet e XLSX) em pedaços de bytes.
+# Cada formato recebe os lançamentos em lotes (tuplas na ordem de COLUNAS) e
+# devolve os bytes prontos para enviar; só o lote atual (no Parquet, o row
+# group atual) fica na memória. A leitura do banco fica em main.py.
+#   CSV:     UTF-8, separador vírgula, valores com ponto decimal exatos.
+#   Parquet: pyarrow (dependência opcional), valor como decimal128(10, 2),
+#            um row group a cada LINHAS_POR_GRUPO linhas.
+#   XLSX:    SpreadsheetML escrito direto num zip em stream (só biblioteca
+#            padrão); uma planilha nova a cada MAX_LINHAS_PLANILHA linhas.
+
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from typing import List, Sequence
+from xml.sax.saxutils import escape
+
+COLUNAS = ("tipo", "id", "data", "descricao", "instituicao", "categoria", "subcategoria", "valor")
+LINHAS_POR_GRUPO = 50_000
+MAX_LINHAS_PLANILHA = 1_048_575   # limite do Excel, menos o cabeçalho
+
+
+class _Saida:
+    """Destino de escrita que só acumula bytes até alguém os retirar."""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+        self.closed = False
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def retirar(self) -> bytes:
+        dados, self._partes = b"".join(self._partes), []
+        return dados
+
+
+class Exportador:
+    media_type = "application/octet-stream"
+    extensao = ""
+
+    def inicio(self) -> bytes:
+        return b""
+
+    def lote(self, linhas: Sequence[tuple]) -> bytes:
+        raise NotImplementedError
+
+    def fim(self) -> bytes:
+        return b""
+
+
+# ─── CSV ─────────────────────────────────────────────────────────────────────
+class ExportadorCSV(Exportador):
+    media_type = "text/csv; charset=utf-8"
+    extensao = "csv"
+
+    def __init__(self):
+        self._texto = io.StringIO()
+        self._csv = csv.writer(self._texto, lineterminator="\n")
+
+    def _retirar(self) -> bytes:
+        dados = self._texto.getvalue().encode("utf-8")
+        self._texto.seek(0)
+        self._texto.truncate()
+        return dados
+
+    def inicio(self) -> bytes:
+        self._csv.writerow(COLUNAS)
+        return self._retirar()
+
+    def lote(self, linhas: Sequence[tuple]) -> bytes:
+        self._csv.writerows(
+            (tipo, id_, data.isoformat(sep=" "), descricao, inst, cat, sub, valor)
+            for tipo, id_, data, descricao, inst, cat, sub, valor in linhas
+        )
+        return self._retirar()
+
+
+# ─── Parquet ─────────────────────────────────────────────────────────────────
+class ExportadorParquet(Exportador):
+    media_type = "application/vnd.apache.parquet"
+    extensao = "parquet"
+
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:  # dependência opcional
+            raise RuntimeError("exportação em Parquet requer o pacote 'pyarrow'") from e
+        self._pa = pa
+        self._esquema = pa.schema([
+            ("tipo", pa.string()), ("id", pa.int64()), ("data", pa.timestamp("us")),
+            ("descricao", pa.string()), ("instituicao", pa.string()), ("categoria", pa.string()),
+            ("subcategoria", pa.string()), ("valor", pa.decimal128(10, 2)),
+        ])
+        self._saida = _Saida()
+        self._escritor = pq.ParquetWriter(self._saida, self._esquema, compression="zstd")
+        self._pendentes: List[tuple] = []
+
+    def _gravar_grupo(self) -> bytes:
+        colunas = list(zip(*self._pendentes))
+        self._pendentes = []
+        tabela = self._pa.Table.from_arrays(
+            [self._pa.array(col, type=campo.type) for col, campo in zip(colunas, self._esquema)],
+            schema=self._esquema)
+        self._escritor.write_table(tabela, row_group_size=tabela.num_rows)
+        return self._saida.retirar()
+
+    def lote(self, linhas: Sequence[tuple]) -> bytes:
+        self._pendentes.extend(linhas)
+        if len(self._pendentes) < LINHAS_POR_GRUPO:
+            return b""
+        return self._gravar_grupo()
+
+    def fim(self) -> bytes:
+        dados = self._gravar_grupo() if self._pendentes else b""
+        self._escritor.close()
+        return dados + self._saida.retirar()
+
+
+# ─── XLSX ────────────────────────────────────────────────────────────────────
+_CONTROLE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")   # proibidos em XML 1.0
+_EPOCA_EXCEL = datetime(1899, 12, 30)
+_LETRAS = [chr(ord("A") + i) for i in range(len(COLUNAS))]
+
+# estilos (índices em cellXfs): 0 padrão, 1 moeda, 2 data e hora, 3 cabeçalho
+_MOEDA, _DATA, _NEGRITO = ' s="1"', ' s="2"', ' s="3"'
+_ESTILOS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy hh:mm:ss"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+def _texto(ref: str, valor, estilo: str = "") -> str:
+    if valor is None:
+        return ""
+    return f'<c r="{ref}" t="inlineStr"{estilo}><is><t xml:space="preserve">{escape(_CONTROLE.sub("", str(valor)))}</t></is></c>'
+
+def _numero(ref: str, valor, estilo: str = "") -> str:
+    return f'<c r="{ref}"{estilo}><v>{valor}</v></c>'
+
+
+class ExportadorXLSX(Exportador):
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    extensao = "xlsx"
+
+    def __init__(self):
+        self._saida = _Saida()
+        # destino sem seek: o zipfile grava os tamanhos em data descriptors
+        self._zip = zipfile.ZipFile(self._saida, "w", compression=zipfile.ZIP_DEFLATED)
+        self._planilha = None
+        self._planilhas = 0
+        self._linha = 0
+
+    def _abrir_planilha(self):
+        self._planilhas += 1
+        self._planilha = self._zip.open(f"xl/worksheets/sheet{self._planilhas}.xml", "w", force_zip64=True)
+        self._planilha.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            b'<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/>'
+            b'</sheetView></sheetViews><sheetData>')
+        celulas = "".join(_texto(f"{letra}1", nome, _NEGRITO) for letra, nome in zip(_LETRAS, COLUNAS))
+        self._planilha.write(f'<row r="1">{celulas}</row>'.encode())
+        self._linha = 1
+
+    def _fechar_planilha(self):
+        self._planilha.write(b"</sheetData></worksheet>")
+        self._planilha.close()
+        self._planilha = None
+
+    def inicio(self) -> bytes:
+        self._abrir_planilha()
+        return self._saida.retirar()
+
+    def lote(self, linhas: Sequence[tuple]) -> bytes:
+        partes = []
+        for tipo, id_, data, descricao, inst, cat, sub, valor in linhas:
+            if self._linha > MAX_LINHAS_PLANILHA:
+                self._planilha.write("".join(partes).encode())
+                partes = []
+                self._fechar_planilha()
+                self._abrir_planilha()
+            self._linha += 1
+            n = self._linha
+            serial = round((data - _EPOCA_EXCEL).total_seconds() / 86400, 8)
+            partes.append(
+                f'<row r="{n}">{_texto(f"A{n}", tipo)}{_numero(f"B{n}", id_)}{_numero(f"C{n}", serial, _DATA)}'
+                f'{_texto(f"D{n}", descricao)}{_texto(f"E{n}", inst)}{_texto(f"F{n}", cat)}'
+                f'{_texto(f"G{n}", sub)}{_numero(f"H{n}", valor, _MOEDA)}</row>'
+            )
+        self._planilha.write("".join(partes).encode())
+        return self._saida.retirar()
+
+    def fim(self) -> bytes:
+        self._fechar_planilha()
+        planilhas = range(1, self._planilhas + 1)
+        nome = lambda i: "Lançamentos" if self._planilhas == 1 else f"Lançamentos {i}"
+        self._zip.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for i in planilhas)
+            + '</Types>'))
+        self._zip.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+            'officeDocument" Target="xl/workbook.xml"/></Relationships>'))
+        self._zip.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + "".join(f'<sheet name="{nome(i)}" sheetId="{i}" r:id="rId{i}"/>' for i in planilhas)
+            + '</sheets></workbook>'))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                      f'relationships/worksheet" Target="worksheets/sheet{i}.xml"/>' for i in planilhas)
+            + f'<Relationship Id="rId{self._planilhas + 1}" Type="http://schemas.openxmlformats.org/'
+            'officeDocument/2006/relationships/styles" Target="styles.xml"/></Relationships>'))
+        self._zip.writestr("xl/styles.xml", _ESTILOS)
+        self._zip.close()
+        return self._saida.retirar()
+
+
+FORMATOS = {"csv": ExportadorCSV, "parquet": ExportadorParquet, "xlsx": ExportadorXLSX}
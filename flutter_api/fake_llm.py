@@ -0,0 +1,134 @@
+# Servidor falso compatível com /v1/chat/completions, para testar o chat sem GPU.
+# python fake_llm.py --porta 11434 --latencia 0.2 --latencia-token 0.01 --carga-modelo 5
+#
+# - Prompt de geração de SQL (passo 1): devolve a consulta de saldo do usuário
+#   citado no prompt.
+# - Qualquer outro prompt: devolve uma frase fixa, palavra por palavra quando
+#   a requisição pede stream=true.
+# - --carga-modelo: a primeira chamada (e a primeira depois de --keep-alive s
+#   parado) espera esse tempo a mais, como o Ollama carregando o modelo na GPU.
+# - Handler.chamadas conta as requisições recebidas e Handler.cancelados os
+#   streams que o cliente fechou no meio (usados pelos testes).
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SQL_SALDO = (
+    "SELECT (SELECT ROUND(SUM(valor), 2) FROM entradas WHERE usuario_id = {u}) - "
+    "(SELECT ROUND(SUM(valor), 2) FROM saidas WHERE usuario_id = {u}) AS saldo, "
+    "(SELECT ROUND(SUM(valor), 2) FROM entradas WHERE usuario_id = {u}) AS total_entradas, "
+    "(SELECT ROUND(SUM(valor), 2) FROM saidas WHERE usuario_id = {u}) AS total_saidas;"
+)
+RESPOSTA = "Aqui está o resultado da sua consulta, calculado a partir dos seus lançamentos."
+
+
+def responder(prompt: str) -> str:
+    m = re.search(r"usuario_id = (\d+)", prompt)
+    if "gere a consulta SQL" in prompt and m:
+        return SQL_SALDO.format(u=m.group(1))
+    return RESPOSTA
+
+
+class Handler(BaseHTTPRequestHandler):
+    latencia = 0.0
+    latencia_token = 0.0
+    carga_modelo = 0.0
+    keep_alive = 300.0
+    ultimo_uso = None
+    chamadas = 0
+    cancelados = 0
+    _carregando = threading.Lock()
+    _contando = threading.Lock()
+    protocol_version = "HTTP/1.1"
+
+    @classmethod
+    def _contar(cls, contador: str):
+        with cls._contando:
+            setattr(cls, contador, getattr(cls, contador) + 1)
+
+    @classmethod
+    def _carregar_modelo(cls):
+        with cls._carregando:   # chamadas simultâneas esperam a mesma carga
+            agora = time.monotonic()
+            if cls.ultimo_uso is None or agora - cls.ultimo_uso > cls.keep_alive:
+                time.sleep(cls.carga_modelo)
+            cls.ultimo_uso = time.monotonic()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        prompt = " ".join(m.get("content", "") for m in corpo.get("messages", []))
+        texto = responder(prompt)
+        self._contar("chamadas")
+        self._carregar_modelo()
+        time.sleep(self.latencia)
+
+        if not corpo.get("stream"):
+            dados = json.dumps({
+                "id": "fake", "object": "chat.completion", "model": corpo.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": texto},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(texto.split()),
+                          "total_tokens": len(prompt.split()) + len(texto.split())},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def enviar(linha: str):
+            bruto = linha.encode()
+            self.wfile.write(f"{len(bruto):x}\r\n".encode() + bruto + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            for palavra in re.findall(r"\S+\s*", texto):
+                chunk = {"choices": [{"index": 0, "delta": {"content": palavra}}]}
+                enviar(f"data: {json.dumps(chunk)}\n\n")
+                time.sleep(self.latencia_token)
+            if (corpo.get("stream_options") or {}).get("include_usage"):
+                uso = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(texto.split()),
+                       "total_tokens": len(prompt.split()) + len(texto.split())}
+                enviar(f"data: {json.dumps({'choices': [], 'usage': uso})}\n\n")
+            enviar("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self._contar("cancelados")  # cliente cancelou o stream
+
+
+def servir(porta: int = 11434, latencia: float = 0.0, latencia_token: float = 0.0,
+           carga_modelo: float = 0.0, keep_alive: float = 300.0) -> ThreadingHTTPServer:
+    Handler.latencia = latencia
+    Handler.latencia_token = latencia_token
+    Handler.carga_modelo = carga_modelo
+    Handler.keep_alive = keep_alive
+    Handler.ultimo_uso = None
+    Handler.chamadas = Handler.cancelados = 0
+    return ThreadingHTTPServer(("127.0.0.1", porta), Handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor falso OpenAI-compatível para o chat")
+    parser.add_argument("--porta", type=int, default=11434)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso antes de responder (s)")
+    parser.add_argument("--latencia-token", type=float, default=0.0, help="Atraso entre tokens no stream (s)")
+    parser.add_argument("--carga-modelo", type=float, default=0.0, help="Atraso da primeira chamada (s)")
+    parser.add_argument("--keep-alive", type=float, default=300.0, help="Ocioso por mais que isso, carrega de novo (s)")
+    args = parser.parse_args()
+    servidor = servir(args.porta, args.latencia, args.latencia_token, args.carga_modelo, args.keep_alive)
+    print(f"LLM falso em http://127.0.0.1:{args.porta}/v1/chat/completions")
+    servidor.serve_forever()
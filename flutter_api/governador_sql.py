@@ -0,0 +1,358 @@
+# Governador do SQL gerado pelo Gemma no passo 1 do /api/chat.
+# O SQL é convertido numa árvore (sqlglot) e só é executado se:
+#   - for um único SELECT (ou UNION de SELECTs), sem escrita, DDL, INTO,
+#     FOR UPDATE ou funções perigosas (SLEEP, BENCHMARK, LOAD_FILE, ...);
+#   - só ler tabelas conhecidas, nunca a coluna de senha (nem `*`/`t.*` num
+#     SELECT que alcança usuarios); uma CTE não pode ter o nome de uma delas;
+#   - cada referência a tabela estiver restrita ao usuário: o predicado
+#     `usuario_id = N` é conferido na cláusula do próprio SELECT e, se faltar,
+#     é injetado (um filtro para outro usuário recusa a consulta);
+#   - couber no orçamento de complexidade (joins, subconsultas, aninhamento) e
+#     não tiver produto cartesiano (join sem ON/USING).
+# O SELECT externo sempre sai com LIMIT <= max_linhas e, no MySQL, com a dica
+# MAX_EXECUTION_TIME. O resultado é o SQL reescrito no dialeto do banco.
+# Com `busca`, `descricao LIKE '%texto%'` em entradas/saidas vira o predicado do
+# índice textual (ver busca.py) em vez de varrer todas as linhas do usuário.
+# preparar_execucao() faz os ajustes que dependem da hora de executar (datas e
+# arquivo); eles ficam fora do template guardado no cache (ver cache_sql.py).
+
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError
+
+# tabela → coluna que identifica o dono da linha
+TABELAS_PERMITIDAS = {
+    "entradas": "usuario_id",
+    "saidas": "usuario_id",
+    "carteira": "usuario_id",
+    "carteira_totais": "usuario_id",
+    "usuarios": "id",
+}
+COLUNAS_PROIBIDAS = {"senha"}
+FUNCOES_PROIBIDAS = {
+    "SLEEP", "BENCHMARK", "LOAD_FILE", "GET_LOCK", "RELEASE_LOCK", "IS_FREE_LOCK", "IS_USED_LOCK",
+    "SYS_EXEC", "SYS_EVAL", "USER", "CURRENT_USER", "SESSION_USER", "SYSTEM_USER", "DATABASE",
+    "SCHEMA", "VERSION", "CONNECTION_ID", "LOAD_EXTENSION", "RANDOMBLOB", "ZEROBLOB",
+}
+NOS_PROIBIDOS = tuple(getattr(exp, nome) for nome in (
+    "Insert", "Update", "Delete", "Merge", "Create", "Drop", "Alter", "Command", "Into",
+    "Set", "Lock", "Use", "Transaction", "Commit", "Rollback", "Pragma",
+) if hasattr(exp, nome))
+
+MAX_JOINS = 3
+MAX_SELECTS = 8          # o saldo usa 4 subconsultas escalares + o SELECT externo
+MAX_PROFUNDIDADE = 3     # SELECT dentro de SELECT dentro de SELECT
+MAX_LINHAS = 100
+
+MSG_SEGURANCA = "Por segurança, a consulta gerada não pôde ser executada. Por favor, reformule sua pergunta."
+MSG_SOMENTE_LEITURA = ("Desculpe, só posso realizar consultas de leitura (SELECT). "
+                       "Não posso modificar ou deletar dados.")
+MSG_COMPLEXA = "A consulta gerada ficou complexa demais para executar. Tente uma pergunta mais simples."
+
+
+class SQLRecusado(ValueError):
+    """SQL que não pode ser executado. `mensagem` vai para o usuário; o texto
+    da exceção (motivo) vai para o log."""
+
+    def __init__(self, motivo: str, mensagem: str = MSG_SEGURANCA):
+        super().__init__(motivo)
+        self.mensagem = mensagem
+
+
+# ─── Predicados do usuário ───────────────────────────────────────────────────
+def _conjuncoes(condicao: Optional[exp.Expression]) -> List[exp.Expression]:
+    if condicao is None:
+        return []
+    if isinstance(condicao, exp.Where):
+        condicao = condicao.this
+    condicao = condicao.unnest()
+    if isinstance(condicao, exp.And):
+        return [c for lado in (condicao.this, condicao.expression) for c in _conjuncoes(lado)]
+    return [condicao]
+
+def _e_do_usuario(valor: exp.Expression, usuario_id: int) -> bool:
+    if isinstance(valor, exp.Placeholder):
+        return valor.name == "usuario_id"
+    return isinstance(valor, exp.Literal) and not valor.is_string and valor.name == str(usuario_id)
+
+def _filtro(conj: exp.Expression, ref: str, coluna: str, unica: bool) -> Optional[exp.Expression]:
+    """Se `conj` é `ref.coluna = valor` (ou `coluna = valor` numa cláusula com
+    uma tabela só), retorna o lado do valor."""
+    if not isinstance(conj, exp.EQ):
+        return None
+    for col, valor in ((conj.this, conj.expression), (conj.expression, conj.this)):
+        if isinstance(col, exp.Column) and col.name.lower() == coluna:
+            if col.table.lower() == ref or (not col.table and unica):
+                return valor
+    return None
+
+def _restringir(select: exp.Select, tabela: exp.Table, usuario_id: int, parametrizado: bool):
+    nome = tabela.name.lower()
+    coluna = TABELAS_PERMITIDAS[nome]
+    ref = tabela.alias_or_name.lower()
+    join = tabela.parent if isinstance(tabela.parent, exp.Join) else None
+    unica = not select.args.get("joins")
+    condicoes = _conjuncoes(select.args.get("where"))
+    if join is not None:
+        condicoes += _conjuncoes(join.args.get("on"))
+
+    # `u.id = s.usuario_id` é chave de join, não filtro: o predicado do usuário entra mesmo assim
+    valores = [v for v in (_filtro(c, ref, coluna, unica) for c in condicoes)
+               if v is not None and not isinstance(v, exp.Column)]
+    if any(not _e_do_usuario(v, usuario_id) for v in valores):
+        raise SQLRecusado(f"filtro de {ref}.{coluna} para outro valor que não o usuário {usuario_id}")
+    if valores:
+        return
+
+    valor = exp.Placeholder(this="usuario_id") if parametrizado else exp.Literal.number(usuario_id)
+    predicado = exp.EQ(this=exp.column(coluna, table=ref), expression=valor)
+    if join is not None and join.side:
+        # LEFT/RIGHT JOIN: no WHERE o filtro descartaria as linhas sem par
+        if join.args.get("using"):
+            raise SQLRecusado(f"join externo com USING em {ref}", MSG_COMPLEXA)
+        join.on(predicado, append=True, copy=False)
+    else:
+        select.where(predicado, append=True, copy=False)
+
+
+# ─── CTEs ────────────────────────────────────────────────────────────────────
+def _conferir_ctes(arvore: exp.Expression):
+    """Recusa CTE com nome de tabela real: em `WITH saidas AS (SELECT * FROM
+    saidas)` não daria para distinguir a CTE da tabela que precisa do filtro."""
+    for cte in arvore.find_all(exp.CTE):
+        if cte.alias.lower() in TABELAS_PERMITIDAS:
+            raise SQLRecusado(f"CTE com nome de tabela: {cte.alias}")
+
+def _e_cte(tabela: exp.Table) -> bool:
+    """A referência resolve para uma CTE em escopo (de um WITH de um ancestral;
+    dentro da própria definição, só se for WITH RECURSIVE)."""
+    if tabela.args.get("db") or tabela.args.get("catalog"):
+        return False
+    nome, no, caminho = tabela.name.lower(), tabela.parent, set()
+    while no is not None:
+        caminho.add(id(no))
+        com = next((v for v in no.args.values() if isinstance(v, exp.With)), None)
+        if com is not None:
+            for cte in com.expressions:
+                if cte.alias.lower() == nome and (id(cte) not in caminho or com.args.get("recursive")):
+                    return True
+        no = no.parent
+    return False
+
+
+# ─── Verificações estruturais ────────────────────────────────────────────────
+def _estrela(expressao: exp.Expression) -> bool:
+    """`*` ou `t.*` na lista do SELECT (COUNT(*) não conta)."""
+    return isinstance(expressao, exp.Star) or (isinstance(expressao, exp.Column) and isinstance(expressao.this, exp.Star))
+
+def _verificar_estrutura(arvore: exp.Expression):
+    for no in arvore.walk():
+        if isinstance(no, NOS_PROIBIDOS):
+            raise SQLRecusado(f"comando não permitido: {no.key}", MSG_SOMENTE_LEITURA)
+        if isinstance(no, exp.Func):
+            nome = (no.name if isinstance(no, exp.Anonymous) else no.sql_name()).upper()
+            if nome in FUNCOES_PROIBIDAS:
+                raise SQLRecusado(f"função não permitida: {nome}")
+        if isinstance(no, exp.Column) and no.name.lower() in COLUNAS_PROIBIDAS:
+            raise SQLRecusado(f"coluna não permitida: {no.name}")
+        if isinstance(no, exp.Table) and not _e_cte(no):
+            if no.name.lower() not in TABELAS_PERMITIDAS or no.args.get("db") or no.args.get("catalog"):
+                raise SQLRecusado(f"tabela não permitida: {no.sql()}")
+
+    joins = list(arvore.find_all(exp.Join))
+    if len(joins) > MAX_JOINS:
+        raise SQLRecusado(f"{len(joins)} joins (máximo {MAX_JOINS})", MSG_COMPLEXA)
+    for join in joins:
+        if not join.args.get("on") and not join.args.get("using"):
+            raise SQLRecusado(f"produto cartesiano com {join.this.sql()}", MSG_COMPLEXA)
+
+    selects = list(arvore.find_all(exp.Select))
+    if len(selects) > MAX_SELECTS:
+        raise SQLRecusado(f"{len(selects)} SELECTs (máximo {MAX_SELECTS})", MSG_COMPLEXA)
+    for select in selects:
+        profundidade = 1
+        pai = select.parent
+        while pai is not None:
+            profundidade += isinstance(pai, exp.Select)
+            pai = pai.parent
+        if profundidade > MAX_PROFUNDIDADE:
+            raise SQLRecusado(f"subconsultas aninhadas em {profundidade} níveis", MSG_COMPLEXA)
+        if any(_estrela(e) for e in select.expressions) and any(
+                t.name.lower() == "usuarios" for t in select.find_all(exp.Table)):
+            raise SQLRecusado("SELECT * sobre usuarios")
+
+
+_LIKE_CONTEM = re.compile(r"^%([^%_]+)%$")
+
+def _usar_indice_textual(arvore: exp.Expression, busca: Callable[[str, str, str], Optional[str]], dialeto: str):
+    for like in list(arvore.find_all(exp.Like, exp.ILike)):
+        col, padrao = like.this, like.expression
+        if not (isinstance(col, exp.Column) and col.name.lower() == "descricao"
+                and isinstance(padrao, exp.Literal) and padrao.is_string):
+            continue
+        m = _LIKE_CONTEM.match(padrao.name)
+        select = like.find_ancestor(exp.Select)
+        if not m or select is None:
+            continue
+        tabelas = {t.alias_or_name.lower(): t.name.lower() for t in select.find_all(exp.Table)
+                   if t.find_ancestor(exp.Select) is select}
+        ref = col.table.lower() or (next(iter(tabelas)) if len(tabelas) == 1 else "")
+        if ref not in tabelas:
+            continue
+        fragmento = busca(tabelas[ref], ref, m.group(1))
+        if fragmento:
+            like.replace(exp.condition(fragmento, dialect=dialeto))
+
+def _limitar(arvore: exp.Expression, max_linhas: int):
+    limite = arvore.args.get("limit")
+    valor = limite.expression if limite is not None else None
+    if valor is None:
+        arvore.limit(max_linhas, copy=False)
+    elif isinstance(valor, exp.Literal) and not valor.is_string and int(valor.name) > max_linhas:
+        arvore.limit(max_linhas, copy=False)
+    # LIMIT parametrizado (:n0 de um template): o teto fica por conta do fetch
+
+
+# ─── Entrada ─────────────────────────────────────────────────────────────────
+def governar(sql: str, usuario_id: int, dialeto: str = "mysql", max_linhas: int = MAX_LINHAS,
+             timeout_ms: Optional[int] = None,
+             busca: Optional[Callable[[str, str, str], Optional[str]]] = None) -> str:
+    """Valida e reescreve o SQL; retorna o SQL pronto para o `dialeto` do banco
+    ou levanta SQLRecusado."""
+    try:
+        comandos = [c for c in sqlglot.parse(sql, read="mysql") if c is not None]
+    except ParseError as e:
+        raise SQLRecusado(f"SQL inválido: {e}")
+    if len(comandos) != 1:
+        raise SQLRecusado(f"{len(comandos)} comandos em vez de um", MSG_SOMENTE_LEITURA)
+    arvore = comandos[0]
+    if not isinstance(arvore, (exp.Select, getattr(exp, "SetOperation", exp.Union))):
+        raise SQLRecusado(f"comando {arvore.key} não é SELECT", MSG_SOMENTE_LEITURA)
+
+    _conferir_ctes(arvore)
+    _verificar_estrutura(arvore)
+
+    parametrizado = any(p.name == "usuario_id" for p in arvore.find_all(exp.Placeholder))
+    for tabela in list(arvore.find_all(exp.Table)):
+        if _e_cte(tabela):
+            continue
+        select = tabela.find_ancestor(exp.Select)
+        if select is None:
+            raise SQLRecusado(f"tabela {tabela.name} fora de um SELECT")
+        _restringir(select, tabela, usuario_id, parametrizado)
+
+    if busca is not None:
+        _usar_indice_textual(arvore, busca, dialeto)
+    _limitar(arvore, max_linhas)
+    if timeout_ms and dialeto == "mysql":
+        primeiro = arvore
+        while not isinstance(primeiro, exp.Select):  # UNION: o primeiro bloco do SELECT externo
+            primeiro = primeiro.this
+        primeiro.set("hint", exp.Hint(expressions=[
+            exp.Anonymous(this="MAX_EXECUTION_TIME", expressions=[exp.Literal.number(int(timeout_ms))])]))
+    return arvore.sql(dialect=dialeto)
+
+
+# ─── Execução ────────────────────────────────────────────────────────────────
+# No SQL já governado, na hora de executar:
+#   - com `arquivo` ({tabela: (tabela de arquivo, colunas)}), cada entradas/saidas
+#     de um SELECT sem limite inferior de data a partir de `corte` vira
+#     (SELECT ... FROM t WHERE usuario_id = N UNION ALL SELECT ... FROM t_arquivo
+#     WHERE usuario_id = N) AS t, para a resposta cobrir o histórico arquivado;
+#   - no MySQL, YEAR(data) = N e DATE(data) = 'AAAA-MM-DD' viram intervalos
+#     sobre a própria coluna: com a função em volta, o banco não usa o índice
+#     (usuario_id, data) nem poda as partições por ano (particoes.py).
+_DIA = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+def _coluna_data(no: exp.Expression) -> Optional[exp.Column]:
+    while isinstance(no, (exp.TsOrDsToDate, exp.Date)):  # DATE(data) no MySQL e no SQLite
+        no = no.this
+    return no if isinstance(no, exp.Column) and no.name.lower() == "data" else None
+
+def _igualdade_de_data(eq: exp.Expression):
+    """('ano' ou 'dia', coluna, valor) se `eq` for YEAR(data) = N ou DATE(data) = 'AAAA-MM-DD'."""
+    if not isinstance(eq, exp.EQ):
+        return None
+    for lado, valor in ((eq.this, eq.expression), (eq.expression, eq.this)):
+        if isinstance(lado, exp.Year) and isinstance(valor, (exp.Literal, exp.Placeholder)):
+            coluna = _coluna_data(lado.this)
+            if coluna is not None:
+                return "ano", coluna, valor
+        elif (isinstance(lado, (exp.TsOrDsToDate, exp.Date)) and isinstance(valor, exp.Literal)
+              and valor.is_string and _DIA.match(valor.name)):
+            coluna = _coluna_data(lado)
+            if coluna is not None:
+                return "dia", coluna, valor
+    return None
+
+def _valor_data(valor: exp.Expression, params: dict, tipo: str = "dia") -> Optional[datetime]:
+    bruto = params.get(valor.name) if isinstance(valor, exp.Placeholder) else valor.name
+    try:
+        return datetime(int(bruto), 1, 1) if tipo == "ano" else datetime.fromisoformat(str(bruto))
+    except (TypeError, ValueError):
+        return None
+
+def _inicio_minimo(select: exp.Select, ref: str, params: dict) -> Optional[datetime]:
+    """Maior limite inferior de `ref`.data nas conjunções do WHERE de `select`."""
+    where = select.args.get("where")
+    inicio = None
+    for conj in _conjuncoes(where.this if where is not None else None):
+        if isinstance(conj, (exp.GTE, exp.GT, exp.Between)):
+            coluna = _coluna_data(conj.this)
+            candidato = _valor_data(conj.args["low"] if isinstance(conj, exp.Between) else conj.expression, params)
+        elif _igualdade_de_data(conj):
+            tipo, coluna, valor = _igualdade_de_data(conj)
+            candidato = _valor_data(valor, params, tipo)
+        else:
+            continue
+        if coluna is not None and candidato is not None and coluna.table.lower() in ("", ref.lower()):
+            inicio = candidato if inicio is None else max(inicio, candidato)
+    return inicio
+
+def _incluir_arquivo(arvore: exp.Expression, arquivo: Dict[str, Tuple[str, Sequence[str]]],
+                     usuario_id: int, corte: datetime, params: dict, dialeto: str):
+    for tabela in list(arvore.find_all(exp.Table)):
+        nome = tabela.name.lower()
+        select = tabela.find_ancestor(exp.Select)
+        if nome not in arquivo or select is None:
+            continue
+        if any(select.find_all(exp.MatchAgainst)):  # FULLTEXT só existe na tabela quente
+            continue
+        ref = tabela.alias_or_name
+        inicio = _inicio_minimo(select, ref, params)
+        if inicio is not None and inicio >= corte:
+            continue
+        nome_arquivo, colunas = arquivo[nome]
+        lista = ", ".join(colunas)
+        uniao = sqlglot.parse_one(
+            f"SELECT * FROM (SELECT {lista} FROM {nome} WHERE usuario_id = {int(usuario_id)} UNION ALL "
+            f"SELECT {lista} FROM {nome_arquivo} WHERE usuario_id = {int(usuario_id)}) AS {ref}", read=dialeto)
+        tabela.replace(uniao.find(exp.Subquery))
+
+def _datas_sargaveis(arvore: exp.Expression):
+    for eq in list(arvore.find_all(exp.EQ)):
+        igualdade = _igualdade_de_data(eq)
+        if igualdade is None:
+            continue
+        tipo, coluna, valor = igualdade
+        c, v = coluna.sql("mysql"), valor.sql("mysql")
+        if tipo == "ano":
+            intervalo = f"{c} >= MAKEDATE({v}, 1) AND {c} < MAKEDATE({v} + 1, 1)"
+        else:
+            intervalo = f"{c} >= {v} AND {c} < DATE_ADD({v}, INTERVAL 1 DAY)"
+        eq.replace(exp.Paren(this=exp.condition(intervalo, dialect="mysql")))
+
+def preparar_execucao(sql: str, usuario_id: int, dialeto: str = "mysql", params: Optional[dict] = None,
+                      arquivo: Optional[Dict[str, Tuple[str, Sequence[str]]]] = None,
+                      corte: Optional[datetime] = None) -> str:
+    """SQL governado (e os `params` com que vai rodar) → SQL a executar."""
+    arvore = sqlglot.parse_one(sql, read=dialeto)
+    if arquivo and corte is not None:
+        _incluir_arquivo(arvore, arquivo, usuario_id, corte, params or {}, dialeto)
+    if dialeto == "mysql":
+        _datas_sargaveis(arvore)
+    return arvore.sql(dialect=dialeto)
@@ -0,0 +1,55 @@
+# Vários workers atrás do gunicorn:
+#
+#   gunicorn -c gunicorn.conf.py main:app
+#   CACHE_REDIS_URL=redis://cache:6379/0 EVENTOS_REDIS_URL=redis://cache:6379/1 \
+#     WEB_CONCURRENCY=8 BIND=0.0.0.0:3000 gunicorn -c gunicorn.conf.py main:app
+#
+# preload_app: o mestre importa main.py e roda preparar_banco() (tabelas,
+# migrações, partições, índice textual) uma vez, antes de abrir a porta e de
+# criar os workers. Eles herdam o módulo já carregado (copy-on-write: menos
+# memória por worker) e no startup só aquecem o pool e o modelo. Conexões não
+# passam pelo fork: o mestre fecha as suas e cada worker descarta as herdadas.
+#
+# No SIGTERM (deploy, `kill -TERM <mestre>`) cada worker responde 503 em
+# /pronto, fecha os streams de /api/eventos e espera as requisições em
+# andamento por até graceful_timeout s antes de sair.
+#
+# Com mais de um worker, o cache de resultados (ETag/304, leitura no primário
+# depois de uma escrita) e o feed de eventos precisam do Redis (CACHE_REDIS_URL,
+# EVENTOS_REDIS_URL): em memória cada worker tem os seus e uma escrita num
+# worker não invalida o cache do outro, que seguiria respondendo 304 com os
+# dados antigos. Sem os dois o padrão é 1 worker, e pedir mais recusa a partida.
+
+import multiprocessing
+import os
+
+try:
+    import uvicorn_worker  # noqa: F401  (pacote uvicorn-worker; uvicorn.workers está obsoleto)
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+bind = os.getenv("BIND", "0.0.0.0:3000")
+COMPARTILHADO = bool(os.getenv("CACHE_REDIS_URL") and os.getenv("EVENTOS_REDIS_URL"))
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() if COMPARTILHADO else 1)))
+preload_app = True
+graceful_timeout = int(os.getenv("DRENAR_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))   # worker travado por mais que isso é reiniciado
+keepalive = 5
+
+
+def on_starting(server):
+    if server.cfg.workers > 1 and not COMPARTILHADO:
+        raise RuntimeError(f"{server.cfg.workers} workers sem CACHE_REDIS_URL e EVENTOS_REDIS_URL: o cache e "
+                           "os eventos ficariam separados por worker. Configure o Redis ou use 1 worker")
+    import main
+    main.conferir_sessoes()
+    main.preparar_banco()
+    main.engine.dispose()
+    main.engine_leitura.dispose()
+
+def post_fork(server, worker):
+    import main
+    main.engine.dispose(close=False)
+    main.engine_leitura.dispose(close=False)
+    main.CACHE_SQL.reabrir()
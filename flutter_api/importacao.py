@@ -0,0 +1,233 @@
+# Leitura de extratos bancários (CSV e OFX) para importação em lote.
+# Tudo aqui trabalha sobre um iterador de pedaços de bytes e devolve os
+# lançamentos um a um, então o arquivo nunca é carregado inteiro na memória.
+# A gravação (deduplicação, inserts em lote, carteira) fica em main.py.
+
+import codecs
+import csv
+import html
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Iterator, Optional, Tuple
+
+from chat_rapido import normalizar
+
+CENTAVOS = Decimal("0.01")
+
+# Categoria sugerida pela descrição quando o arquivo não traz uma
+# (padrão sobre a descrição normalizada → categoria, subcategoria)
+REGRAS_CATEGORIA = [
+    (r"\b(ifood|rappi|restaurante|lanchonete|padaria|mercado|supermercado|atacadao|assai|carrefour|pao de acucar)\b",
+     "Alimentação", None),
+    (r"\b(uber|99 ?app|99 ?pop|posto|combustivel|shell|ipiranga|petrobras|estacionamento|metro|onibus|pedagio)\b",
+     "Transporte", None),
+    (r"\b(aluguel|condominio|enel|light|cemig|copel|sabesp|energia|agua|gas)\b", "Moradia", None),
+    (r"\b(farmacia|drogaria|droga raia|drogasil|hospital|clinica|laboratorio|unimed|amil)\b", "Saúde", None),
+    (r"\b(escola|faculdade|curso|udemy|alura|livraria)\b", "Educação", None),
+    (r"\b(netflix|spotify|disney|hbo|prime video|youtube|deezer|icloud|google one)\b", "Assinaturas", None),
+    (r"\b(cinema|ingresso|show|teatro|bar|viagem|hotel|airbnb|booking)\b", "Lazer", None),
+    (r"\b(amazon|mercado ?livre|magalu|magazine|shopee|aliexpress|americanas|shein)\b", "Compras", None),
+    (r"\b(tesouro|cdb|aplicacao|corretora|invest)\w*", "Investimentos", None),
+]
+_REGRAS = [(re.compile(p), c, s) for p, c, s in REGRAS_CATEGORIA]
+CATEGORIA_PADRAO = "Outros"
+
+# Nomes de coluna aceitos no CSV (cabeçalho normalizado → campo)
+COLUNAS_CSV = {
+    "data": "data", "date": "data", "data lancamento": "data", "data do lancamento": "data",
+    "data movimento": "data", "dt": "data",
+    "descricao": "descricao", "historico": "descricao", "description": "descricao", "memo": "descricao",
+    "lancamento": "descricao", "estabelecimento": "descricao", "title": "descricao", "detalhes": "descricao",
+    "valor": "valor", "amount": "valor", "value": "valor", "quantia": "valor", "valor r": "valor",
+    "categoria": "categoria", "category": "categoria",
+    "subcategoria": "subcategoria",
+    "instituicao": "instituicao", "banco": "instituicao", "conta": "instituicao",
+}
+
+FORMATOS_DATA = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y", "%d.%m.%Y",
+                 "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+
+class LinhaInvalida(ValueError):
+    """Linha do arquivo que não pôde ser convertida em lançamento."""
+
+
+# ─── Conversões ──────────────────────────────────────────────────────────────
+def ler_valor(texto: str) -> Decimal:
+    """'1.234,56', '-50,00', 'R$ 12', '(12,50)', '1234.56' → Decimal com sinal."""
+    t = (texto or "").strip().replace("R$", "").replace(" ", "").replace("\xa0", "")
+    negativo = t.startswith("(") and t.endswith(")")
+    t = t.strip("()")
+    if t.endswith("-"):  # alguns bancos põem o sinal no fim: '50,00-'
+        negativo, t = True, t[:-1]
+    if "," in t and "." in t:
+        decimal = "," if t.rfind(",") > t.rfind(".") else "."
+    elif "," in t:
+        decimal = ","
+    else:
+        decimal = "." if t.count(".") == 1 else None
+    milhar = "." if decimal == "," else ","
+    t = t.replace(milhar, "")
+    if decimal is None:
+        t = t.replace(".", "")
+    elif decimal == ",":
+        t = t.replace(",", ".")
+    try:
+        valor = Decimal(t).quantize(CENTAVOS)
+    except InvalidOperation:
+        raise LinhaInvalida(f"valor inválido: {texto!r}")
+    return -valor if negativo else valor
+
+def ler_data(texto: str) -> datetime:
+    t = (texto or "").strip()
+    for fmt in FORMATOS_DATA:
+        try:
+            return datetime.strptime(t, fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(t)
+    except ValueError:
+        raise LinhaInvalida(f"data inválida: {texto!r}")
+
+def ler_data_ofx(texto: str) -> datetime:
+    """DTPOSTED do OFX: AAAAMMDD[HHMMSS[.XXX]][fuso]; o fuso é ignorado."""
+    digitos = re.match(r"\d+", (texto or "").strip())
+    if not digitos or len(digitos.group()) < 8:
+        raise LinhaInvalida(f"data inválida: {texto!r}")
+    d = digitos.group()
+    if len(d) >= 14:
+        return datetime.strptime(d[:14], "%Y%m%d%H%M%S")
+    return datetime.strptime(d[:8], "%Y%m%d")
+
+def sugerir_categoria(descricao: str) -> Tuple[str, Optional[str]]:
+    q = normalizar(descricao)
+    for regex, categoria, subcategoria in _REGRAS:
+        if regex.search(q):
+            return categoria, subcategoria
+    return CATEGORIA_PADRAO, None
+
+
+def lancamento(data: datetime, valor: Decimal, descricao: Optional[str], instituicao: Optional[str],
+               categoria: Optional[str] = None, subcategoria: Optional[str] = None,
+               inverter_sinal: bool = False) -> dict:
+    """Valor negativo vira saída, positivo vira entrada (inverter_sinal para fatura
+    de cartão, onde compras vêm positivas)."""
+    if inverter_sinal:
+        valor = -valor
+    if not valor:
+        raise LinhaInvalida("valor zero")
+    if not instituicao:
+        raise LinhaInvalida("instituição não informada")
+    descricao = (descricao or "").strip() or None
+    item = {"tipo": "entrada" if valor > 0 else "saida", "data": data, "valor": abs(valor),
+            "descricao": descricao, "instituicao": instituicao.strip()[:100]}
+    if item["tipo"] == "saida":
+        if not categoria:
+            categoria, subcategoria = sugerir_categoria(descricao or "")
+        item.update(categoria=categoria.strip()[:100], subcategoria=(subcategoria or None))
+    return item
+
+
+# ─── Texto a partir dos bytes ────────────────────────────────────────────────
+def _linhas(pedacos: Iterable[bytes], encoding: Optional[str] = None, separador: str = "\n") -> Iterator[str]:
+    """Decodifica os pedaços incrementalmente e gera as linhas (com o separador).
+    Sem encoding explícito, usa UTF-8 se o primeiro pedaço for UTF-8 válido e
+    cp1252 caso contrário (comum em OFX e CSV de bancos brasileiros)."""
+    pedacos = iter(pedacos)
+    primeiro = next(pedacos, b"")
+    if encoding is None:
+        encoding = "utf-8-sig"
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(primeiro, final=False)
+        except UnicodeDecodeError:
+            encoding = "cp1252"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    resto = ""
+    for pedaco in _encadear(primeiro, pedacos):
+        linhas = (resto + decoder.decode(pedaco)).split(separador)
+        resto = linhas.pop()
+        for linha in linhas:
+            yield linha + separador
+    resto += decoder.decode(b"", final=True)
+    if resto:
+        yield resto
+
+def _encadear(primeiro: bytes, resto: Iterator[bytes]) -> Iterator[bytes]:
+    if primeiro:
+        yield primeiro
+    yield from resto
+
+
+# ─── CSV ─────────────────────────────────────────────────────────────────────
+def ler_csv(pedacos: Iterable[bytes], instituicao: Optional[str] = None, inverter_sinal: bool = False,
+            encoding: Optional[str] = None) -> Iterator[Tuple[int, object]]:
+    """Gera (nº da linha, lançamento) ou (nº da linha, LinhaInvalida)."""
+    linhas = _linhas(pedacos, encoding)
+    cabecalho = next(linhas, "")
+    try:
+        dialeto = csv.Sniffer().sniff(cabecalho, delimiters=",;\t|")
+    except csv.Error:
+        dialeto = csv.excel
+    campos = [COLUNAS_CSV.get(normalizar(c)) for c in next(csv.reader([cabecalho], dialeto))]
+    faltando = {"data", "valor"} - set(campos)
+    if faltando:
+        raise LinhaInvalida(f"cabeçalho sem coluna(s) {', '.join(sorted(faltando))}")
+
+    leitor = csv.reader(linhas, dialeto)
+    for valores in leitor:
+        n = leitor.line_num + 1  # linha física (o cabeçalho já foi lido)
+        if not any(v.strip() for v in valores):
+            continue
+        linha = {c: v for c, v in zip(campos, valores) if c}
+        try:
+            yield n, lancamento(
+                ler_data(linha.get("data")), ler_valor(linha.get("valor")), linha.get("descricao"),
+                linha.get("instituicao") or instituicao, linha.get("categoria"), linha.get("subcategoria"),
+                inverter_sinal,
+            )
+        except LinhaInvalida as e:
+            yield n, e
+
+
+# ─── OFX ─────────────────────────────────────────────────────────────────────
+# o arquivo é quebrado em '<', então cada pedaço é exatamente uma tag (funciona
+# também para OFX em XML numa linha só, sem acumular a linha inteira)
+_TAG_OFX = re.compile(r"(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+def ler_ofx(pedacos: Iterable[bytes], instituicao: Optional[str] = None, inverter_sinal: bool = False,
+            encoding: Optional[str] = None) -> Iterator[Tuple[int, object]]:
+    """Lê OFX 1.x (SGML, tags sem fechamento) e 2.x (XML), um <STMTTRN> por vez.
+    A instituição vem do parâmetro ou, na falta dele, de <FI><ORG>."""
+    org = None
+    trn = None
+    n_trn = 0
+    for pedaco in _linhas(pedacos, encoding, separador="<"):
+        m = _TAG_OFX.match(pedaco)
+        if not m:
+            continue
+        fecha, tag, valor = m.group(1), m.group(2).upper(), html.unescape(m.group(3).strip())
+        if tag == "STMTTRN":
+            if not fecha:
+                trn = {}
+                continue
+            if trn is None:
+                continue
+            n_trn += 1
+            try:
+                yield n_trn, lancamento(
+                    ler_data_ofx(trn.get("DTPOSTED")), ler_valor(trn.get("TRNAMT")),
+                    trn.get("MEMO") or trn.get("NAME"), instituicao or org, inverter_sinal=inverter_sinal,
+                )
+            except LinhaInvalida as e:
+                yield n_trn, e
+            trn = None
+        elif fecha or not valor:
+            continue
+        elif trn is not None:
+            trn[tag] = valor
+        elif tag == "ORG":
+            org = valor
+
+LEITORES = {"csv": ler_csv, "ofx": ler_ofx}
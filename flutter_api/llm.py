@@ -0,0 +1,92 @@
+# Cliente assíncrono do endpoint OpenAI-compatível do Ollama.
+# Um único httpx.AsyncClient é compartilhado pelo processo, mantendo as conexões
+# abertas (keep-alive) entre as chamadas do chat em vez de abrir uma por request.
+
+import json
+import logging
+from typing import AsyncIterator, Callable, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class ErroLLM(Exception):
+    """Falha de comunicação com o serviço de chat ou resposta sem conteúdo."""
+
+
+class ClienteLLM:
+    def __init__(self, url: str, modelo: str, timeout: float = 60.0, max_conexoes: int = 20,
+                 ao_usar: Optional[Callable[[dict], None]] = None):
+        self.url = url
+        self.modelo = modelo
+        self.ao_usar = ao_usar  # recebe o `usage` de cada resposta (contagem de tokens)
+        self._timeout = httpx.Timeout(timeout, connect=5.0)
+        self._limites = httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_conexoes)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self._timeout, limits=self._limites)
+        return self._client
+
+    async def fechar(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _payload(self, mensagens: List[dict], **opcoes) -> dict:
+        return {"model": self.modelo, "messages": mensagens, **opcoes}
+
+    def _registrar_uso(self, uso):
+        if uso and self.ao_usar is not None:
+            try:
+                self.ao_usar(uso)
+            except Exception:
+                logger.exception("Falha ao registrar uso de tokens")
+
+    async def completar(self, mensagens: List[dict], **opcoes) -> Optional[str]:
+        """Uma chamada completa; retorna o texto da primeira escolha, ou None se a
+        resposta não tiver o formato esperado."""
+        try:
+            resp = await self.client.post(self.url, json=self._payload(mensagens, **opcoes))
+            resp.raise_for_status()
+            dados = resp.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise ErroLLM(str(e)) from e
+        if isinstance(dados, dict):
+            self._registrar_uso(dados.get("usage"))
+        try:
+            return dados["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            logger.error(f"Resposta inesperada do LLM: {dados}")
+            return None
+
+    async def stream(self, mensagens: List[dict], **opcoes) -> AsyncIterator[str]:
+        """Gera os pedaços de texto conforme o modelo produz (stream=true, SSE).
+        Se o consumidor for cancelado (cliente desconectou), a conexão com o
+        Ollama é fechada e a geração é interrompida."""
+        # include_usage: o último evento traz o `usage` (sem choices)
+        payload = self._payload(mensagens, stream=True, stream_options={"include_usage": True}, **opcoes)
+        try:
+            async with self.client.stream("POST", self.url, json=payload) as resp:
+                resp.raise_for_status()
+                async for linha in resp.aiter_lines():
+                    if not linha.startswith("data:"):
+                        continue
+                    dado = linha[len("data:"):].strip()
+                    if dado == "[DONE]":
+                        break
+                    try:
+                        evento = json.loads(dado)
+                        self._registrar_uso(evento.get("usage"))
+                        if not evento.get("choices"):
+                            continue
+                        delta = evento["choices"][0].get("delta", {}).get("content")
+                    except (ValueError, KeyError, IndexError, AttributeError):
+                        continue
+                    if delta:
+                        yield delta
+        except httpx.HTTPError as e:
+            raise ErroLLM(str(e)) from e
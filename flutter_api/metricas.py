@@ -0,0 +1,135 @@
+# Métricas no formato texto do Prometheus (GET /metrics), sem dependências.
+# Contadores e histogramas guardam só somas por série de rótulos, protegidas
+# por um lock: o custo por observação é uma busca no dict e um bisect, então
+# dá para deixar ligado em produção. Rótulos devem ter poucos valores
+# possíveis (rota como template, nunca a URL com ids).
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Buckets padrão (segundos): de 1 ms a 60 s, cobrindo de consultas a chamadas ao LLM
+BUCKETS_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _rotulos(nomes: Tuple[str, ...], valores: Tuple, extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _numero(v: float) -> str:
+    return repr(float(v)) if v != int(v) or abs(v) >= 1e15 else str(int(v))
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple, object] = {}
+
+    def _chave(self, valores: dict) -> Tuple:
+        return tuple(str(valores.get(n, "")) for n in self.rotulos)
+
+    def exportar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for chave, valor in series:
+            linhas.extend(self._linhas(chave, valor))
+        return linhas
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valor: float = 1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def _linhas(self, chave, valor):
+        return [f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}"]
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = (), buckets=BUCKETS_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        i = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][i] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def medir(self, **rotulos):
+        """with hist.medir(etapa="x"): ... observa a duração do bloco (também se falhar)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def _linhas(self, chave, serie):
+        contagens, soma = serie
+        linhas, acumulado = [], 0
+        for limite, n in zip(self.buckets + (float("inf"),), contagens):
+            acumulado += n
+            le = 'le="{}"'.format("+Inf" if limite == float("inf") else _numero(limite))
+            linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, chave, le)} {acumulado}")
+        linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}")
+        linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}")
+        return linhas
+
+
+class Registro:
+    def __init__(self):
+        self._metricas: List[_Metrica] = []
+        self._coletores: List[Callable[[], Iterable[Tuple[str, str, str, Optional[dict], float]]]] = []
+
+    def contador(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()) -> Contador:
+        m = Contador(nome, ajuda, rotulos)
+        self._metricas.append(m)
+        return m
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Iterable[str] = (), buckets=BUCKETS_PADRAO) -> Histograma:
+        m = Histograma(nome, ajuda, rotulos, buckets)
+        self._metricas.append(m)
+        return m
+
+    def coletor(self, fn):
+        """Valores lidos na hora da coleta (filas, caches, pool): `fn()` gera
+        tuplas (nome, tipo, ajuda, rotulos ou None, valor)."""
+        self._coletores.append(fn)
+        return fn
+
+    def exportar(self) -> str:
+        linhas = []
+        for m in self._metricas:
+            linhas.extend(m.exportar())
+        vistos = set()
+        for fn in self._coletores:
+            for nome, tipo, ajuda, rotulos, valor in fn():
+                if nome not in vistos:
+                    vistos.add(nome)
+                    linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+                rotulos = rotulos or {}
+                linhas.append(f"{nome}{_rotulos(tuple(rotulos), tuple(rotulos.values()))} {_numero(valor)}")
+        return "\n".join(linhas) + "\n"
@@ -0,0 +1,195 @@
+# Migrações versionadas do esquema.
+# Base.metadata.create_all só cria as tabelas que faltam: nunca acrescenta
+# índices nem colunas a uma tabela que já existe. Cada mudança em tabela
+# existente vira uma função registrada com @migracao(N, "..."); migrar() aplica,
+# em ordem, as que ainda não constam em `esquema_versoes`.
+#
+#   python main.py migrar            → aplica as pendentes e lista o estado
+#   MIGRAR_AO_INICIAR=0              → a API não migra sozinha ao subir (deploy roda o comando acima)
+#
+# As migrações conferem o que já existe antes de mudar (um banco novo criado
+# por create_all ou pelo "Tabelas SQL.sql" já tem os índices dos modelos): a
+# versão só é registrada. No MySQL um GET_LOCK evita que dois workers subindo
+# juntos migrem ao mesmo tempo, e os índices são criados com DDL online
+# (ALGORITHM=INPLACE, LOCK=NONE): leituras e escritas continuam durante a criação.
+# Uma migração com reconstruir_carteira=True faz o main rodar o equivalente a
+# `python main.py reconstruir-carteira` logo depois de aplicá-la.
+
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select
+
+logger = logging.getLogger(__name__)
+
+_META = MetaData()
+ESQUEMA_VERSOES = Table(
+    "esquema_versoes", _META,
+    Column("versao", Integer, primary_key=True, autoincrement=False),
+    Column("descricao", String(255), nullable=False),
+    Column("aplicada_em", DateTime, nullable=False),
+)
+TRAVA_MYSQL = "control_finances_migracoes"
+ESPERA_TRAVA = 300   # s esperando outro processo terminar de migrar
+
+
+class Migracao(NamedTuple):
+    versao: int
+    descricao: str
+    aplicar: Callable
+    reconstruir_carteira: bool = False
+
+
+MIGRACOES: List[Migracao] = []
+
+def migracao(versao: int, descricao: str, reconstruir_carteira: bool = False):
+    def registrar(fn):
+        assert all(m.versao < versao for m in MIGRACOES), "migrações precisam ser registradas em ordem"
+        MIGRACOES.append(Migracao(versao, descricao, fn, reconstruir_carteira))
+        return fn
+    return registrar
+
+
+# ─── Utilitários para as migrações ───────────────────────────────────────────
+def criar_indice(conn, tabela: str, nome: str, colunas: tuple) -> bool:
+    """Cria o índice se ainda não existir (MySQL: DDL online). Retorna se criou."""
+    if nome in {ix["name"] for ix in inspect(conn).get_indexes(tabela)}:
+        return False
+    lista = ", ".join(colunas)
+    if conn.dialect.name == "mysql":
+        conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD INDEX {nome} ({lista}), ALGORITHM=INPLACE, LOCK=NONE")
+    else:
+        conn.exec_driver_sql(f"CREATE INDEX {nome} ON {tabela} ({lista})")
+    return True
+
+def criar_indice_unico(conn, tabela: str, nome: str, colunas: tuple) -> bool:
+    """Cria o índice único se a tabela ainda não tiver unicidade nessas colunas."""
+    inspetor = inspect(conn)
+    existentes = [tuple(u["column_names"]) for u in inspetor.get_unique_constraints(tabela)]
+    existentes += [tuple(ix["column_names"]) for ix in inspetor.get_indexes(tabela) if ix.get("unique")]
+    if tuple(colunas) in existentes:
+        return False
+    lista = ", ".join(colunas)
+    if conn.dialect.name == "mysql":
+        conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD UNIQUE INDEX {nome} ({lista}), ALGORITHM=INPLACE, LOCK=NONE")
+    else:
+        conn.exec_driver_sql(f"CREATE UNIQUE INDEX {nome} ON {tabela} ({lista})")
+    return True
+
+def adicionar_coluna(conn, tabela: str, nome: str, definicao: str) -> bool:
+    if nome in {c["name"] for c in inspect(conn).get_columns(tabela)}:
+        return False
+    conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN {nome} {definicao}")
+    return True
+
+def remover_indice(conn, tabela: str, nome: str) -> bool:
+    if nome not in {ix["name"] for ix in inspect(conn).get_indexes(tabela)}:
+        return False
+    if conn.dialect.name == "mysql":
+        conn.exec_driver_sql(f"ALTER TABLE {tabela} DROP INDEX {nome}, ALGORITHM=INPLACE, LOCK=NONE")
+    else:
+        conn.exec_driver_sql(f"DROP INDEX {nome}")
+    return True
+
+
+# ─── Migrações ───────────────────────────────────────────────────────────────
+# Não importe os modelos do main aqui: a migração precisa continuar fazendo o
+# que fazia quando foi escrita, mesmo que o modelo mude depois.
+
+# Todas as consultas filtram por usuario_id e ordenam ou filtram por data
+# (listagens em keyset por (data, id), recentes do dashboard, relatório por
+# período, exportação); as com instituição/categoria usam os índices mais
+# específicos. O id no fim do keyset vem de graça: o InnoDB guarda a chave
+# primária em todo índice secundário e o SQLite guarda o rowid.
+INDICES_V1 = (
+    ("entradas", "ix_entradas_usuario_data", ("usuario_id", "data")),
+    ("entradas", "ix_entradas_usuario_instituicao_data", ("usuario_id", "instituicao", "data")),
+    ("saidas", "ix_saidas_usuario_data", ("usuario_id", "data")),
+    ("saidas", "ix_saidas_usuario_categoria_data", ("usuario_id", "categoria", "data")),
+    ("saidas", "ix_saidas_usuario_instituicao_data", ("usuario_id", "instituicao", "data")),
+)
+
+@migracao(1, "Índices compostos (usuario_id, data) e por instituição/categoria em entradas e saidas")
+def _indices_compostos(conn):
+    for tabela, nome, colunas in INDICES_V1:
+        if criar_indice(conn, tabela, nome, colunas):
+            logger.info(f"Índice {nome} criado em {tabela}")
+    if conn.dialect.name == "mysql":
+        # o índice que o MySQL cria sozinho para a FK (só usuario_id) passa a ser
+        # prefixo de ix_*_usuario_data: a FK usa o composto e o simples só custaria nas escritas
+        for tabela in ("entradas", "saidas"):
+            remover_indice(conn, tabela, "usuario_id")
+
+
+# O "Tabelas SQL.sql" original criava carteira(id, usuario_id, saldo DECIMAL(10,2)
+# NULL), sem unicidade por usuário; create_all não altera a tabela existente e
+# toda escrita de entrada/saída falhava com "no such column: total_entradas".
+# As linhas repetidas de um usuário são descartadas (fica a de menor id) e os
+# valores de todas são recalculados em seguida pelo reconstruir-carteira.
+@migracao(2, "Colunas total_entradas/total_saidas, saldo DECIMAL(14,2) e usuario_id único em carteira",
+          reconstruir_carteira=True)
+def _carteira_totais(conn):
+    for coluna in ("total_entradas", "total_saidas"):
+        if adicionar_coluna(conn, "carteira", coluna, "DECIMAL(14,2) NOT NULL DEFAULT 0"):
+            logger.info(f"Coluna carteira.{coluna} criada")
+    conn.exec_driver_sql("UPDATE carteira SET saldo = 0 WHERE saldo IS NULL")
+    if conn.dialect.name == "mysql":
+        # no SQLite o tipo declarado não limita a precisão: não há o que alargar
+        conn.exec_driver_sql("ALTER TABLE carteira MODIFY saldo DECIMAL(14,2) NOT NULL DEFAULT 0")
+    removidas = conn.exec_driver_sql(
+        "DELETE FROM carteira WHERE id NOT IN "
+        "(SELECT id FROM (SELECT MIN(id) AS id FROM carteira GROUP BY usuario_id) AS primeiras)").rowcount
+    if removidas:
+        logger.info(f"{removidas} linha(s) repetida(s) removida(s) de carteira")
+    if criar_indice_unico(conn, "carteira", "uq_carteira_usuario", ("usuario_id",)):
+        logger.info("Índice único uq_carteira_usuario criado em carteira")
+
+
+# ─── Execução ────────────────────────────────────────────────────────────────
+def aplicadas(conn) -> dict:
+    if not inspect(conn).has_table(ESQUEMA_VERSOES.name):
+        return {}
+    return {v: (d, em) for v, d, em in conn.execute(select(ESQUEMA_VERSOES))}
+
+@contextmanager
+def trava(conn):
+    """Exclusão mútua entre processos mudando o esquema (no MySQL; no SQLite
+    só há um processo escrevendo). Também usada pela rolagem de partições."""
+    mysql = conn.dialect.name == "mysql"
+    if mysql and not conn.exec_driver_sql(f"SELECT GET_LOCK('{TRAVA_MYSQL}', {ESPERA_TRAVA})").scalar():
+        raise RuntimeError("Outro processo está mudando o esquema do banco há mais de "
+                           f"{ESPERA_TRAVA} s; tente de novo")
+    conn.commit()
+    try:
+        yield
+    finally:
+        if mysql:
+            conn.exec_driver_sql(f"SELECT RELEASE_LOCK('{TRAVA_MYSQL}')")
+
+def migrar(engine) -> List[Migracao]:
+    """Aplica as migrações pendentes, cada uma na sua transação. Retorna as aplicadas agora."""
+    feitas = []
+    with engine.connect() as conn, trava(conn):
+        _META.create_all(conn)
+        ja = aplicadas(conn)
+        conn.commit()
+        for m in MIGRACOES:
+            if m.versao in ja:
+                continue
+            logger.info(f"Aplicando migração {m.versao}: {m.descricao}")
+            # no MySQL DDL faz commit implícito: se a migração falhar no meio,
+            # o que já rodou fica; por isso cada passo confere antes de mudar
+            with conn.begin():
+                m.aplicar(conn)
+                conn.execute(ESQUEMA_VERSOES.insert().values(
+                    versao=m.versao, descricao=m.descricao, aplicada_em=datetime.now()))
+            feitas.append(m)
+    return feitas
+
+def estado(engine) -> List[dict]:
+    with engine.connect() as conn:
+        ja = aplicadas(conn)
+    return [{"versao": m.versao, "descricao": m.descricao,
+             "aplicada_em": ja[m.versao][1] if m.versao in ja else None} for m in MIGRACOES]
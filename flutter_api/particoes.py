@@ -0,0 +1,107 @@
+# Particionamento opcional de entradas e saidas por ano (só MySQL).
+#
+#   python main.py particionar [--imprimir]   → converte as tabelas (uma vez)
+#   python main.py rolar-particoes            → cria as partições dos próximos anos
+#                                               (também roda ao subir a API)
+#
+# RANGE sobre YEAR(data): consultas com data >=, <, BETWEEN (relatório por
+# linhas brutas, listagens filtradas, exportação e o SQL do chat depois de
+# governador_sql.preparar_execucao) leem só as partições dos anos pedidos, e o
+# arquivamento (arquivo.py) só varre as partições antigas.
+#
+# O MySQL exige, numa tabela particionada:
+#   - que toda chave única contenha a coluna do particionamento: a PK vira (id, data);
+#   - nenhuma chave estrangeira: a FK para usuarios sai (a exclusão de um
+#     usuário continua apagando os lançamentos pelo cascade do ORM);
+#   - nenhum índice FULLTEXT: /api/busca e o LIKE '%...%' do chat passam a
+#     filtrar as linhas do usuário pelo índice (usuario_id, data). Por isso o
+#     particionamento não é uma migração: só compensa com histórico grande.
+#
+# A conversão reescreve a tabela (ALGORITHM=COPY: escritas esperam a cópia
+# terminar). Em tabelas grandes rode numa janela de manutenção ou passe o ALTER
+# impresso por --imprimir ao pt-online-schema-change. A rolagem é online: a
+# última partição (pfuturo, MAXVALUE) fica vazia porque as dos próximos
+# ANOS_A_FRENTE anos já existem, e dividir uma partição vazia não copia linhas.
+
+import logging
+from datetime import date
+from typing import List
+
+from sqlalchemy import inspect, text
+
+from migracoes import trava
+
+logger = logging.getLogger(__name__)
+
+TABELAS = ("entradas", "saidas")
+FUTURO = "pfuturo"
+ANOS_A_FRENTE = 2
+
+
+def particoes(conn, tabela: str) -> List[tuple]:
+    """[(nome, limite, linhas estimadas)] em ordem; vazia se a tabela não é particionada."""
+    if conn.dialect.name != "mysql":
+        return []
+    return conn.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"), {"t": tabela}).all()
+
+def _definicao(anos) -> str:
+    return ", ".join([f"PARTITION p{a} VALUES LESS THAN ({a + 1})" for a in anos]
+                     + [f"PARTITION {FUTURO} VALUES LESS THAN MAXVALUE"])
+
+def comandos_particionar(conn, tabela: str, ate_ano: int) -> List[str]:
+    """ALTERs que convertem `tabela`; vazia se ela já é particionada."""
+    if particoes(conn, tabela):
+        return []
+    primeiro = conn.execute(text(f"SELECT YEAR(MIN(data)) FROM {tabela}")).scalar() or ate_ano
+    comandos = [f"ALTER TABLE {tabela} DROP FOREIGN KEY {fk['name']}"
+                for fk in inspect(conn).get_foreign_keys(tabela)]
+    comandos += [f"ALTER TABLE {tabela} DROP INDEX {ix['name']}" for ix in inspect(conn).get_indexes(tabela)
+                 if ix.get("dialect_options", {}).get("mysql_prefix") == "FULLTEXT"]
+    comandos.append(f"ALTER TABLE {tabela} DROP PRIMARY KEY, ADD PRIMARY KEY (id, data) "
+                    f"PARTITION BY RANGE (YEAR(data)) ({_definicao(range(primeiro, ate_ano + 1))})")
+    return comandos
+
+def particionar(engine, imprimir: bool = False) -> List[str]:
+    """Converte entradas e saidas. Retorna os comandos (executados ou, com
+    `imprimir`, só gerados)."""
+    if engine.dialect.name != "mysql":
+        raise RuntimeError("Particionamento só é suportado no MySQL")
+    feitos = []
+    ate_ano = date.today().year + ANOS_A_FRENTE
+    with engine.connect() as conn, trava(conn):
+        for tabela in TABELAS:
+            for comando in comandos_particionar(conn, tabela, ate_ano):
+                if not imprimir:
+                    logger.info(f"Executando: {comando}")
+                    conn.exec_driver_sql(comando)
+                feitos.append(comando)
+    return feitos
+
+def rolar(engine, ate_ano: int = None) -> List[str]:
+    """Garante partições até `ate_ano` (padrão: daqui a ANOS_A_FRENTE anos) nas
+    tabelas já particionadas, dividindo pfuturo. Retorna os comandos executados."""
+    if engine.dialect.name != "mysql":
+        return []
+    ate_ano = ate_ano or date.today().year + ANOS_A_FRENTE
+    feitos = []
+    with engine.connect() as conn:
+        if not any(particoes(conn, t) for t in TABELAS):
+            return []
+        with trava(conn):
+            for tabela in TABELAS:
+                anos = [int(nome[1:]) for nome, _lim, _n in particoes(conn, tabela) if nome != FUTURO]
+                if not anos or max(anos) >= ate_ano:
+                    continue
+                comando = (f"ALTER TABLE {tabela} REORGANIZE PARTITION {FUTURO} "
+                           f"INTO ({_definicao(range(max(anos) + 1, ate_ano + 1))})")
+                logger.info(f"Executando: {comando}")
+                conn.exec_driver_sql(comando)
+                feitos.append(comando)
+    return feitos
+
+def estado(engine) -> dict:
+    with engine.connect() as conn:
+        return {t: particoes(conn, t) for t in TABELAS}
@@ -0,0 +1,164 @@
+# Codificação das respostas: JSON rápido, formato colunar e compressão.
+#   - RespostaJSON serializa com orjson (Decimal vira float; datetime/date saem
+#     em ISO 8601, como no Pydantic). Sem orjson, cai no json da biblioteca padrão.
+#   - Endpoints de leitura que montam o próprio dict no formato do
+#     response_model devolvem RespostaJSON direto: o FastAPI não valida nem
+#     reserializa uma Response pronta (o response_model fica para a documentação).
+#   - colunar() troca a lista de objetos por um objeto de listas paralelas
+#     (nomes de campo uma vez só, não uma vez por linha).
+#   - Compressao é um middleware ASGI que comprime JSON, NDJSON e texto com
+#     brotli (se o pacote estiver instalado) ou gzip, conforme o Accept-Encoding.
+#     Streams são comprimidos pedaço a pedaço, sem esperar o fim.
+
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+try:
+    import brotli
+except ImportError:  # dependência opcional
+    brotli = None
+
+
+def _padrao(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} não é serializável em JSON")
+
+def dumps(conteudo) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao)
+    return json.dumps(conteudo, ensure_ascii=False, separators=(",", ":"), default=_padrao).encode("utf-8")
+
+
+class RespostaJSON(JSONResponse):
+    media_type = "application/json; charset=utf-8"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def colunar(linhas: Sequence[dict], campos: Iterable[str]) -> dict:
+    """[{"id": 1, "valor": 2.0}, ...] → {"id": [1, ...], "valor": [2.0, ...]}"""
+    return {campo: [l[campo] for l in linhas] for campo in campos}
+
+
+# ─── Compressão ──────────────────────────────────────────────────────────────
+TIPOS_COMPRESSIVEIS = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+
+def _negociar(aceitos: str) -> Optional[str]:
+    """'br' ou 'gzip' conforme o Accept-Encoding (q=0 recusa; empate prefere br)."""
+    pesos = {}
+    for item in aceitos.split(","):
+        nome, _, params = item.strip().partition(";")
+        q = 1.0
+        for p in params.split(";"):
+            chave, _, valor = p.strip().partition("=")
+            if chave == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        pesos[nome.strip().lower()] = q
+    candidatos = [(pesos.get(c, pesos.get("*", 0.0)), c == "br", c)
+                  for c in ("br", "gzip") if c == "gzip" or brotli is not None]
+    q, _, escolhida = max(candidatos)
+    return escolhida if q > 0 else None
+
+
+class _Compressor:
+    def __init__(self, codificacao: str, nivel_gzip: int, qualidade_brotli: int):
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=qualidade_brotli)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)   # 31: cabeçalho gzip
+
+    def pedaco(self, dados: bytes) -> bytes:
+        """Comprime e descarrega: o cliente recebe o pedaço sem esperar o próximo."""
+        if self._br is not None:
+            return self._br.process(dados) + self._br.flush()
+        return self._gz.compress(dados) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def fim(self, dados: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(dados) + self._br.finish()
+        return self._gz.compress(dados) + self._gz.flush()
+
+
+class Compressao:
+    def __init__(self, app, minimo: int = 1024, nivel_gzip: int = 6, qualidade_brotli: int = 4):
+        self.app = app
+        self.minimo = minimo
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+
+    def _compressivel(self, inicio: dict, cabecalhos: Headers) -> bool:
+        tipo = cabecalhos.get("content-type", "")
+        return (200 <= inicio["status"] and inicio["status"] not in (204, 304)
+                and "content-encoding" not in cabecalhos and tipo.startswith(TIPOS_COMPRESSIVEIS))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        codificacao = _negociar(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            return await self.app(scope, receive, send)
+
+        inicio: List[dict] = []
+        pendente: List[bytes] = []   # corpo guardado até saber se passa de `minimo`
+        compressor: List[Optional[_Compressor]] = []   # [] = ainda não decidido; [None] = sem compressão
+
+        async def enviar(msg):
+            if msg["type"] == "http.response.start":
+                inicio.append(msg)
+                if not self._compressivel(msg, Headers(raw=msg["headers"])):
+                    compressor.append(None)
+                    await send(msg)
+                return
+            if msg["type"] != "http.response.body" or (compressor and compressor[0] is None):
+                await send(msg)
+                return
+            corpo, mais = msg.get("body", b""), msg.get("more_body", False)
+            if not compressor:
+                # o corpo pode chegar em vários pedaços (o log_requests reenvia
+                # tudo como stream): decide quando juntar `minimo` bytes ou acabar
+                pendente.append(corpo)
+                tamanho = sum(map(len, pendente))
+                if mais and tamanho < self.minimo:
+                    return
+                corpo = b"".join(pendente)
+                pendente.clear()
+                if tamanho < self.minimo:
+                    compressor.append(None)
+                    await send(inicio[0])
+                    await send(msg | {"body": corpo})
+                    return
+                compressor.append(_Compressor(codificacao, self.nivel_gzip, self.qualidade_brotli))
+                cabecalhos = MutableHeaders(raw=inicio[0]["headers"])
+                del cabecalhos["content-length"]
+                cabecalhos["content-encoding"] = codificacao
+                cabecalhos.add_vary_header("Accept-Encoding")
+                if not mais:
+                    corpo = compressor[0].fim(corpo)
+                    cabecalhos["content-length"] = str(len(corpo))
+                    await send(inicio[0])
+                    await send({"type": "http.response.body", "body": corpo})
+                    return
+                await send(inicio[0])
+            corpo = compressor[0].pedaco(corpo) if mais else compressor[0].fim(corpo)
+            await send({"type": "http.response.body", "body": corpo, "more_body": mais})
+
+        await self.app(scope, receive, enviar)
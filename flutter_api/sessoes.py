@@ -0,0 +1,106 @@
+# Senhas com hash e sessões por token.
+#
+# Senhas: scrypt (hashlib, sem dependência nova) guardado como
+#   scrypt$<n>$<r>$<p>$<sal base64>$<hash base64>
+# O cálculo leva dezenas de ms de CPU e roda num pool de threads próprio
+# (SENHA_THREADS): não bloqueia o event loop nem ocupa o threadpool das
+# consultas, e o scrypt do OpenSSL libera o GIL. Linhas antigas com a senha em
+# texto puro continuam aceitas e são regravadas com hash no próximo login (o
+# mesmo vale para hashes com parâmetros anteriores aos atuais).
+#
+# Tokens: "<payload>.<assinatura>", base64url, com payload {"u": usuario_id,
+# "e": expiração} assinado por HMAC-SHA256 com SESSAO_SEGREDO. A verificação não
+# consulta o banco nem guarda estado: qualquer worker valida o token de outro,
+# desde que todos tenham o mesmo segredo. Sem SESSAO_SEGREDO o segredo é
+# aleatório por processo e os tokens deixam de valer a cada reinício (e entre
+# workers sem --preload): a API só aceita isso com SESSAO_OBRIGATORIA=0, em
+# desenvolvimento; com a sessão obrigatória ela se recusa a subir (ver
+# main.conferir_sessoes).
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = "scrypt"
+SCRYPT_N = int(os.getenv("SENHA_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = 8
+SCRYPT_P = 1
+MEMORIA_MAXIMA = 64 * 1024 * 1024   # o padrão do OpenSSL (32 MB) não comporta N = 2**15
+
+_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("SENHA_THREADS", "2")), thread_name_prefix="senhas")
+
+
+# ─── Senhas ──────────────────────────────────────────────────────────────────
+def _b64(dados: bytes) -> str:
+    return base64.urlsafe_b64encode(dados).rstrip(b"=").decode()
+
+def _de_b64(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+def _scrypt(senha: str, sal: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(senha.encode(), salt=sal, n=n, r=r, p=p, maxmem=MEMORIA_MAXIMA, dklen=32)
+
+def gerar_hash(senha: str) -> str:
+    sal = secrets.token_bytes(16)
+    return f"{PREFIXO}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(sal)}${_b64(_scrypt(senha, sal, SCRYPT_N, SCRYPT_R, SCRYPT_P))}"
+
+def conferir(senha: str, guardada: Optional[str]) -> Tuple[bool, bool]:
+    """(senha confere, guardada precisa ser regravada com gerar_hash). Sem
+    `guardada` (e-mail desconhecido) calcula um hash mesmo assim, para a
+    resposta levar o mesmo tempo."""
+    if guardada is None:
+        _scrypt(senha, b"\0" * 16, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return False, False
+    partes = guardada.split("$")
+    if len(partes) != 6 or partes[0] != PREFIXO:
+        # texto puro, de antes do hash
+        return hmac.compare_digest(senha.encode(), guardada.encode()), True
+    n, r, p = int(partes[1]), int(partes[2]), int(partes[3])
+    ok = hmac.compare_digest(_scrypt(senha, _de_b64(partes[4]), n, r, p), _de_b64(partes[5]))
+    return ok, ok and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+async def em_segundo_plano(funcao, *args):
+    """Roda gerar_hash/conferir no pool de senhas."""
+    return await asyncio.get_running_loop().run_in_executor(_POOL, funcao, *args)
+
+
+# ─── Tokens ──────────────────────────────────────────────────────────────────
+class Sessoes:
+    def __init__(self, segredo: Optional[str] = None, ttl: float = 7 * 24 * 3600):
+        if not segredo:
+            logger.warning("SESSAO_SEGREDO não definido: usando um segredo aleatório deste processo")
+        self._chave = segredo.encode() if segredo else secrets.token_bytes(32)
+        self.segredo_aleatorio = not segredo
+        self.ttl = ttl
+
+    def _assinar(self, payload: str) -> str:
+        return _b64(hmac.new(self._chave, payload.encode(), hashlib.sha256).digest())
+
+    def emitir(self, usuario_id: int) -> Tuple[str, int]:
+        """(token, expiração em segundos Unix)."""
+        expira = int(time.time() + self.ttl)
+        payload = _b64(json.dumps({"u": usuario_id, "e": expira}, separators=(",", ":")).encode())
+        return f"{payload}.{self._assinar(payload)}", expira
+
+    def verificar(self, token: str) -> Optional[int]:
+        """usuario_id do token, ou None se a assinatura não confere ou ele expirou."""
+        payload, _, assinatura = token.partition(".")
+        if not assinatura or not hmac.compare_digest(assinatura.encode(), self._assinar(payload).encode()):
+            return None
+        try:
+            dados = json.loads(_de_b64(payload))
+        except ValueError:
+            return None
+        if dados.get("e", 0) < time.time():
+            return None
+        return dados.get("u")
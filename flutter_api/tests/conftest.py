@@ -0,0 +1,34 @@
+# Os módulos da API ficam na pasta acima (flutter_api/), sem pacote.
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Os testes que importam main usam um SQLite temporário e não falam com o LLM
+# ao subir; as variáveis do ambiente, se houver, têm precedência.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='flutter_api_testes_')}/testes.db")
+os.environ.setdefault("CHAT_AQUECER", "0")
+os.environ.setdefault("SESSAO_SEGREDO", "segredo-dos-testes")
+
+import fake_llm  # noqa: E402
+
+
+@pytest.fixture()
+def llm_falso():
+    """subir(**opções de fake_llm.servir) → URL do LLM falso numa porta livre.
+    Os contadores ficam em fake_llm.Handler (chamadas, cancelados)."""
+    servidores = []
+
+    def subir(**opcoes) -> str:
+        servidor = fake_llm.servir(0, **opcoes)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        return f"http://127.0.0.1:{servidor.server_address[1]}/v1/chat/completions"
+    yield subir
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
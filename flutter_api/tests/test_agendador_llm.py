@@ -0,0 +1,156 @@
+# AgendadorLLM: limite de gerações, filas (total e por usuário), rodízio entre
+# usuários, espera máxima e chamadas idênticas compartilhando uma geração.
+import asyncio
+
+import pytest
+
+from agendador_llm import AgendadorLLM, FilaCheia
+
+
+async def _segurar(agendador, usuario_id, liberar: asyncio.Event, atendidos: list):
+    async with agendador.vaga(usuario_id):
+        atendidos.append(usuario_id)
+        await liberar.wait()
+
+
+async def _girar():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_limite_de_geracoes_simultaneas_e_fila():
+    async def principal():
+        ag = AgendadorLLM(max_concorrentes=2, max_fila=8)
+        liberar, atendidos = asyncio.Event(), []
+        tarefas = [asyncio.ensure_future(_segurar(ag, u, liberar, atendidos)) for u in range(5)]
+        await _girar()
+        meio = ag.estatisticas()
+        liberar.set()
+        await asyncio.gather(*tarefas)
+        return meio, ag.estatisticas(), atendidos
+    meio, fim, atendidos = asyncio.run(principal())
+    assert (meio["ativos"], meio["na_fila"]) == (2, 3)
+    assert (fim["ativos"], fim["na_fila"], fim["maior_fila"]) == (0, 0, 3)
+    assert sorted(atendidos) == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("max_fila, max_por_usuario, usuarios, outro_entra", [
+    (2, 4, ["a", "b", "c"], False),   # fila total cheia
+    (8, 2, ["a", "a", "a"], True),    # muitas perguntas do mesmo usuário; os outros ainda entram
+])
+def test_fila_cheia_falha_na_hora(max_fila, max_por_usuario, usuarios, outro_entra):
+    async def principal():
+        ag = AgendadorLLM(max_concorrentes=1, max_fila=max_fila, max_fila_por_usuario=max_por_usuario)
+        liberar, atendidos = asyncio.Event(), []
+        ocupando = asyncio.ensure_future(_segurar(ag, "dono", liberar, atendidos))
+        await _girar()
+        na_fila = [asyncio.ensure_future(_segurar(ag, u, liberar, atendidos)) for u in usuarios[:-1]]
+        await _girar()
+        with pytest.raises(FilaCheia):
+            await _segurar(ag, usuarios[-1], liberar, atendidos)
+        livre_para_outro = ag.tem_espaco("outro")
+        liberar.set()
+        await asyncio.gather(ocupando, *na_fila)
+        return ag.estatisticas()["rejeitadas"], livre_para_outro, atendidos
+    rejeitadas, livre_para_outro, atendidos = asyncio.run(principal())
+    assert rejeitadas == 1
+    assert livre_para_outro is outro_entra
+    assert len(atendidos) == len(usuarios)
+
+
+def test_rodizio_entre_usuarios():
+    async def principal():
+        ag = AgendadorLLM(max_concorrentes=1, max_fila=8, max_fila_por_usuario=4)
+        atendidos = []
+        liberacoes = {}
+
+        async def pedir(nome, usuario_id):
+            liberacoes[nome] = asyncio.Event()
+            async with ag.vaga(usuario_id):
+                atendidos.append(nome)
+                await liberacoes[nome].wait()
+        tarefas = []
+        for nome, usuario_id in [("a0", "a"), ("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b")]:
+            tarefas.append(asyncio.ensure_future(pedir(nome, usuario_id)))
+            await _girar()
+        while len(atendidos) < len(tarefas):
+            liberacoes[atendidos[-1]].set()
+            await _girar()
+        liberacoes[atendidos[-1]].set()
+        await asyncio.gather(*tarefas)
+        return atendidos
+    # b chegou por último mas não espera as três perguntas de a que já estavam na fila
+    assert asyncio.run(principal()) == ["a0", "a1", "b1", "a2", "a3"]
+
+
+def test_espera_maxima_e_cancelamento_na_fila():
+    async def principal():
+        ag = AgendadorLLM(max_concorrentes=1, max_fila=4, espera_maxima=0.05)
+        liberar, atendidos = asyncio.Event(), []
+        ocupando = asyncio.ensure_future(_segurar(ag, "dono", liberar, atendidos))
+        await _girar()
+        with pytest.raises(FilaCheia):
+            await _segurar(ag, "a", liberar, atendidos)
+        desistente = asyncio.ensure_future(_segurar(ag, "b", liberar, atendidos))
+        await _girar()
+        desistente.cancel()
+        await asyncio.gather(desistente, return_exceptions=True)
+        depois = ag.estatisticas()
+        liberar.set()
+        await ocupando
+        return depois, ag.estatisticas(), atendidos
+    depois, fim, atendidos = asyncio.run(principal())
+    assert (depois["na_fila"], depois["rejeitadas"]) == (0, 1)
+    assert (fim["ativos"], fim["na_fila"]) == (0, 0)
+    assert atendidos == ["dono"]
+
+
+def test_chamadas_identicas_compartilham_uma_geracao():
+    async def principal():
+        ag = AgendadorLLM(max_concorrentes=2)
+        liberar, geracoes = asyncio.Event(), []
+
+        async def gerar():
+            geracoes.append(1)
+            await liberar.wait()
+            return "resposta"
+        tarefas = [asyncio.ensure_future(ag.executar(u, "mesma pergunta", gerar)) for u in (1, 2, 3)]
+        await _girar()
+        liberar.set()
+        return await asyncio.gather(*tarefas), geracoes, ag.estatisticas()
+    respostas, geracoes, estat = asyncio.run(principal())
+    assert respostas == ["resposta"] * 3
+    assert len(geracoes) == 1
+    assert (estat["executadas"], estat["coalescidas"]) == (1, 2)
+
+
+def test_geracao_compartilhada_so_e_cancelada_quando_todos_desistem():
+    async def principal():
+        ag = AgendadorLLM(max_concorrentes=2)
+        liberar, cancelada = asyncio.Event(), asyncio.Event()
+
+        async def gerar():
+            try:
+                await liberar.wait()
+                return "resposta"
+            except asyncio.CancelledError:
+                cancelada.set()
+                raise
+        primeira = asyncio.ensure_future(ag.executar(1, "k", gerar))
+        segunda = asyncio.ensure_future(ag.executar(2, "k", gerar))
+        await _girar()
+        primeira.cancel()
+        await _girar()
+        continuou = not cancelada.is_set()
+        liberar.set()
+        resposta = await segunda
+
+        liberar.clear()
+        terceira = asyncio.ensure_future(ag.executar(3, "k2", gerar))
+        await _girar()
+        terceira.cancel()
+        await _girar()
+        return continuou, resposta, cancelada.is_set(), ag.estatisticas()["ativos"]
+    continuou, resposta, cancelada, ativos = asyncio.run(principal())
+    assert continuou and resposta == "resposta"
+    assert cancelada and ativos == 0
@@ -0,0 +1,101 @@
+# /api/batch: várias operações sobre o mesmo id no mesmo lote, lote atômico
+# desfeito por inteiro quando uma operação falha, ids devolvidos pelo INSERT
+# multi-linha e carteira batendo com as linhas no fim.
+import itertools
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+_EMAILS = itertools.count()
+
+
+@pytest.fixture()
+def api():
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+
+def _usuario(api) -> dict:
+    email = f"batch{next(_EMAILS)}@teste"
+    api.post("/api/cadastro", json={"nome": "Teste", "email": email, "senha": "s"}).raise_for_status()
+    login = api.post("/api/login", json={"email": email, "senha": "s"}).json()
+    return {"id": login["id"], "headers": {"Authorization": f"Bearer {login['token']}"}}
+
+
+def _entrada(usuario, valor, instituicao="Nubank") -> dict:
+    return {"usuario_id": usuario["id"], "data": "2026-10-01T10:00:00", "instituicao": instituicao, "valor": valor}
+
+
+def _saida(usuario, valor, categoria="Lazer") -> dict:
+    return {**_entrada(usuario, valor), "categoria": categoria}
+
+
+def _lote(api, usuario, operacoes, atomico=True):
+    return api.post("/api/batch", json={"operacoes": operacoes, "atomico": atomico}, headers=usuario["headers"])
+
+
+def _carteira(usuario):
+    """(total_entradas, total_saidas) e as divergências de verificar_carteira."""
+    with main.SessionLocal() as db:
+        cart = db.query(main.Carteira).filter(main.Carteira.usuario_id == usuario["id"]).one_or_none()
+        totais = (cart.total_entradas, cart.total_saidas) if cart else None
+        return totais, main.verificar_carteira(db, usuario["id"])
+
+
+def test_operacoes_sobre_o_mesmo_id_no_mesmo_lote(api):
+    ana = _usuario(api)
+    existente = api.post("/api/entrada", json=_entrada(ana, 100), headers=ana["headers"]).json()["id"]
+    resposta = _lote(api, ana, [
+        {"op": "atualizar", "tabela": "entrada", "id": existente, "dados": _entrada(ana, 200)},
+        {"op": "atualizar", "tabela": "entrada", "id": existente, "dados": _entrada(ana, 300, "Itaú")},
+        {"op": "criar", "tabela": "saida", "dados": _saida(ana, 40)},
+        {"op": "excluir", "tabela": "entrada", "id": existente},
+        {"op": "criar", "tabela": "entrada", "dados": _entrada(ana, 70)},
+    ])
+    assert resposta.status_code == 200
+    corpo = resposta.json()
+    assert corpo["aplicado"] is True
+    assert [r["status"] for r in corpo["resultados"]] == [200, 200, 201, 200, 201]
+    # a última operação sobre o id vale: a linha foi excluída (o SQLite pode
+    # reaproveitar o id na criação seguinte; o que conta é o que sobrou)
+    entradas = api.get(f"/api/entradas/{ana['id']}", headers=ana["headers"]).json()
+    assert [(e["id"], e["valor"]) for e in entradas] == [(corpo["resultados"][4]["id"], 70)]
+    assert _carteira(ana) == ((Decimal("70.00"), Decimal("40.00")), [])
+
+
+def test_ids_do_insert_em_lote_na_ordem_das_operacoes(api):
+    ana = _usuario(api)
+    valores = [10, 20, 30]
+    corpo = _lote(api, ana, [{"op": "criar", "tabela": "entrada", "dados": _entrada(ana, v)} for v in valores]).json()
+    ids = [r["id"] for r in corpo["resultados"]]
+    assert ids == sorted(ids) and len(set(ids)) == 3
+    assert [r["registro"]["valor"] for r in corpo["resultados"]] == valores
+    for id_, valor in zip(ids, valores):
+        assert api.get(f"/api/entrada/{id_}", headers=ana["headers"]).json()["valor"] == valor
+    assert _carteira(ana) == ((Decimal("60.00"), Decimal("0.00")), [])
+
+
+def test_operacao_com_erro_desfaz_o_lote_atomico(api):
+    ana = _usuario(api)
+    existente = api.post("/api/entrada", json=_entrada(ana, 100), headers=ana["headers"]).json()["id"]
+    operacoes = [
+        {"op": "criar", "tabela": "saida", "dados": _saida(ana, 40)},
+        {"op": "atualizar", "tabela": "entrada", "id": existente, "dados": _entrada(ana, 500)},
+        {"op": "excluir", "tabela": "entrada", "id": 10 ** 9},
+    ]
+    resposta = _lote(api, ana, operacoes)
+    assert resposta.status_code == 409
+    corpo = resposta.json()
+    assert corpo["aplicado"] is False
+    assert [r["status"] for r in corpo["resultados"]] == [424, 424, 404]
+    assert api.get(f"/api/entrada/{existente}", headers=ana["headers"]).json()["valor"] == 100
+    assert _carteira(ana) == ((Decimal("100.00"), Decimal("0.00")), [])
+
+    # não atômico: as válidas são aplicadas e a que falhou é reportada
+    corpo = _lote(api, ana, operacoes, atomico=False).json()
+    assert corpo["aplicado"] is True
+    assert [r["status"] for r in corpo["resultados"]] == [201, 200, 404]
+    assert _carteira(ana) == ((Decimal("500.00"), Decimal("40.00")), [])
@@ -0,0 +1,95 @@
+# Templates do cache de SQL do chat: o que vira parâmetro e o que não pode ir
+# para o cache por depender do dia em que a pergunta foi feita, e o arquivo
+# gravado fora de quem chama.
+import sqlite3
+import time
+
+import pytest
+
+import cache_sql
+
+USUARIO = 7
+LIMITES = {
+    "inicio_semana": "2026-10-12 00:00:00", "fim_semana": "2026-10-18 00:00:00",
+    "inicio_mes": "2026-10-01 00:00:00", "fim_mes": "2026-10-31 23:59:59",
+    "inicio_ano": "2026-01-01 00:00:00", "fim_ano": "2026-12-31 23:59:59",
+}
+
+
+def extrair(sql: str, pergunta: str = ""):
+    return cache_sql.extrair_template(sql, USUARIO, LIMITES, cache_sql.numeros(pergunta))
+
+
+def test_limites_e_usuario_viram_parametros():
+    tpl = extrair("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 "
+                  "AND data BETWEEN '2026-10-01 00:00:00' AND '2026-10-31 23:59:59'")
+    assert tpl == ("SELECT SUM(valor) FROM saidas WHERE usuario_id = :usuario_id "
+                   "AND data BETWEEN :inicio_mes AND :fim_mes")
+    assert cache_sql.parametros(tpl, 9, LIMITES, []) == {
+        "usuario_id": 9, "inicio_mes": LIMITES["inicio_mes"], "fim_mes": LIMITES["fim_mes"]}
+
+def test_numeros_da_pergunta_viram_parametros():
+    tpl = extrair("SELECT descricao FROM saidas WHERE usuario_id = 7 AND YEAR(data) = 2025 LIMIT 3",
+                  "minhas 3 ultimas saidas de 2025")
+    assert tpl == "SELECT descricao FROM saidas WHERE usuario_id = :usuario_id AND YEAR(data) = :n1 LIMIT :n0"
+    assert cache_sql.parametros(tpl, 9, LIMITES, ["5", "2024"]) == {"usuario_id": 9, "n0": 5, "n1": 2024}
+
+@pytest.mark.parametrize("sql, pergunta", [
+    # ontem / mês passado calculados pelo modelo no dia da pergunta
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND DATE(data) = '2026-10-17'", "quanto gastei ontem"),
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND data BETWEEN '2026-09-01 00:00:00' "
+     "AND '2026-09-30 23:59:59'", "quanto gastei no mes passado"),
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND data >= '2026-10'", "gastos de outubro"),
+    # ano e mês que não estão na pergunta
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND YEAR(data) = 2026", "gastos deste ano"),
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND MONTH(data) = 10 AND YEAR(data) = :x",
+     "gastos de outubro"),
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND strftime('%Y', data) = '2026'", "gastos deste ano"),
+    # relógio do banco
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND DATE(data) = CURDATE() - INTERVAL 1 DAY",
+     "quanto gastei ontem"),
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND data >= NOW() - INTERVAL 7 DAY",
+     "gastos da ultima semana"),
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7 AND data >= date('now', '-1 day')", "gastos de ontem"),
+])
+def test_data_fixa_nao_vai_para_o_cache(sql, pergunta):
+    assert extrair(sql, pergunta) is None
+
+@pytest.mark.parametrize("sql, pergunta", [
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 8", "quanto gastei"),          # outro usuário
+    ("SELECT ROUND(SUM(valor), 2) FROM saidas WHERE usuario_id = 7 LIMIT 2", "ultimas 2"),  # número ambíguo
+    ("SELECT SUM(valor) FROM saidas WHERE usuario_id = 7", "gastos acima de 50"),    # número sumiu
+])
+def test_troca_ambigua_nao_vai_para_o_cache(sql, pergunta):
+    assert extrair(sql, pergunta) is None
+
+
+# ─── Arquivo (CHAT_CACHE_ARQUIVO) ────────────────────────────────────────────
+def test_arquivo_gravado_em_segundo_plano_recarrega_no_reinicio(tmp_path):
+    arquivo = str(tmp_path / "cache.db")
+    cache = cache_sql.CacheSQL(max_itens=2, arquivo=arquivo)
+    for chave in ("a", "b", "c"):
+        cache.guardar(chave, f"SELECT {chave}")
+    cache.invalidar("b")
+    cache.esperar_gravacoes()
+    assert {chave: cache_sql.CacheSQL(arquivo=arquivo).obter(chave) for chave in "abc"} == {
+        "a": None, "b": None, "c": "SELECT c"}
+
+def test_arquivo_travado_nao_segura_nem_derruba_o_chat(tmp_path, caplog):
+    arquivo = str(tmp_path / "cache.db")
+    cache = cache_sql.CacheSQL(arquivo=arquivo)
+    cache._conn.execute("PRAGMA busy_timeout = 0")
+    outro_worker = sqlite3.connect(arquivo)
+    outro_worker.execute("BEGIN EXCLUSIVE")
+    inicio = time.perf_counter()
+    cache.guardar("a", "SELECT 1")
+    assert time.perf_counter() - inicio < 0.5
+    assert cache.obter("a") == "SELECT 1"
+    cache.esperar_gravacoes()
+    assert "database is locked" in caplog.text
+
+    outro_worker.rollback()
+    cache.guardar("b", "SELECT 2")
+    cache.esperar_gravacoes()
+    assert cache_sql.CacheSQL(arquivo=arquivo).obter("b") == "SELECT 2"
+    outro_worker.close()
@@ -0,0 +1,170 @@
+# Carteira e carteira_totais: criação e incremento por chave sem colidir com
+# outro worker gravando o mesmo usuário ao mesmo tempo, e PUT/DELETE
+# concorrentes na mesma linha aplicando cada delta uma vez só.
+import itertools
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+import main
+
+_EMAILS = itertools.count()
+
+
+@pytest.fixture()
+def db():
+    main.Base.metadata.create_all(bind=main.engine)
+    sessao = main.SessionLocal()
+    usuario = main.Usuario(nome="Ana", email=f"carteira{next(_EMAILS)}@teste", senha="x")
+    sessao.add(usuario)
+    sessao.commit()
+    sessao.usuario_id = usuario.id
+    yield sessao
+    sessao.rollback()
+    sessao.close()
+
+
+def _outro_worker(usuario_id, entradas):
+    """Grava e confirma, noutra sessão, a carteira de `usuario_id` com `entradas`."""
+    with main.SessionLocal() as outra:
+        outra.add(main.Carteira(usuario_id=usuario_id, saldo=entradas, total_entradas=entradas, total_saidas=0))
+        outra.commit()
+
+
+def _totais(db, usuario_id):
+    return {(t.tipo, t.instituicao, t.categoria): t.total
+            for t in db.query(main.CarteiraTotal).filter(main.CarteiraTotal.usuario_id == usuario_id)}
+
+
+def test_somar_total_cria_e_incrementa_a_mesma_chave(db):
+    uid = db.usuario_id
+    main._somar_total(db, "saida", uid, "Nubank", "Lazer", Decimal("10.00"))
+    main._somar_total(db, "saida", uid, "Nubank", "Lazer", Decimal("2.50"))
+    main._somar_total(db, "saida", uid, "Nubank", "Mercado", Decimal("-1.00"))
+    assert _totais(db, uid) == {("saida", "Nubank", "Lazer"): Decimal("12.50"),
+                                ("saida", "Nubank", "Mercado"): Decimal("-1.00")}
+
+
+def test_criar_carteira_perde_a_corrida_sem_erro(db):
+    uid = db.usuario_id
+    # a carteira aparece entre a consulta e o INSERT, como se outro worker a criasse
+    event.listen(db, "before_flush", lambda *_: _outro_worker(uid, Decimal("7.00")), once=True)
+    assert main._criar_carteira(db, uid) is False
+    assert db.query(main.Carteira).filter(main.Carteira.usuario_id == uid).count() == 1
+    assert not main._criar_carteira(db, uid)
+
+
+def test_movimentar_sobre_carteira_criada_por_outro_worker_so_soma_o_delta(db, monkeypatch):
+    uid = db.usuario_id
+    incrementar = main._incrementar_carteira
+    chamadas = []
+
+    def primeiro_nao_acha(*args):
+        # o primeiro UPDATE não achou a carteira; o outro worker a cria logo depois
+        chamadas.append(args)
+        if len(chamadas) == 1:
+            _outro_worker(uid, Decimal("7.00"))
+            return False
+        return incrementar(*args)
+    monkeypatch.setattr(main, "_incrementar_carteira", primeiro_nao_acha)
+    main._movimentar(db, "entrada", uid, "Itaú", None, Decimal("5.00"))
+    cart = db.query(main.Carteira).filter(main.Carteira.usuario_id == uid).one()
+    assert (cart.total_entradas, cart.saldo) == (Decimal("12.00"), Decimal("12.00"))
+    assert _totais(db, uid) == {("entrada", "Itaú", ""): Decimal("5.00")}
+
+
+def test_movimentar_sem_carteira_reconstroi_e_aplica_o_delta(db):
+    uid = db.usuario_id
+    db.add(main.Saida(usuario_id=uid, descricao="Feira", data=main.datetime(2026, 10, 1), categoria="Mercado",
+                      instituicao="Nubank", valor=Decimal("20.00")))
+    db.flush()
+    main._movimentar(db, "saida", uid, "Nubank", "Mercado", Decimal("3.00"))
+    main._movimentar(db, "saida", uid, "Nubank", "Mercado", Decimal("4.00"))
+    cart = db.query(main.Carteira).filter(main.Carteira.usuario_id == uid).one()
+    assert (cart.total_saidas, cart.saldo) == (Decimal("27.00"), Decimal("-27.00"))
+    assert _totais(db, uid) == {("saida", "Nubank", "Mercado"): Decimal("27.00")}
+
+
+
+def test_dashboard_sem_filtro_le_a_linha_da_carteira(db):
+    uid = db.usuario_id
+    main._movimentar(db, "entrada", uid, "Itaú", None, Decimal("100.00"))
+    main._movimentar(db, "saida", uid, "Nubank", "Mercado", Decimal("27.00"))
+    db.flush()
+    consultas = []
+    escutar = lambda conn, cursor, sql, *_: consultas.append(sql)
+    event.listen(main.engine, "before_cursor_execute", escutar)
+    try:
+        geral = main._calcular_dashboard(db, uid, None, None)
+        sem_carteira_totais = not any("carteira_totais" in sql for sql in consultas)
+        nubank = main._calcular_dashboard(db, uid, "Nubank", None)
+    finally:
+        event.remove(main.engine, "before_cursor_execute", escutar)
+    assert (geral["total_entradas"], geral["total_saidas"], geral["saldo"]) == (100.0, 27.0, 73.0)
+    assert sem_carteira_totais
+    assert (nubank["total_entradas"], nubank["total_saidas"]) == (0.0, 27.0)
+
+
+def _em_paralelo(monkeypatch, primeira, segunda):
+    """Roda `primeira` e `segunda` em sessões e threads próprias; a segunda
+    começa quando a primeira já leu a linha e a primeira só confirma depois de
+    dar tempo à segunda de tentar ler a mesma linha. Devolve os erros HTTP."""
+    leu, movimentar = threading.Event(), main._movimentar
+
+    def devagar(*args):
+        if threading.current_thread().name == "primeira" and not leu.is_set():
+            leu.set()
+            time.sleep(0.3)
+        return movimentar(*args)
+    monkeypatch.setattr(main, "_movimentar", devagar)
+    erros = []
+
+    def rodar(funcao):
+        with main.SessionLocal() as sessao:
+            try:
+                funcao(sessao)
+            except HTTPException as e:
+                erros.append(e.status_code)
+    a = threading.Thread(target=rodar, args=(primeira,), name="primeira")
+    a.start()
+    leu.wait(5)
+    b = threading.Thread(target=rodar, args=(segunda,), name="segunda")
+    b.start()
+    a.join(10)
+    b.join(10)
+    return erros
+
+
+@pytest.mark.parametrize("operacao", ["atualizar", "excluir", "lote"])
+def test_put_e_delete_concorrentes_na_mesma_linha_aplicam_cada_delta_uma_vez(db, monkeypatch, operacao):
+    uid = db.usuario_id
+    ent = main._criar_entrada(db, main.EntradaCreateSchema(usuario_id=uid, data=datetime(2026, 10, 1),
+                                                           instituicao="Itaú", valor=100))
+
+    def para(valor):
+        if operacao == "lote" and valor == 150:
+            lote = main.BatchRequest(operacoes=[{"op": "atualizar", "tabela": "entrada", "id": ent.id, "dados": {
+                "usuario_id": uid, "data": "2026-10-01T00:00:00", "instituicao": "Itaú", "valor": valor}}])
+            return lambda sessao: main._batch(sessao, lote)
+        if operacao == "excluir":
+            return lambda sessao: main._deletar_entrada(sessao, ent.id)
+        dados = main.EntradaCreateSchema(usuario_id=uid, data=datetime(2026, 10, 1), instituicao="Itaú", valor=valor)
+        return lambda sessao: main._atualizar_entrada(sessao, ent.id, dados)
+    erros = _em_paralelo(monkeypatch, para(150), para(120))
+
+    db.expire_all()
+    assert main.verificar_carteira(db, uid) == []
+    cart = db.query(main.Carteira).filter(main.Carteira.usuario_id == uid).one()
+    if operacao == "excluir":
+        assert erros == [404]   # a segunda exclusão não acha mais a linha
+        assert cart.total_entradas == Decimal("0.00")
+    else:
+        assert erros == []
+        assert cart.total_entradas == Decimal("120.00")
+    mensal = db.query(main.TotalMensal).filter(main.TotalMensal.usuario_id == uid).all()
+    assert [(m.total, m.quantidade) for m in mensal] == ([] if operacao == "excluir" else [(Decimal("120.00"), 1)])
@@ -0,0 +1,77 @@
+# /api/chat contra o LLM falso: o SQL gerado para um usuário vira template no
+# cache e responde a mesma pergunta de outro usuário sem chamar o modelo;
+# com o Ollama ocupado o endpoint responde 429.
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+import agendador_llm
+import cache_sql
+import fake_llm
+import llm
+import main
+
+PERGUNTA = "compare meus gastos com minhas entradas"   # não é da rota rápida
+_EMAILS = itertools.count()
+
+
+@pytest.fixture()
+def api(llm_falso, monkeypatch):
+    monkeypatch.setattr(main, "LLM", llm.ClienteLLM(llm_falso(), main.CHAT_MODEL))
+    monkeypatch.setattr(main, "CACHE_SQL", cache_sql.CacheSQL())
+    monkeypatch.setattr(main, "AGENDADOR", agendador_llm.AgendadorLLM())
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+
+def _usuario(api, entradas: float, saidas: float) -> dict:
+    email = f"chat{next(_EMAILS)}@teste"
+    api.post("/api/cadastro", json={"nome": "Teste", "email": email, "senha": "s"}).raise_for_status()
+    login = api.post("/api/login", json={"email": email, "senha": "s"}).json()
+    cabecalhos = {"Authorization": f"Bearer {login['token']}"}
+    lancamento = {"usuario_id": login["id"], "data": "2026-10-01T10:00:00", "instituicao": "Nubank"}
+    api.post("/api/entrada", json={**lancamento, "valor": entradas}, headers=cabecalhos).raise_for_status()
+    api.post("/api/saida", json={**lancamento, "valor": saidas, "categoria": "Lazer"},
+             headers=cabecalhos).raise_for_status()
+    return {"id": login["id"], "headers": cabecalhos}
+
+
+def _perguntar(api, usuario, caminho="/api/chat"):
+    return api.post(caminho, json={"usuario_id": usuario["id"], "pergunta": PERGUNTA}, headers=usuario["headers"])
+
+
+def test_template_do_cache_responde_outro_usuario_sem_chamar_o_modelo(api):
+    ana, bia = _usuario(api, 1000, 250), _usuario(api, 300, 20)
+
+    primeira = _perguntar(api, ana).json()
+    assert primeira["origem"] == "template"
+    assert "750,00" in primeira["resposta"]
+    assert fake_llm.Handler.chamadas == 1
+    assert main.CACHE_SQL.estatisticas()["itens"] == 1
+
+    # mesma pergunta, outro usuário: o template é religado ao usuario_id dela
+    segunda = _perguntar(api, bia).json()
+    assert segunda["origem"] == "template"
+    assert "280,00" in segunda["resposta"] and "750,00" not in segunda["resposta"]
+    assert fake_llm.Handler.chamadas == 1
+    assert main.CACHE_SQL.estatisticas()["hits"] == 1
+
+
+def test_template_recusado_pelo_governador_sai_do_cache_e_volta_ao_modelo(api):
+    ana = _usuario(api, 100, 10)
+    main.CACHE_SQL.guardar(cache_sql.chave_pergunta(PERGUNTA), "SELECT * FROM usuarios")
+    resposta = _perguntar(api, ana).json()
+    assert resposta["origem"] == "template" and "90,00" in resposta["resposta"]
+    assert fake_llm.Handler.chamadas == 1
+    assert "usuarios" not in main.CACHE_SQL.obter(cache_sql.chave_pergunta(PERGUNTA))
+
+
+@pytest.mark.parametrize("caminho", ["/api/chat", "/api/chat/stream"])
+def test_ollama_ocupado_responde_429(api, monkeypatch, caminho):
+    ana = _usuario(api, 100, 10)
+    monkeypatch.setattr(main, "AGENDADOR", agendador_llm.AgendadorLLM(max_concorrentes=0, max_fila=0))
+    resposta = _perguntar(api, ana, caminho)
+    assert resposta.status_code == 429
+    assert resposta.headers["Retry-After"] == "5"
+    assert fake_llm.Handler.chamadas == 0
@@ -0,0 +1,152 @@
+# Rota rápida do chat: pergunta → resposta pronta, ou None quando a pergunta
+# tem algo que a rota rápida não sabe tratar (e precisa ir ao LLM).
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import chat_rapido
+
+AGORA = datetime(2026, 10, 18, 15, 0)
+ARQUIVO = {"saidas": "saidas_arquivo", "entradas": "entradas_arquivo"}
+CORTE = datetime(2025, 10, 1)
+DADOS = """
+CREATE TABLE saidas (id INTEGER PRIMARY KEY, usuario_id INT, descricao TEXT, data DATETIME, categoria TEXT,
+                     instituicao TEXT, valor NUMERIC);
+CREATE TABLE entradas (id INTEGER PRIMARY KEY, usuario_id INT, descricao TEXT, data DATETIME, instituicao TEXT,
+                       valor NUMERIC);
+CREATE TABLE carteira (id INTEGER PRIMARY KEY, usuario_id INT, saldo NUMERIC, total_entradas NUMERIC,
+                       total_saidas NUMERIC);
+INSERT INTO saidas VALUES
+    (1, 1, 'Mercado', '2026-10-02 12:00:00', 'Alimentação', 'Nubank', 50),
+    (2, 1, 'Cinema', '2026-10-10 20:00:00', 'Lazer', 'Itaú', 30),
+    (3, 1, 'Ônibus', '2026-09-15 08:00:00', 'Transporte', 'Nubank', 20),
+    (4, 1, 'Feira', '2025-03-01 09:00:00', 'Alimentação', 'Itaú', 100),
+    (5, 2, 'Outro usuário', '2026-10-03 09:00:00', 'Lazer', 'Nubank', 999);
+INSERT INTO entradas VALUES
+    (1, 1, 'Salário', '2026-10-05 09:00:00', 'Itaú', 1000),
+    (2, 1, 'Salário', '2026-09-05 09:00:00', 'Itaú', 1000),
+    (3, 1, 'Freela', '2026-10-12 09:00:00', 'Nubank', 1500);
+INSERT INTO carteira VALUES (1, 1, 3300, 3500, 200);
+CREATE TABLE saidas_arquivo (id INTEGER PRIMARY KEY, usuario_id INT, descricao TEXT, data DATETIME,
+                             categoria TEXT, instituicao TEXT, valor NUMERIC);
+CREATE TABLE entradas_arquivo (id INTEGER PRIMARY KEY, usuario_id INT, descricao TEXT, data DATETIME,
+                               instituicao TEXT, valor NUMERIC);
+INSERT INTO saidas_arquivo VALUES
+    (90, 1, 'Hotel', '2020-07-01 12:00:00', 'Viagem', 'Inter', 400),
+    (91, 2, 'Outro usuário', '2020-07-02 12:00:00', 'Viagem', 'Inter', 999);
+"""
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for comando in DADOS.split(";"):
+            if comando.strip():
+                conn.execute(text(comando))
+    with Session(engine) as sessao:
+        yield sessao
+
+
+@pytest.mark.parametrize("pergunta, esperado", [
+    # reconhecidas
+    ("qual é o meu saldo?", "Seu saldo atual é R$ 3.300,00 (entradas: R$ 3.500,00; saídas: R$ 200,00)."),
+    ("saldo atual", "Seu saldo atual é R$ 3.300,00 (entradas: R$ 3.500,00; saídas: R$ 200,00)."),
+    ("quanto gastei este mês?", "Seus gastos neste mês somam R$ 80,00."),
+    ("quanto gastei no mês passado?", "Seus gastos no mês passado somam R$ 20,00."),
+    ("quanto gastei na última semana", "Seus gastos na semana passada somam R$ 30,00."),
+    ("quanto gastei em Alimentação?", "Seus gastos em Alimentação somam R$ 150,00."),
+    ("quanto gastei em alimentacao em 2025", "Seus gastos em Alimentação em 2025 somam R$ 100,00."),
+    ("quanto gastei no Nubank em outubro", "Seus gastos na instituição Nubank em outubro de 2026 somam R$ 50,00."),
+    ("quanto gastei em Alimentação no Itaú", "Seus gastos em Alimentação na instituição Itaú somam R$ 100,00."),
+    ("total de despesas em setembro de 2026", "Seus gastos em setembro de 2026 somam R$ 20,00."),
+    ("quanto recebi este ano?", "Suas entradas neste ano somam R$ 3.500,00."),
+    ("quanto gastei hoje?", "Não encontrei gastos hoje."),
+    ("quanto recebi no Nubank hoje", "Não encontrei entradas na instituição Nubank hoje."),
+    ("quanto gastei em 2020?", "Não encontrei gastos em 2020."),
+    ("quais foram minhas últimas 2 saídas?",
+     "Suas 2 saídas mais recentes:\n- 10/10/2026: Cinema (Lazer), Itaú, R$ 30,00\n"
+     "- 02/10/2026: Mercado (Alimentação), Nubank, R$ 50,00"),
+    ("liste as últimas cinco saidas de Lazer",
+     "Suas 1 saídas mais recentes em Lazer:\n- 10/10/2026: Cinema (Lazer), Itaú, R$ 30,00"),
+    # algo que a rota rápida não trata: vai ao LLM
+    ("quanto gastei com uber este mês?", None),
+    ("quanto gastei com cinema este mês", None),
+    ("quantas saídas tive este mês?", None),
+    ("quantos gastos tive em outubro", None),
+    ("quanto gastei em Alimentação e Lazer?", None),
+    ("quanto gastei fora do Nubank?", None),
+    ("quanto gastei exceto Alimentação", None),
+    ("quanto gastei ontem?", None),
+    ("quanto gastei até hoje", None),
+    ("quanto gastei nos últimos 3 meses?", None),
+    ("liste as saídas dos últimos três meses", None),
+    ("qual foi o gasto de 2 de outubro?", None),
+    ("quais entradas acima de 1000?", None),
+    ("gastos abaixo de 50 reais", None),
+    ("qual o saldo do Nubank", None),
+    ("quanto gastei por categoria", None),
+    ("compare meus gastos com minhas entradas", None),
+    ("quanto gastei e recebi", None),
+    ("bom dia", None),
+    ("quais foram minhas últimas 2 saídas de 2025 e 2020", None),
+    ("quanto gastei em setembro e outubro", None),
+    ("quanto gastei este mês e o mês passado", None),
+    ("quanto gastei no mês de outubro", "Seus gastos em outubro de 2026 somam R$ 80,00."),
+])
+def test_responder(db, pergunta, esperado):
+    assert chat_rapido.responder(db, 1, pergunta, agora=AGORA) == esperado
+
+
+@pytest.mark.parametrize("resultados, sql, esperado", [
+    ([], None, "Não encontrei dados para a sua solicitação."),
+    ([{"saldo": 10, "total_entradas": 30, "total_saidas": 20}], None,
+     "Seu saldo é R$ 10,00 (entradas: R$ 30,00; saídas: R$ 20,00)."),
+    ([{"SUM(valor)": 12.5}], None, "O total é R$ 12,50."),
+    ([{"COUNT(*)": 3}], None, "Encontrei 3 lançamentos."),
+    ([{"COUNT(*)": 1}], None, "Encontrei 1 lançamento."),
+    # o que se conta sai do argumento do COUNT; o que não sabemos nomear vai ao LLM
+    ([{"COUNT(DISTINCT categoria)": 4}], None, "Encontrei 4 categorias."),
+    ([{"COUNT(DISTINCT instituicao)": 1}], None, "Encontrei 1 instituição."),
+    ([{"COUNT(DISTINCT descricao)": 4}], None, None),
+    # com alias, o tipo sai da expressão no SQL e não do nome
+    ([{"total": 3}], "SELECT COUNT(*) AS total FROM saidas WHERE usuario_id = 1", "Encontrei 3 lançamentos."),
+    ([{"total": 4}], "SELECT COUNT(DISTINCT categoria) AS total FROM saidas WHERE usuario_id = 1",
+     "Encontrei 4 categorias."),
+    ([{"total": 12.5}], "SELECT SUM(valor) AS total FROM saidas WHERE usuario_id = 1", "O total é R$ 12,50."),
+    ([{"total": 12.5}], "SELECT ROUND(AVG(valor), 2) AS total FROM saidas WHERE usuario_id = 1",
+     "A média é R$ 12,50."),
+    ([{"total": 50}], "SELECT MAX(valor) AS total FROM saidas WHERE usuario_id = 1", None),
+    ([{"total": 2}], "SELECT COUNT(*) - COUNT(DISTINCT categoria) AS total FROM saidas WHERE usuario_id = 1", None),
+    ([{"categoria": "Lazer", "total": 3}, {"categoria": "Mercado", "total": 1}],
+     "SELECT categoria, COUNT(*) AS total FROM saidas WHERE usuario_id = 1 GROUP BY categoria",
+     "Encontrei 2 resultados:\n- Lazer: 3\n- Mercado: 1"),
+    ([{"categoria": "Lazer", "total": 30}],
+     "SELECT categoria, SUM(valor) AS total FROM saidas WHERE usuario_id = 1 GROUP BY categoria",
+     "Encontrei 1 resultado:\n- Lazer: R$ 30,00"),
+    ([{"saldo": 3, "total_entradas": 3, "total_saidas": 0}],
+     "SELECT COUNT(*) AS saldo, COUNT(*) AS total_entradas, 0 AS total_saidas FROM entradas WHERE usuario_id = 1",
+     None),
+])
+def test_renderizar_resultado(resultados, sql, esperado):
+    assert chat_rapido.renderizar_resultado(resultados, sql) == esperado
+
+
+@pytest.mark.parametrize("pergunta, esperado", [
+    ("quanto gastei em 2020?", "Seus gastos em 2020 somam R$ 400,00."),
+    ("quanto gastei em Viagem", "Seus gastos em Viagem somam R$ 400,00."),
+    ("quanto gastei no Inter em julho de 2020", "Seus gastos na instituição Inter em julho de 2020 somam R$ 400,00."),
+    ("quanto gastei?", "Seus gastos somam R$ 600,00."),
+    ("quanto gastei este mês?", "Seus gastos neste mês somam R$ 80,00."),
+    ("liste minhas últimas 5 saídas",
+     "Suas 5 saídas mais recentes:\n- 10/10/2026: Cinema (Lazer), Itaú, R$ 30,00\n"
+     "- 02/10/2026: Mercado (Alimentação), Nubank, R$ 50,00\n- 15/09/2026: Ônibus (Transporte), Nubank, R$ 20,00\n"
+     "- 01/03/2025: Feira (Alimentação), Itaú, R$ 100,00\n- 01/07/2020: Hotel (Viagem), Inter, R$ 400,00"),
+])
+def test_responder_com_arquivo(db, pergunta, esperado):
+    assert chat_rapido.responder(db, 1, pergunta, agora=AGORA, arquivo=ARQUIVO, corte=CORTE) == esperado
+
+def test_sem_arquivo_nao_enxerga_linhas_arquivadas(db):
+    assert chat_rapido.responder(db, 1, "quanto gastei em 2020?", agora=AGORA) == "Não encontrei gastos em 2020."
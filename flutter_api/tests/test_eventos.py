@@ -0,0 +1,107 @@
+# Feed de alterações: BrokerMemoria entregando só ao usuário certo, fila
+# estourada virando "recarregar" e /api/eventos recebendo o evento de uma
+# escrita feita por outra requisição (handler síncrono, outra thread).
+import asyncio
+import itertools
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import eventos
+import main
+
+_EMAILS = itertools.count()
+
+
+async def _girar():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_fila_estourada_vira_recarregar():
+    async def principal():
+        broker = eventos.BrokerMemoria()
+        assinatura = eventos.Assinatura(1, max_fila=2)
+        broker._registrar(assinatura)
+        for n in range(3):
+            broker.publicar(1, {"acao": "criada", "n": n})
+        broker.publicar(2, {"acao": "criada", "n": 99})   # outro usuário
+        await _girar()
+        recebidos = [await assinatura.proximo(0.01) for _ in range(4)]
+        broker._remover(assinatura)
+        return recebidos, broker.conexoes()
+    recebidos, conexoes = asyncio.run(principal())
+    assert recebidos == [{"acao": "criada", "n": 0}, {"acao": "criada", "n": 1}, {"acao": "recarregar"}, None]
+    assert conexoes == 0
+
+
+def test_encerrar_acorda_quem_espera():
+    async def principal():
+        broker = eventos.BrokerMemoria()
+        async with broker.assinar(1) as assinatura:
+            esperando = asyncio.ensure_future(assinatura.proximo(5))
+            await _girar()
+            broker.encerrar()
+            return await esperando, await assinatura.proximo(5)
+    assert asyncio.run(principal()) == (eventos.ENCERRAR, eventos.ENCERRAR)
+
+
+# ─── /api/eventos ────────────────────────────────────────────────────────────
+@pytest.fixture()
+def api(monkeypatch):
+    monkeypatch.setattr(main, "NOTIFICACOES", eventos.BrokerMemoria())
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+
+def _usuario(api) -> dict:
+    email = f"eventos{next(_EMAILS)}@teste"
+    api.post("/api/cadastro", json={"nome": "Teste", "email": email, "senha": "s"}).raise_for_status()
+    login = api.post("/api/login", json={"email": email, "senha": "s"}).json()
+    return {"id": login["id"], "headers": {"Authorization": f"Bearer {login['token']}"}}
+
+
+def _dados(bloco: str) -> dict:
+    return json.loads(next(l for l in bloco.splitlines() if l.startswith("data: "))[len("data: "):])
+
+
+def _stream(usuario, ultimo=None):
+    cabecalhos = [(b"last-event-id", ultimo.encode())] if ultimo is not None else []
+    return main.eventos_usuario(usuario["id"], Request({"type": "http", "headers": cabecalhos}))
+
+
+def test_escrita_chega_a_quem_esta_conectado(api):
+    ana = _usuario(api)
+
+    async def principal():
+        gerador = (await _stream(ana)).body_iterator
+        inicio = _dados(await gerador.__anext__())
+        # o POST roda o handler no threadpool do TestClient: o evento cruza de thread
+        await asyncio.to_thread(api.post, "/api/entrada", headers=ana["headers"], json={
+            "usuario_id": ana["id"], "data": "2026-10-01T10:00:00", "instituicao": "Nubank", "valor": 100})
+        evento = _dados(await asyncio.wait_for(gerador.__anext__(), 5))
+        await gerador.aclose()
+        return inicio, evento
+    inicio, evento = asyncio.run(principal())
+    assert inicio["acao"] == "inicio"
+    assert (evento["acao"], evento["tabela"], evento["registro"]["valor"]) == ("criada", "entrada", 100)
+    assert evento["carteira"]["total_entradas"] == 100
+    assert evento["versao"] != inicio["versao"]
+    assert main.NOTIFICACOES.conexoes() == 0
+
+
+def test_reconexao_depois_de_escrita_comeca_com_recarregar(api):
+    ana = _usuario(api)
+
+    async def primeiro(ultimo):
+        gerador = (await _stream(ana, ultimo)).body_iterator
+        try:
+            return _dados(await gerador.__anext__())
+        finally:
+            await gerador.aclose()
+    versao = asyncio.run(primeiro(None))["versao"]
+    assert asyncio.run(primeiro(str(versao)))["acao"] == "inicio"
+    main.RESULTADOS.invalidar(ana["id"])
+    assert asyncio.run(primeiro(str(versao)))["acao"] == "recarregar"
@@ -0,0 +1,159 @@
+# Governador do SQL do chat: cada consulta governada roda num SQLite em memória
+# com dois usuários, e o resultado não pode trazer nada do outro.
+import sqlite3
+
+import pytest
+
+import governador_sql
+from governador_sql import SQLRecusado
+
+USUARIO, OUTRO = 1, 2
+
+
+@pytest.fixture
+def banco():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE usuarios (id INTEGER PRIMARY KEY, nome TEXT, email TEXT, senha TEXT);
+        CREATE TABLE saidas (id INTEGER PRIMARY KEY, usuario_id INT, descricao TEXT, categoria TEXT,
+                             instituicao TEXT, valor REAL, data TEXT);
+        CREATE TABLE entradas (id INTEGER PRIMARY KEY, usuario_id INT, descricao TEXT, instituicao TEXT,
+                               valor REAL, data TEXT);
+        CREATE TABLE carteira (id INTEGER PRIMARY KEY, usuario_id INT, saldo REAL);
+        INSERT INTO usuarios VALUES (1, 'Ana', 'ana@x.com', 'hash-ana'), (2, 'Bia', 'bia@x.com', 'hash-bia');
+        INSERT INTO carteira VALUES (1, 1, 10), (2, 2, 20);
+    """)
+    conn.executemany("INSERT INTO saidas (usuario_id, descricao, categoria, instituicao, valor, data) "
+                     "VALUES (?, ?, 'Lazer', 'Nubank', ?, '2026-10-01')",
+                     [(u, f"gasto {u}-{i}", 10 * u) for u in (USUARIO, OUTRO) for i in range(150)])
+    conn.executemany("INSERT INTO entradas (usuario_id, descricao, instituicao, valor, data) "
+                     "VALUES (?, 'salário', 'Itaú', ?, '2026-10-05')", [(USUARIO, 1000), (OUTRO, 2000)])
+    yield conn
+    conn.close()
+
+
+def executar(banco, sql: str):
+    return banco.execute(governador_sql.governar(sql, USUARIO, "sqlite")).fetchall()
+
+
+# ─── Isolamento por usuário ──────────────────────────────────────────────────
+@pytest.mark.parametrize("sql", [
+    "SELECT usuario_id, valor FROM saidas",
+    "SELECT usuario_id, valor FROM saidas WHERE valor > 0 OR 1 = 1",
+    "SELECT usuario_id, valor FROM saidas WHERE usuario_id = 1 OR 1 = 1",
+    "SELECT usuario_id, valor FROM saidas WHERE id IN (SELECT id FROM saidas)",
+    "SELECT usuario_id, valor FROM saidas UNION ALL SELECT usuario_id, valor FROM entradas",
+    "SELECT s.usuario_id, s.valor FROM saidas s JOIN entradas e ON e.instituicao <> s.instituicao",
+    "SELECT s.usuario_id, s.valor FROM saidas s LEFT JOIN entradas e ON e.usuario_id = s.usuario_id",
+    "SELECT t.usuario_id, t.valor FROM (SELECT * FROM saidas) t",
+    "WITH x AS (SELECT * FROM saidas) SELECT usuario_id, valor FROM x",
+])
+def test_so_linhas_do_usuario(banco, sql):
+    linhas = executar(banco, sql)
+    assert linhas
+    assert {linha[0] for linha in linhas} == {USUARIO}
+
+def test_join_com_usuarios_fica_restrito(banco):
+    linhas = executar(banco, "SELECT u.email FROM saidas s JOIN usuarios u ON u.id = s.usuario_id")
+    assert {email for (email,) in linhas} == {"ana@x.com"}
+
+@pytest.mark.parametrize("sql", [
+    "SELECT valor FROM saidas WHERE usuario_id = 2",
+    "SELECT valor FROM saidas WHERE usuario_id = 1 AND usuario_id = 2",
+    "SELECT s.valor FROM saidas s JOIN entradas e ON e.usuario_id = 2",
+    "SELECT valor FROM saidas WHERE id IN (SELECT id FROM saidas WHERE usuario_id = 2)",
+    "SELECT valor FROM saidas UNION SELECT valor FROM entradas WHERE usuario_id = 2",
+])
+def test_filtro_de_outro_usuario_recusado(sql):
+    with pytest.raises(SQLRecusado):
+        governador_sql.governar(sql, USUARIO, "sqlite")
+
+
+# ─── CTEs ────────────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("sql", [
+    "WITH saidas AS (SELECT * FROM saidas) SELECT * FROM saidas",
+    "WITH usuarios AS (SELECT u.* FROM usuarios u) SELECT x.* FROM usuarios x",
+    "WITH usuarios AS (SELECT id, email FROM usuarios) SELECT email FROM usuarios",
+    "WITH Entradas AS (SELECT 1) SELECT * FROM saidas",
+])
+def test_cte_com_nome_de_tabela_recusada(sql):
+    with pytest.raises(SQLRecusado):
+        governador_sql.governar(sql, USUARIO, "sqlite")
+
+def test_cte_fora_de_escopo_nao_e_cte():
+    with pytest.raises(SQLRecusado):
+        governador_sql.governar("SELECT * FROM (WITH x AS (SELECT valor FROM saidas) SELECT * FROM x) t "
+                                "JOIN x ON 1 = 1", USUARIO, "sqlite")
+
+def test_cte_que_le_a_si_mesma_sem_recursive():
+    with pytest.raises(SQLRecusado):
+        governador_sql.governar("WITH a AS (SELECT valor FROM a) SELECT * FROM a", USUARIO, "sqlite")
+
+def test_cte_recursiva(banco):
+    linhas = executar(banco, "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3) "
+                             "SELECT i FROM n")
+    assert linhas == [(1,), (2,), (3,)]
+
+def test_cte_encadeada(banco):
+    linhas = executar(banco, "WITH a AS (SELECT usuario_id, valor FROM saidas), b AS (SELECT * FROM a) "
+                             "SELECT DISTINCT usuario_id FROM b")
+    assert linhas == [(USUARIO,)]
+
+
+# ─── Senha ───────────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("sql", [
+    "SELECT senha FROM usuarios",
+    "SELECT u.senha FROM usuarios u",
+    "SELECT * FROM usuarios",
+    "SELECT u.* FROM usuarios u",
+    "SELECT s.valor, u.* FROM saidas s JOIN usuarios u ON u.id = s.usuario_id",
+    "SELECT * FROM (SELECT * FROM usuarios) t",
+    "SELECT t.* FROM (SELECT u.* FROM usuarios u) t",
+    "WITH x AS (SELECT * FROM usuarios) SELECT nome FROM x",
+])
+def test_senha_nunca_sai(sql):
+    with pytest.raises(SQLRecusado):
+        governador_sql.governar(sql, USUARIO, "sqlite")
+
+def test_count_estrela_em_usuarios_permitido(banco):
+    assert executar(banco, "SELECT COUNT(*) FROM usuarios") == [(1,)]
+
+
+# ─── Comandos e funções ──────────────────────────────────────────────────────
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM saidas",
+    "UPDATE saidas SET valor = 0",
+    "SELECT 1; DROP TABLE saidas",
+    "SELECT valor FROM saidas INTO OUTFILE '/tmp/x'",
+    "SELECT SLEEP(10)",
+    "SELECT valor FROM saidas WHERE BENCHMARK(1000000, MD5('x'))",
+    "SELECT * FROM mysql.user",
+    "SELECT * FROM information_schema.tables",
+    "SELECT * FROM saidas_arquivo",
+    "SELECT * FROM saidas s, entradas e",
+    "SELECT * FROM saidas a JOIN saidas b ON 1 = 1 JOIN saidas c ON 1 = 1 JOIN saidas d ON 1 = 1 "
+    "JOIN saidas e ON 1 = 1",
+])
+def test_recusados(sql):
+    with pytest.raises(SQLRecusado):
+        governador_sql.governar(sql, USUARIO, "sqlite")
+
+
+# ─── LIMIT ───────────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("sql, esperado", [
+    ("SELECT valor FROM saidas", governador_sql.MAX_LINHAS),
+    ("SELECT valor FROM saidas LIMIT 1000", governador_sql.MAX_LINHAS),
+    ("SELECT valor FROM saidas LIMIT 5", 5),
+    ("SELECT valor FROM saidas UNION ALL SELECT valor FROM saidas", governador_sql.MAX_LINHAS),
+    ("SELECT * FROM (SELECT valor FROM saidas LIMIT 1000) t", governador_sql.MAX_LINHAS),
+])
+def test_limite(banco, sql, esperado):
+    assert len(executar(banco, sql)) == esperado
+
+def test_limite_configurado():
+    sql = governador_sql.governar("SELECT valor FROM saidas LIMIT 50", USUARIO, "sqlite", max_linhas=10)
+    assert sql.endswith("LIMIT 10")
+
+def test_tempo_maximo_no_mysql():
+    sql = governador_sql.governar("SELECT valor FROM saidas", USUARIO, "mysql", timeout_ms=5000)
+    assert "MAX_EXECUTION_TIME(5000)" in sql
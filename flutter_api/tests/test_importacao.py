@@ -0,0 +1,135 @@
+# Importação de extratos: conversão de valores, detecção de cp1252, linhas
+# repetidas no arquivo e no banco, transações a cada IMPORTACAO_LOTES_POR_COMMIT
+# lotes e, de ponta a ponta, carteira e totais por período batendo com as linhas.
+import itertools
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+import importacao
+import main
+
+_EMAILS = itertools.count()
+
+CAFES = b"data;descricao;valor\n01/10/2026;Cafe;-5,00\n01/10/2026;Cafe;-5,00\n02/10/2026;Salario;1.000,00\n"
+
+
+def _pedacos(dados: bytes, tamanho: int):
+    return [dados[i:i + tamanho] for i in range(0, len(dados), tamanho)]
+
+
+@pytest.mark.parametrize("texto, valor", [
+    ("1.234,56", "1234.56"), ("1,234.56", "1234.56"), ("1234.56", "1234.56"), ("1.234.567", "1234567.00"),
+    ("-50,00", "-50.00"), ("50,00-", "-50.00"), ("(12,50)", "-12.50"),
+    ("R$ 12", "12.00"), ("R$\xa01.000,00", "1000.00"),
+])
+def test_ler_valor(texto, valor):
+    assert importacao.ler_valor(texto) == Decimal(valor)
+
+
+def test_ler_valor_invalido():
+    with pytest.raises(importacao.LinhaInvalida):
+        importacao.ler_valor("doze reais")
+
+
+@pytest.mark.parametrize("encoding", ["cp1252", "utf-8"])
+def test_csv_em_cp1252_ou_utf8_em_pedacos(encoding):
+    dados = "Data;Descrição;Valor\n01/10/2026;Padaria São João;-12,50\n".encode(encoding)
+    # pedaços pequenos: em UTF-8 o "ç" e o "ã" ficam partidos entre dois pedaços
+    [(n, item)] = importacao.ler_csv(_pedacos(dados, 5 if encoding == "utf-8" else 16), "Nubank")
+    assert n == 2
+    assert item["descricao"] == "Padaria São João"
+    assert (item["tipo"], item["valor"], item["categoria"]) == ("saida", Decimal("12.50"), "Alimentação")
+
+
+# ─── Gravação (main._importar_extrato) ───────────────────────────────────────
+@pytest.fixture()
+def db():
+    main.Base.metadata.create_all(bind=main.engine)
+    sessao = main.SessionLocal()
+    usuario = main.Usuario(nome="Ana", email=f"importa{next(_EMAILS)}@teste", senha="x")
+    sessao.add(usuario)
+    sessao.commit()
+    sessao.usuario_id = usuario.id
+    yield sessao
+    sessao.rollback()
+    sessao.close()
+
+
+def _importar(db, dados: bytes, **opcoes):
+    return main._importar_extrato(db, db.usuario_id, importacao.ler_csv([dados], "Nubank", **opcoes))
+
+
+def _linhas(usuario_id):
+    with main.SessionLocal() as outra:
+        return sorted((e.data.date(), e.valor) for m in (main.Entrada, main.Saida)
+                      for e in outra.query(m).filter(m.usuario_id == usuario_id))
+
+
+@pytest.mark.parametrize("lote", [1, main.IMPORTACAO_LOTE])
+def test_linhas_repetidas_no_arquivo_e_reimportacao(db, monkeypatch, lote):
+    # com lote 1 cada café cai num lote e a contagem passa de um lote ao outro
+    monkeypatch.setattr(main, "IMPORTACAO_LOTE", lote)
+    primeira = _importar(db, CAFES)
+    assert (primeira["entradas"], primeira["saidas"], primeira["duplicadas"]) == (1, 2, 0)
+
+    mesma = _importar(db, CAFES)
+    assert (mesma["importadas"], mesma["duplicadas"]) == (0, 3)
+
+    # um café a mais no arquivo: só o terceiro é novo
+    tres = _importar(db, CAFES + b"01/10/2026;Cafe;-5,00\n")
+    assert (tres["saidas"], tres["duplicadas"]) == (1, 3)
+    assert [v for _, v in _linhas(db.usuario_id)].count(Decimal("5.00")) == 3
+    assert main.verificar_carteira(db, db.usuario_id) == []
+
+
+def test_falha_no_meio_mantem_as_transacoes_anteriores(db, monkeypatch):
+    monkeypatch.setattr(main, "IMPORTACAO_LOTE", 2)
+    monkeypatch.setattr(main, "IMPORTACAO_LOTES_POR_COMMIT", 2)
+    commits = []
+    original = db.commit
+    monkeypatch.setattr(db, "commit", lambda: (commits.append(len(_linhas(db.usuario_id))), original()))
+
+    def leitor():
+        for dia in range(1, 10):
+            yield dia, importacao.lancamento(datetime(2026, 10, dia), Decimal(dia), None, "Nubank")
+        raise RuntimeError("conexão caiu")
+    with pytest.raises(RuntimeError):
+        main._importar_extrato(db, db.usuario_id, leitor())
+    db.rollback()
+    # commit a cada 2 lotes de 2 linhas; a 9ª linha, sem commit, se perde
+    assert commits == [0, 4]
+    assert len(_linhas(db.usuario_id)) == 8
+    assert main.verificar_carteira(db, db.usuario_id) == []
+
+
+# ─── De ponta a ponta (/api/importar) ────────────────────────────────────────
+def test_importar_extrato_atualiza_carteira_e_totais_por_periodo():
+    with TestClient(main.app) as api:
+        email = f"importa{next(_EMAILS)}@teste"
+        api.post("/api/cadastro", json={"nome": "Teste", "email": email, "senha": "s"}).raise_for_status()
+        login = api.post("/api/login", json={"email": email, "senha": "s"}).json()
+        uid, cabecalhos = login["id"], {"Authorization": f"Bearer {login['token']}"}
+        extrato = ("data;descricao;valor;categoria\n"
+                   "01/09/2026;Salario;3.000,00;\n"
+                   "15/09/2026;Mercado Extra;-250,40;\n"
+                   "03/10/2026;Cinema;-40,00;Lazer\n"
+                   "03/10/2026;sem valor;;\n").encode("cp1252")
+        resposta = api.post(f"/api/importar/{uid}", params={"instituicao": "Nubank"}, content=extrato,
+                            headers={**cabecalhos, "Content-Type": "text/csv"}).json()
+    assert (resposta["entradas"], resposta["saidas"], resposta["rejeitadas"]) == (1, 2, 1)
+    assert resposta["erros"][0]["linha"] == 5
+
+    with main.SessionLocal() as db:
+        cart = db.query(main.Carteira).filter(main.Carteira.usuario_id == uid).one()
+        assert (cart.total_entradas, cart.total_saidas) == (Decimal("3000.00"), Decimal("290.40"))
+        mensais = {(t.mes, t.tipo, t.categoria): (t.total, t.quantidade)
+                   for t in db.query(main.TotalMensal).filter(main.TotalMensal.usuario_id == uid)}
+        assert mensais == {
+            (date(2026, 9, 1), "entrada", ""): (Decimal("3000.00"), 1),
+            (date(2026, 9, 1), "saida", "Alimentação"): (Decimal("250.40"), 1),
+            (date(2026, 10, 1), "saida", "Lazer"): (Decimal("40.00"), 1),
+        }
+        assert main.verificar_carteira(db, uid) == []
@@ -0,0 +1,82 @@
+# ClienteLLM contra o LLM falso (fake_llm.py): chamada completa, stream e
+# cancelamento quando o cliente do chat desconecta.
+import asyncio
+import socket
+import time
+
+import pytest
+
+import fake_llm
+import llm
+
+MENSAGENS = [{"role": "user", "content": "quanto gastei?"}]
+
+
+def _rodar(url, corpo, **opcoes):
+    async def principal():
+        cliente = llm.ClienteLLM(url, "gemma3", **opcoes)
+        try:
+            return await corpo(cliente)
+        finally:
+            await cliente.fechar()
+    return asyncio.run(principal())
+
+
+def _porta_fechada() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        porta = s.getsockname()[1]
+    return f"http://127.0.0.1:{porta}/v1/chat/completions"
+
+
+def test_completar_devolve_o_texto_e_registra_o_uso(llm_falso):
+    usos = []
+    texto = _rodar(llm_falso(), lambda c: c.completar(MENSAGENS), ao_usar=usos.append)
+    assert texto == fake_llm.RESPOSTA
+    assert [u["completion_tokens"] for u in usos] == [len(fake_llm.RESPOSTA.split())]
+
+
+def test_stream_entrega_os_pedacos_e_o_uso_do_ultimo_evento(llm_falso):
+    usos = []
+
+    async def juntar(cliente):
+        return [p async for p in cliente.stream(MENSAGENS)]
+    pedacos = _rodar(llm_falso(), juntar, ao_usar=usos.append)
+    assert len(pedacos) == len(fake_llm.RESPOSTA.split())
+    assert "".join(pedacos) == fake_llm.RESPOSTA
+    assert len(usos) == 1
+
+
+@pytest.mark.parametrize("chamada", ["completar", "stream"])
+def test_modelo_fora_do_ar_vira_erro_llm(chamada):
+    async def chamar(cliente):
+        if chamada == "completar":
+            return await cliente.completar(MENSAGENS)
+        return [p async for p in cliente.stream(MENSAGENS)]
+    with pytest.raises(llm.ErroLLM):
+        _rodar(_porta_fechada(), chamar)
+
+
+def test_stream_cancelado_fecha_a_conexao_e_interrompe_a_geracao(llm_falso):
+    url = llm_falso(latencia_token=0.05)
+
+    async def desconectar(cliente):
+        recebidos = []
+
+        async def consumir():
+            async for pedaco in cliente.stream(MENSAGENS):
+                recebidos.append(pedaco)
+        tarefa = asyncio.ensure_future(consumir())
+        while not recebidos:
+            await asyncio.sleep(0.01)
+        tarefa.cancel()   # o que o Starlette faz com o gerador quando o cliente some
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+        # com o cliente HTTP ainda aberto: quem fechou a conexão foi o stream
+        limite = time.monotonic() + 2
+        while not fake_llm.Handler.cancelados and time.monotonic() < limite:
+            await asyncio.sleep(0.02)
+        return recebidos
+    recebidos = _rodar(url, desconectar)
+    assert fake_llm.Handler.cancelados == 1
+    assert len(recebidos) < len(fake_llm.RESPOSTA.split())
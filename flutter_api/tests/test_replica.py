@@ -0,0 +1,97 @@
+# Leitura logo após uma escrita com primário e réplica em dois SQLite locais:
+# a réplica é uma cópia tirada antes da escrita (atrasada). O instante da
+# escrita vem do backend do cache, compartilhado entre os workers.
+import dataclasses
+import itertools
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+import cache_resultados
+import main
+
+_EMAILS = itertools.count()
+
+
+@pytest.fixture()
+def replica(tmp_path, monkeypatch):
+    """sincronizar() copia o primário para a réplica, que fica parada até a próxima chamada."""
+    eng = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(main, "engine_leitura", eng)
+    monkeypatch.setattr(main, "SessionLeitura", sessionmaker(autocommit=False, autoflush=False, bind=eng))
+    monkeypatch.setattr(main, "RESULTADOS", cache_resultados.CacheResultados())
+    monkeypatch.setattr(main, "CONFIG", dataclasses.replace(main.CONFIG, db_replica_atraso_max=60))
+
+    def sincronizar():
+        eng.dispose()
+        origem, destino = sqlite3.connect(main.engine.url.database), sqlite3.connect(eng.url.database)
+        with destino:
+            origem.backup(destino)
+        origem.close()
+        destino.close()
+    yield sincronizar
+    eng.dispose()
+
+
+@pytest.fixture()
+def api(replica):
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+
+def _usuario(api) -> dict:
+    email = f"replica{next(_EMAILS)}@teste"
+    api.post("/api/cadastro", json={"nome": "Teste", "email": email, "senha": "s"}).raise_for_status()
+    login = api.post("/api/login", json={"email": email, "senha": "s"}).json()
+    return {"id": login["id"], "headers": {"Authorization": f"Bearer {login['token']}"}}
+
+
+def _entrada(api, usuario, valor):
+    api.post("/api/entrada", json={"usuario_id": usuario["id"], "data": "2026-10-01T10:00:00",
+                                   "instituicao": "Nubank", "valor": valor}, headers=usuario["headers"]).raise_for_status()
+
+
+def _dashboard(api, usuario, **filtros):
+    return api.get(f"/api/dashboard/{usuario['id']}", params=filtros, headers=usuario["headers"]).json()
+
+
+def _outro_worker(monkeypatch):
+    """Outro processo: cache próprio sobre o mesmo backend (o Redis, em produção)."""
+    monkeypatch.setattr(main, "RESULTADOS", cache_resultados.CacheResultados(main.RESULTADOS.backend))
+
+
+def test_leitura_depois_de_escrita_em_outro_worker_vai_ao_primario(api, replica, monkeypatch):
+    ana = _usuario(api)
+    _entrada(api, ana, 100)
+    replica()
+    _entrada(api, ana, 50)   # a réplica não tem esta
+
+    _outro_worker(monkeypatch)
+    assert _dashboard(api, ana)["total_entradas"] == 150.0
+
+    # passada a janela a leitura vai à réplica (aqui, ainda atrasada)
+    monkeypatch.setattr(main, "CONFIG", dataclasses.replace(main.CONFIG, db_replica_atraso_max=0))
+    assert _dashboard(api, ana, instituicao="Nubank")["total_entradas"] == 100.0
+
+
+def test_leitura_da_replica_escolhida_antes_de_uma_escrita_nao_vai_ao_cache(api, replica):
+    ana = _usuario(api)
+    _entrada(api, ana, 100)
+    replica()
+    pedido = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+    async def ler():
+        async for db in main._abrir_sessao(leitura=True):
+            assert db.info["replica"]
+            # a escrita de outro worker chega depois da escolha da réplica e
+            # antes da chave: o resultado (da réplica atrasada) iria para a versão nova
+            main.RESULTADOS.invalidar(ana["id"])
+            return await main._com_cache(pedido, db, ana["id"], "dashboard", {},
+                                         lambda s: main._calcular_dashboard(s, ana["id"], None, None))
+    api.portal.call(ler)
+    chave, _ = main.RESULTADOS.preparar(ana["id"], "dashboard", {})
+    assert main.RESULTADOS.obter(chave) is None
@@ -0,0 +1,25 @@
+# Partida sem SESSAO_SEGREDO: recusada com a sessão obrigatória.
+import pytest
+
+import main
+import sessoes
+
+
+def test_sessao_obrigatoria_sem_segredo_recusa_a_partida(monkeypatch):
+    monkeypatch.setattr(main, "SESSOES", sessoes.Sessoes(None))
+    monkeypatch.setattr(main, "SESSAO_OBRIGATORIA", True)
+    with pytest.raises(RuntimeError, match="SESSAO_SEGREDO"):
+        main.conferir_sessoes()
+
+
+@pytest.mark.parametrize("segredo, obrigatoria", [("segredo", True), (None, False)])
+def test_partida_aceita_segredo_definido_ou_sessao_opcional(monkeypatch, segredo, obrigatoria):
+    monkeypatch.setattr(main, "SESSOES", sessoes.Sessoes(segredo))
+    monkeypatch.setattr(main, "SESSAO_OBRIGATORIA", obrigatoria)
+    main.conferir_sessoes()
+
+
+def test_token_de_um_worker_vale_no_outro_com_o_mesmo_segredo():
+    token, _ = sessoes.Sessoes("segredo").emitir(7)
+    assert sessoes.Sessoes("segredo").verificar(token) == 7
+    assert sessoes.Sessoes(None).verificar(token) is None